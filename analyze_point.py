@@ -2,8 +2,9 @@
 Verificar por qué 21 de setiembre 2570 da zona 9 en lugar de zona 0
 """
 
-import json
-from shapely.geometry import Point, shape
+from shapely.geometry import Point
+
+from app.zones import get_zone_index
 
 # Coordenadas de la dirección: 21 de setiembre 2570, Montevideo
 # Según Nominatim: -34.9149255, -56.1601851
@@ -19,30 +20,34 @@ print(f"   Longitud: {lon}")
 
 point = Point(lon, lat)
 
-# Cargar ZONAS_F
-with open('app/data/ZONAS_F.geojson', 'r', encoding='utf-8') as f:
-    zonas_f = json.load(f)
+# Índice de ZONAS_F compartido con la API (ya ordenado por área).
+# Las geometrías crudas quedan solo para diagnóstico (área, bounds, distancia);
+# el point-in-polygon se confirma con los polígonos preparados.
+index = get_zone_index('ZONAS_F.geojson')
+features_sorted = index.zones
+geoms = index.geometries
+prepared = index.prepared
 
-print(f"\n🗺️  Verificando en {len(zonas_f['features'])} zonas de flete:")
+print(f"\n🗺️  Verificando en {len(index)} zonas de flete:")
 print("="*70)
 
-# Ordenar por área (como en el código real)
-features_sorted = sorted(
-    zonas_f['features'],
-    key=lambda f: f['properties'].get('Shape_Area', 0)
-)
+# Prefiltro vectorizado por bounding box
+en_bbox = index.bbox_candidates(lat, lon)
+print(f"\n📦 Zonas cuyo bounding box contiene el punto: {len(en_bbox)} de {len(index)}")
+
+# Modo diagnóstico: todas las zonas que contienen el punto, no solo la primera
+indices_que_contienen = set(index.diagnose_zone(point))
 
 print("\n🔍 ORDEN DE BÚSQUEDA (por área, de menor a mayor):\n")
 
 zonas_que_contienen = []
 
-for i, feature in enumerate(features_sorted):
-    codigo = feature['properties'].get('Codigo')
-    nombre = feature['properties'].get('OBJECTID', '?')
-    area = feature['properties'].get('Shape_Area', 0)
-    geom = shape(feature['geometry'])
+for i, zone in enumerate(features_sorted):
+    codigo = zone['codigo']
+    nombre = index.full_properties[i].get('OBJECTID', '?')
+    area = zone['area']
     
-    contains = geom.contains(point)
+    contains = i in indices_que_contienen
     
     if contains:
         zonas_que_contienen.append({
@@ -74,18 +79,18 @@ if zonas_que_contienen:
         print(f"\n⚠️  PROBLEMA: Debería retornar zona 0, pero retorna zona {primera['codigo']}")
         print("\n🔍 Analizando zona 0 específicamente:")
         
-        zona_0 = next((f for f in zonas_f['features'] if f['properties'].get('Codigo') == 0), None)
-        if zona_0:
-            geom_0 = shape(zona_0['geometry'])
+        idx_0 = next((i for i, z in enumerate(features_sorted) if z['codigo'] == 0), None)
+        if idx_0 is not None:
+            geom_0 = geoms[idx_0]
             
             print(f"\n   Zona 0:")
-            print(f"   • Tipo: {zona_0['geometry']['type']}")
+            print(f"   • Tipo: {geom_0.geom_type}")
             print(f"   • Válida: {geom_0.is_valid}")
             print(f"   • Área Shapely: {geom_0.area}")
-            print(f"   • Contiene punto: {geom_0.contains(point)}")
+            print(f"   • Contiene punto: {prepared[idx_0].contains(point)}")
             
             # Verificar bounds
-            minx, miny, maxx, maxy = geom_0.bounds
+            minx, miny, maxx, maxy = index.bboxes[idx_0]
             print(f"\n   Bounds de zona 0:")
             print(f"   • Min Lon: {minx:.6f}, Max Lon: {maxx:.6f}")
             print(f"   • Min Lat: {miny:.6f}, Max Lat: {maxy:.6f}")
@@ -94,7 +99,7 @@ if zonas_que_contienen:
             en_bounds = minx <= lon <= maxx and miny <= lat <= maxy
             print(f"\n   Punto dentro de bounds: {en_bounds}")
             
-            if en_bounds and not geom_0.contains(point):
+            if en_bounds and not prepared[idx_0].contains(point):
                 print("\n   ⚠️  El punto está dentro de los bounds pero NO dentro del polígono")
                 print("   Esto significa que el punto cae en un hueco interior de la zona 0")
                 
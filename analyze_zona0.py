@@ -1,56 +1,57 @@
-import json
-from shapely.geometry import shape
+import numpy as np
 from shapely.validation import explain_validity
 
-# Cargar ZONAS_F
-with open('app/data/ZONAS_F.geojson', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+from app.zones import get_zone_index
+
+# Índice de ZONAS_F compartido con la API (GeoJSON ya parseado)
+index = get_zone_index('ZONAS_F.geojson')
 
 # Encontrar zona 0
-zona0 = None
-for feature in data['features']:
-    if feature['properties']['Codigo'] == 0:
-        zona0 = feature
-        break
+idx0 = None
+if index:
+    idx0 = next((i for i, z in enumerate(index.zones) if z['codigo'] == 0), None)
 
-if not zona0:
+if idx0 is None:
     print("❌ No se encontró la zona 0")
     exit(1)
 
+zona0 = index.zones[idx0]
+# Propiedades completas del GeoJSON (las zonas solo llevan Codigo, Shape_Area y name)
+properties = index.full_properties[idx0]
+poly_shape = index.geometries[idx0]
+polygons = list(getattr(poly_shape, 'geoms', [poly_shape]))
+
 print("="*70)
 print("📊 ANÁLISIS DE ZONA 0 (Zona de Flete)")
 print("="*70)
 
 # Información básica
-print(f"\n🏷️  Código: {zona0['properties']['Codigo']}")
-print(f"📏 Área: {zona0['properties'].get('Shape_Area', 0):,.0f} m²")
-print(f"📐 Perímetro: {zona0['properties'].get('PERIMETER', 'N/A')}")
+print(f"\n🏷️  Código: {properties['Codigo']}")
+print(f"📏 Área: {properties.get('Shape_Area', 0):,.0f} m²")
+print(f"📐 Perímetro: {properties.get('PERIMETER', 'N/A')}")
 
 # Estructura de geometría
-geom = zona0['geometry']
 print(f"\n📐 Geometría:")
-print(f"   - Tipo: {geom['type']}")
-print(f"   - Número de polígonos: {len(geom['coordinates'])}")
+print(f"   - Tipo: {poly_shape.geom_type}")
+print(f"   - Número de polígonos: {len(polygons)}")
 
 # Analizar cada polígono
-for i, polygon in enumerate(geom['coordinates'][:5]):  # Primeros 5 polígonos
+for i, polygon in enumerate(polygons[:5]):  # Primeros 5 polígonos
     print(f"\n   Polígono {i+1}:")
-    print(f"     - Anillos: {len(polygon)}")
-    print(f"     - Puntos en anillo exterior: {len(polygon[0])}")
+    print(f"     - Anillos: {1 + len(polygon.interiors)}")
+    print(f"     - Puntos en anillo exterior: {len(polygon.exterior.coords)}")
     
-    if len(polygon) > 1:
-        print(f"     - Anillos interiores (huecos): {len(polygon) - 1}")
+    if polygon.interiors:
+        print(f"     - Anillos interiores (huecos): {len(polygon.interiors)}")
 
-if len(geom['coordinates']) > 5:
-    print(f"\n   ... y {len(geom['coordinates']) - 5} polígonos más")
+if len(polygons) > 5:
+    print(f"\n   ... y {len(polygons) - 5} polígonos más")
 
 # Validar geometría con Shapely
 print(f"\n🔍 Validación con Shapely:")
 print("-"*70)
 
 try:
-    poly_shape = shape(geom)
-    
     # Verificar si es válida
     is_valid = poly_shape.is_valid
     print(f"   ✓ ¿Es válida?: {'SÍ ✅' if is_valid else 'NO ❌'}")
@@ -76,7 +77,7 @@ except Exception as e:
 # Verificar algunos puntos de coordenadas
 print(f"\n🌍 Muestra de coordenadas (primeros 3 puntos):")
 print("-"*70)
-first_ring = geom['coordinates'][0][0]
+first_ring = list(polygons[0].exterior.coords)
 for i, coord in enumerate(first_ring[:3]):
     lon, lat = coord[0], coord[1]
     print(f"   {i+1}. Lon: {lon:.6f}, Lat: {lat:.6f}")
@@ -86,14 +87,12 @@ print(f"\n🔄 Verificación de orientación:")
 print("-"*70)
 
 def is_clockwise(coords):
-    """Verifica si las coordenadas van en sentido horario"""
-    area = 0
-    for i in range(len(coords) - 1):
-        area += (coords[i+1][0] - coords[i][0]) * (coords[i+1][1] + coords[i][1])
+    """Verifica si las coordenadas van en sentido horario (shoelace vectorizado)"""
+    arr = np.asarray(coords)
+    area = np.sum((arr[1:, 0] - arr[:-1, 0]) * (arr[1:, 1] + arr[:-1, 1]))
     return area > 0
 
-first_ring = geom['coordinates'][0][0]
-cw = is_clockwise(first_ring)
+cw = is_clockwise(polygons[0].exterior.coords)
 print(f"   Anillo exterior: {'Sentido horario ⟳' if cw else 'Sentido antihorario ⟲'}")
 print(f"   (GeoJSON exterior debe ser antihorario, interiores horarios)")
 
@@ -1,38 +1,31 @@
-import json
-from shapely.geometry import shape
+from app.zones import get_zone_index
 
-# Cargar ZONAS_F
-with open('app/data/ZONAS_F.geojson', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+# Índice de ZONAS_F compartido con la API (GeoJSON ya parseado)
+index = get_zone_index('ZONAS_F.geojson')
 
 # Encontrar zona 0
-zona0 = None
-for feature in data['features']:
-    if feature['properties']['Codigo'] == 0:
-        zona0 = feature
-        break
+idx0 = next((i for i, z in enumerate(index.zones) if z['codigo'] == 0), None)
+rings = index.rings[idx0]  # Coordenadas SoA: coords + offsets de anillos/polígonos
+num_polygons = len(rings.poly_offsets) - 1
 
 print("="*70)
 print("🗺️  ANÁLISIS DETALLADO DE ZONA 0")
 print("="*70)
 
-geom = zona0['geometry']
-print(f"\nZona 0 tiene {len(geom['coordinates'])} polígonos:\n")
+print(f"\nZona 0 tiene {num_polygons} polígonos:\n")
 
-for i, polygon in enumerate(geom['coordinates']):
+for i in range(num_polygons):
+    first_ring, end_ring = rings.poly_offsets[i], rings.poly_offsets[i + 1]
     print(f"📐 Polígono {i+1}:")
-    print(f"   - Anillos: {len(polygon)}")
+    print(f"   - Anillos: {end_ring - first_ring}")
     
-    # Analizar el anillo exterior
-    exterior = polygon[0]
+    # Analizar el anillo exterior (primer anillo del polígono)
+    exterior = rings.coords[rings.ring_offsets[first_ring]:rings.ring_offsets[first_ring + 1]]
     print(f"   - Puntos en anillo exterior: {len(exterior)}")
     
     # Calcular bounds
-    lons = [coord[0] for coord in exterior]
-    lats = [coord[1] for coord in exterior]
-    
-    min_lon, max_lon = min(lons), max(lons)
-    min_lat, max_lat = min(lats), max(lats)
+    min_lon, min_lat = exterior.min(axis=0)
+    max_lon, max_lat = exterior.max(axis=0)
     
     print(f"   - Bounds:")
     print(f"     Lon: {min_lon:.6f} a {max_lon:.6f}")
@@ -54,8 +47,7 @@ for i, polygon in enumerate(geom['coordinates']):
     print()
 
 # Bounds generales de toda la zona
-poly_shape = shape(geom)
-bounds = poly_shape.bounds
+bounds = (*rings.coords.min(axis=0), *rings.coords.max(axis=0))
 print("="*70)
 print("📊 BOUNDS TOTALES DE ZONA 0:")
 print("="*70)
@@ -8,6 +8,7 @@
 REPO_DIR="/home/riogas/ruteo"
 LOG_FILE="/home/riogas/ruteo/deploy.log"
 BRANCH="main"
+SERVICE="ruteo-api"
 
 # Función de logging
 log() {
@@ -39,23 +40,27 @@ if [ "$OLD_COMMIT" = "$NEW_COMMIT" ]; then
     exit 0
 fi
 
+# Si solo cambiaron datos (app/data, montado como volumen), no hace falta
+# reconstruir: con SIGHUP el supervisor de uvicorn (>= 0.30) reinicia los
+# workers de a uno y cada worker nuevo carga las zonas al arrancar
+CHANGED_FILES=$(git diff --name-only "$OLD_COMMIT" "$NEW_COMMIT")
+if [ -n "$CHANGED_FILES" ] && ! echo "$CHANGED_FILES" | grep -qv '^app/data/'; then
+    log "🗺️  Solo cambiaron datos en app/data. Reiniciando workers sin reconstruir..."
+    docker compose kill -s HUP "$SERVICE"
+    log "✅ SIGHUP enviado a $SERVICE (reinicio de workers)"
+    exit 0
+fi
+
 log "🔄 Cambios detectados. Iniciando redeploy..."
 
 # Rotar logs antes del deploy
 log "📋 Rotando logs antiguos..."
 bash "$REPO_DIR/app/rotate-logs.sh"
 
-# Detener contenedores
-log "🛑 Deteniendo contenedores..."
-docker compose down
-
-# Reconstruir imagen
-log "🏗️  Reconstruyendo imagen Docker..."
-docker compose build --no-cache
-
-# Iniciar contenedores
-log "▶️  Iniciando contenedores..."
-docker compose up -d
+# Reconstruir y reemplazar solo la API (Redis sigue corriendo).
+# Sin --no-cache: la capa de pip install se reutiliza si requirements.txt no cambió
+log "🏗️  Reconstruyendo e iniciando $SERVICE..."
+docker compose up -d --no-deps --build "$SERVICE"
 
 # Esperar 10 segundos
 sleep 10
@@ -0,0 +1,291 @@
+"""
+Backends de cache clave → valor JSON.
+
+Usado por el servicio de geocodificación para no repetir llamadas a
+Nominatim/Overpass: con Redis el cache sobrevive a reinicios y se
+comparte entre workers de uvicorn.
+
+BACKENDS:
+1. redis  - Compartido entre workers y reinicios, con TTL (REDIS_URL)
+2. disk   - diskcache en CACHE_DIR, para despliegues de un solo proceso
+3. memory - LRU acotado en memoria (sin persistencia)
+
+Selección con GEOCODING_CACHE_BACKEND (auto | redis | disk | memory).
+En modo auto se usa Redis si responde, si no diskcache, si no memoria.
+
+Delante de Redis o disco va un LRU en memoria del proceso
+(TieredCacheBackend): las direcciones repetidas no pagan el round-trip
+a Redis ni la lectura de SQLite.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+from loguru import logger
+
+# Redis (opcional): requirements.txt ya lo incluye para el cache de rutas
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# diskcache (opcional): cache persistente en SQLite sin servidor
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600  # 30 días
+DEFAULT_MEMORY_MAXSIZE = 50_000  # Entradas del cache en memoria
+DEFAULT_LOCAL_TTL_SECONDS = 24 * 3600  # Vida de una entrada en el nivel local
+
+
+class CacheBackend(Protocol):
+    """Interfaz mínima de un backend de cache"""
+
+    name: str
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retorna el valor guardado o None si no existe"""
+        ...
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Valores de varias claves de una vez (solo las que existen)"""
+        ...
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Guarda un valor serializable a JSON (ttl en segundos)"""
+        ...
+
+    def size(self) -> int:
+        """Cantidad de entradas (-1 si no se puede determinar)"""
+        ...
+
+
+class MemoryCacheBackend:
+    """
+    Cache LRU en memoria del proceso, con TTL por entrada.
+
+    Acotado a maxsize entradas: al llenarse descarta la menos usada, así
+    un servicio de larga vida no crece sin límite. Thread-safe (lo usan
+    los threads de geocode_many).
+    """
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = DEFAULT_MEMORY_MAXSIZE, ttl: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl  # TTL por defecto si set() no recibe uno
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        values = ((key, self.get(key)) for key in keys)
+        return {key: value for key, value in values if value is not None}
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._data)
+
+
+class RedisCacheBackend:
+    """
+    Cache en Redis con TTL.
+
+    Los valores se guardan como JSON. Los errores de conexión se registran
+    y se tratan como miss: el cache nunca debe tumbar la geocodificación.
+    La base de REDIS_URL es exclusiva del cache (size() cuenta todas sus
+    claves).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, socket_timeout: float = 1.0):
+        self._client = redis.Redis.from_url(
+            url,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout
+        )
+
+    def ping(self) -> bool:
+        """Verifica que el servidor responda"""
+        try:
+            return bool(self._client.ping())
+        except redis.RedisError:
+            return False
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self._client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️  Redis GET falló ({key}): {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Un solo MGET en lugar de un round-trip por clave"""
+        if not keys:
+            return {}
+        try:
+            raws = self._client.mget(keys)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️  Redis MGET falló ({len(keys)} claves): {e}")
+            return {}
+        return {key: json.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        try:
+            self._client.set(key, json.dumps(value), ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"⚠️  Redis SET falló ({key}): {e}")
+
+    def size(self) -> int:
+        """DBSIZE: O(1) en el servidor, en lugar de recorrer el keyspace con SCAN"""
+        try:
+            return int(self._client.dbsize())
+        except redis.RedisError:
+            return -1
+
+
+class DiskCacheBackend:
+    """Cache persistente en disco (diskcache/SQLite) con TTL"""
+
+    name = "disk"
+
+    def __init__(self, directory: Path):
+        self._cache = diskcache.Cache(str(directory))
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        values = ((key, self._cache.get(key)) for key in keys)
+        return {key: value for key, value in values if value is not None}
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self._cache.set(key, value, expire=ttl)
+
+    def size(self) -> int:
+        return len(self._cache)
+
+
+class TieredCacheBackend:
+    """
+    Dos niveles: LRU en memoria del proceso delante de un backend compartido.
+
+    Las lecturas prueban primero el nivel local y solo van al compartido
+    (Redis/disco) por lo que falta, guardando localmente lo que traen. Las
+    escrituras van a los dos. El TTL local (más corto) acota cuánto puede
+    sobrevivir en un worker una entrada que venció en el compartido.
+    """
+
+    def __init__(self, local: MemoryCacheBackend, shared: CacheBackend):
+        self.local = local
+        self.shared = shared
+        self.name = f"{local.name}+{shared.name}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Lo que no está en memoria se pide al compartido de una vez (MGET)"""
+        found = self.local.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            fetched = self.shared.get_many(missing)
+            for key, value in fetched.items():
+                self.local.set(key, value)
+            found.update(fetched)
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self.shared.set(key, value, ttl=ttl)
+        self.local.set(key, value, ttl=min(ttl, self.local.ttl) if ttl is not None else None)
+
+    def size(self) -> int:
+        return self.shared.size()
+
+
+def _with_local_tier(backend: CacheBackend) -> CacheBackend:
+    """Agrega el nivel en memoria (GEOCODING_CACHE_MAXSIZE=0 lo desactiva)"""
+    maxsize = int(os.getenv("GEOCODING_CACHE_MAXSIZE", DEFAULT_MEMORY_MAXSIZE))
+    if maxsize <= 0:
+        return backend
+    ttl = int(os.getenv("GEOCODING_LOCAL_CACHE_TTL", DEFAULT_LOCAL_TTL_SECONDS))
+    return TieredCacheBackend(MemoryCacheBackend(maxsize=maxsize, ttl=ttl), backend)
+
+
+def create_cache_backend() -> CacheBackend:
+    """
+    Crea el backend configurado por entorno.
+
+    Variables:
+        GEOCODING_CACHE_BACKEND: auto (default) | redis | disk | memory
+        REDIS_URL: URL de Redis (ej: redis://ruteo-redis:6379/0)
+        CACHE_DIR: Directorio base para diskcache (default ./cache)
+        GEOCODING_CACHE_MAXSIZE: Entradas del cache en memoria, o del nivel
+            local delante de Redis/disco (default 50000; 0 = sin nivel local)
+        GEOCODING_LOCAL_CACHE_TTL: Segundos en el nivel local (default 86400)
+    """
+    kind = os.getenv("GEOCODING_CACHE_BACKEND", "auto").lower()
+    redis_url = os.getenv("REDIS_URL")
+
+    if kind in ("auto", "redis") and REDIS_AVAILABLE and redis_url:
+        backend = RedisCacheBackend(redis_url)
+        if backend.ping():
+            logger.info(f"✓ Cache de geocodificación en Redis: {redis_url}")
+            return _with_local_tier(backend)
+        logger.warning(f"⚠️  Redis no responde en {redis_url}, usando otro backend")
+    elif kind == "redis":
+        logger.warning("⚠️  Redis no disponible (falta la librería o REDIS_URL)")
+
+    if kind in ("auto", "redis", "disk") and DISKCACHE_AVAILABLE:
+        directory = Path(os.getenv("CACHE_DIR", "./cache")) / "geocoding"
+        logger.info(f"✓ Cache de geocodificación en disco: {directory}")
+        return _with_local_tier(DiskCacheBackend(directory))
+    elif kind == "disk":
+        logger.warning("⚠️  diskcache no instalado, usando cache en memoria")
+
+    # GEOCODING_CACHE_MAXSIZE=0 desactiva el nivel local, no el cache: sin
+    # Redis ni disco el cache en memoria es el único y se usa el tamaño por defecto
+    maxsize = int(os.getenv("GEOCODING_CACHE_MAXSIZE", DEFAULT_MEMORY_MAXSIZE))
+    if maxsize <= 0:
+        logger.warning(
+            f"⚠️  GEOCODING_CACHE_MAXSIZE={maxsize} sin Redis ni disco: "
+            f"se usa el cache en memoria por defecto ({DEFAULT_MEMORY_MAXSIZE} entradas)"
+        )
+        maxsize = DEFAULT_MEMORY_MAXSIZE
+    logger.info(f"✓ Cache de geocodificación en memoria (LRU, {maxsize} entradas)")
+    return MemoryCacheBackend(maxsize=maxsize)
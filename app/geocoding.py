@@ -5,9 +5,9 @@ Convierte direcciones de texto a coordenadas geográficas (lat, lon).
 
 CARACTERÍSTICAS:
 - Soporte múltiples proveedores (Nominatim, Google Maps, OpenCage)
-- Cache de resultados para evitar llamadas repetidas
+- Cache persistente de resultados (Redis / disco / memoria, ver app/cache.py)
 - Fallback automático si un proveedor falla
-- Rate limiting para respetar límites de API
+- Rate limiting thread-safe por proveedor (geopy RateLimiter)
 - Validación y normalización de direcciones
 
 PROVEEDORES:
@@ -20,21 +20,472 @@ El sistema necesita coordenadas exactas para calcular rutas reales.
 La geocodificación es el primer paso crítico para todo el flujo.
 """
 
+import asyncio
+import hashlib
+import heapq
+import math
 import os
+import re
+import threading
 import time
-from typing import Optional, Dict, Tuple, List
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Iterator, Tuple, List, NamedTuple
 from functools import lru_cache
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from geopy.geocoders import Nominatim, GoogleV3, OpenCage
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError, GeocoderUnavailable
+from geopy.extra.rate_limiter import RateLimiter
 from loguru import logger
-from shapely.geometry import LineString, Point
-from shapely.ops import unary_union
+import numpy as np
+import shapely
+from shapely.geometry import LineString, MultiLineString
+from shapely.strtree import STRtree
 
+# orjson (opcional): decodifica las respuestas de Overpass ("out geom",
+# varios MB) bastante más rápido que json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ijson (opcional): parseo incremental de las respuestas de Overpass, sin
+# cargar el cuerpo completo ni el árbol de dicts en memoria
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+from app.cache import DEFAULT_TTL_SECONDS, MemoryCacheBackend, create_cache_backend
+from app.geometry_numba import argmin_sqdist, street_min_sqdist
 from app.models import Address, Coordinates
-from app.utils import lat_lon_to_utm
+from app.street_index import (
+    DEPARTMENT_SNAPSHOT_DIR, MONTEVIDEO_BBOX, STREETS_LIST_DB, STREETS_SNAPSHOT_FILE, StreetIndex,
+    StreetListStore, StreetNameIndex, department_snapshot_path, normalize_street_name
+)
+from app.utils import geohash_encode, geohash_neighbors, get_utm_transformer, lat_lon_to_utm
+
+# Prefijos versionados: cambiar la versión invalida el cache existente
+CACHE_KEY_PREFIX = "geocoder:v1:"
+COORD_CACHE_PREFIX = "geo:coord:v1:"  # Consultas que parten de coordenadas
+INTERSECTION_CACHE_PREFIX = "geo:inter:v1:"  # Esquinas (par de calles)
+CACHE_TTL_SECONDS = int(os.getenv("GEOCODING_CACHE_TTL", DEFAULT_TTL_SECONDS))
+REVERSE_CACHE_GEOHASH_PRECISION = 8  # Reverse geocoding: cache por celda geohash (~31 x 19 m en Montevideo)
+# Buscar también en las 8 celdas vecinas (puntos junto al borde de una celda)
+REVERSE_CACHE_NEIGHBORS = os.getenv("REVERSE_CACHE_NEIGHBORS", "false").lower() == "true"
+STREETS_LIST_CACHE_PREFIX = "geo:streets-list:v1:"  # Calles por departamento/localidad
+STREETS_LIST_TTL_SECONDS = 7 * 24 * 3600  # Las calles cambian poco
+
+REVERSE_ADDRESS_RADIUS = 0.0003  # Puertas (addr:housenumber) a ~30 m del punto
+
+# Memo local de calles cercanas por celda (geometrías ya decodificadas)
+NEARBY_STREETS_MEMO_SIZE = 4096
+NEARBY_STREETS_MEMO_TTL = 3600
+NEARBY_STREETS_FAILURE_TTL = 60  # Celdas cuya consulta falló: no reintentar enseguida
+
+# Memo local de reverse geocoding por celda geohash: un acierto no sale
+# del proceso (ni siquiera a Redis)
+REVERSE_MEMO_SIZE = 4096
+REVERSE_MEMO_TTL = 3600
+
+# Servidor Overpass: todas las consultas van al mismo host, así la sesión
+# compartida (_create_overpass_session) reutiliza sus conexiones keep-alive
+OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+
+# Servidor Nominatim propio (HTTP explícito para evitar problemas de SSL)
+NOMINATIM_DOMAIN = "nominatim.riogas.uy"
+NOMINATIM_SCHEME = "http"
+NOMINATIM_TIMEOUT = 10
+
+# Intervalo mínimo entre requests por proveedor (segundos).
+# Nominatim exige 1 request/segundo; los proveedores pagos toleran mucho más.
+PROVIDER_MIN_DELAY_SECONDS = {
+    'nominatim': float(os.getenv("NOMINATIM_MIN_DELAY_SECONDS", "1.0")),
+    'google': 0.1,
+    'opencage': 0.1,
+}
+
+# Metacaracteres de regex POSIX (ERE, la sintaxis de Overpass). re.escape no
+# sirve: también escapa espacios, que en ERE no son secuencias válidas
+_ERE_SPECIAL = re.compile(r"([.^$*+?()\[\]{}|\\])")
+
+# Bounding box de Montevideo en sintaxis Overpass QL (sur,oeste,norte,este)
+_MONTEVIDEO_BBOX_QL = ",".join(str(c) for c in MONTEVIDEO_BBOX)
+
+# "remark" de Overpass (va al final del JSON, después de "elements")
+_OVERPASS_REMARK_RE = re.compile(rb'"remark"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+# Geocodificaciones simultáneas en geocode_many. El RateLimiter de cada
+# proveedor sigue mandando: con Nominatim propio conviene bajar también
+# NOMINATIM_MIN_DELAY_SECONDS (ej: 0.02) para aprovecharlas.
+GEOCODING_CONCURRENCY = int(os.getenv("GEOCODING_CONCURRENCY", "8"))
+
+# Direcciones que no se pudieron geocodificar: no se reintentan contra el
+# proveedor durante FAILED_ADDRESS_TTL_SECONDS (entre 1x y 2x, ver RecentFailures)
+FAILED_ADDRESS_TTL_SECONDS = int(os.getenv("FAILED_ADDRESS_TTL_SECONDS", str(12 * 3600)))
+
+
+@lru_cache(maxsize=65536)
+def _address_cache_key(address: str) -> str:
+    """Clave de cache de una dirección (memoizada: las direcciones se repiten)"""
+    # Normalizar: minúsculas, sin espacios extra, sin tildes ("José" == "Jose")
+    normalized = normalize_street_name(address)
+    digest = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+    return f"{CACHE_KEY_PREFIX}{digest}"
+
+
+def _parse_json(content: bytes):
+    """Decodifica el cuerpo de una respuesta JSON (orjson si está disponible)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class RecentFailures:
+    """
+    Digests de direcciones que fallaron hace poco (filtro negativo en memoria).
+
+    Dos generaciones de sets de digests de 8 bytes: cada ttl segundos la
+    actual pasa a ser la anterior y la anterior se descarta, así una falla
+    se recuerda entre ttl y 2*ttl segundos sin un timestamp por entrada.
+    A diferencia de un Bloom filter no hay falsos positivos: una dirección
+    válida nunca se rechaza por una colisión.
+    """
+
+    def __init__(self, ttl: float = FAILED_ADDRESS_TTL_SECONDS):
+        self.ttl = ttl
+        self._current: set = set()
+        self._previous: set = set()
+        self._rotated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(address: "Address") -> bytes:
+        """Digest de la dirección completa (todos sus campos)"""
+        return hashlib.blake2b(address.model_dump_json().encode('utf-8'), digest_size=8).digest()
+
+    def _rotate(self) -> None:
+        now = time.monotonic()
+        if now - self._rotated_at < self.ttl:
+            return
+        with self._lock:
+            elapsed = now - self._rotated_at
+            if elapsed < self.ttl:
+                return  # Otro thread ya rotó
+            # Si pasaron dos generaciones, la actual también está vencida
+            self._previous = self._current if elapsed < 2 * self.ttl else set()
+            self._current = set()
+            self._rotated_at = now
+
+    def __contains__(self, digest: bytes) -> bool:
+        self._rotate()
+        return digest in self._current or digest in self._previous
+
+    def __len__(self) -> int:
+        return len(self._current | self._previous)
+
+    def add(self, digest: bytes) -> None:
+        self._rotate()
+        self._current.add(digest)
+
+
+class _TailReader:
+    """Envuelve un stream guardando sus últimos bytes leídos"""
+
+    def __init__(self, raw, size: int = 4096):
+        self._raw = raw
+        self._size = size
+        self.tail = b""
+
+    def read(self, n: int = -1) -> bytes:
+        chunk = self._raw.read(n)
+        self.tail = (self.tail + chunk)[-self._size:]
+        return chunk
+
+
+def _iter_overpass_elements(response, prefix: str = 'elements.item'):
+    """
+    Recorre los elementos de una respuesta Overpass pedida con stream=True.
+
+    Con ijson los elementos se parsean de a uno a medida que llegan: las
+    respuestas "out geom" de un bbox grande pesan decenas de MB y
+    materializarlas enteras dispara el pico de memoria. Sin ijson se
+    decodifica el cuerpo completo con _parse_json.
+
+    Args:
+        response: Respuesta de requests (stream=True)
+        prefix: Ruta ijson de lo que se quiere recorrer: 'elements.item'
+            (cada elemento) o más adentro, ej 'elements.item.tags.name'
+            para armar solo los nombres
+
+    Raises:
+        RuntimeError: si Overpass reporta un error en "remark" (timeout o
+            memoria agotada del lado del servidor, con resultados parciales)
+    """
+    if IJSON_AVAILABLE:
+        response.raw.decode_content = True  # Descomprimir gzip
+        reader = _TailReader(response.raw)
+        yield from ijson.items(reader, prefix, use_float=True)
+        match = _OVERPASS_REMARK_RE.search(reader.tail)
+        remark = json.loads(b'"' + match.group(1) + b'"') if match else ""
+    else:
+        data = _parse_json(response.content)
+        items = data.get("elements", [])
+        for key in prefix.split('.')[2:]:
+            items = [item[key] for item in items if isinstance(item, dict) and key in item]
+        yield from items
+        remark = data.get("remark", "")
+    
+    if "error" in remark.lower():
+        raise RuntimeError(f"Overpass: {remark}")
+
+
+def _iter_overpass_csv_values(response) -> Iterator[str]:
+    """
+    Primera columna de una respuesta Overpass [out:csv(<columna>, ::count; false)]
+    cuya query termina en "out count;".
+    
+    La salida CSV no trae el "remark" de error de Overpass: la fila final
+    de out count (primera columna vacía y el total) es la marca de que la
+    consulta terminó. Sin ella los resultados están truncados.
+    
+    Raises:
+        RuntimeError: si falta la fila de out count (timeout o memoria
+            agotada del lado del servidor)
+    """
+    response.encoding = 'utf-8'  # text/csv sin charset: requests asumiría latin-1
+    finished = False
+    for line in response.iter_lines(decode_unicode=True):
+        value, _, count = line.partition('\t')
+        if not value and count.isdigit():
+            finished = True
+        elif value:
+            yield value
+    
+    if not finished:
+        raise RuntimeError("Overpass: respuesta CSV incompleta (sin fila de out count)")
+
+
+@lru_cache(maxsize=1024)
+def _build_nearby_query(south: float, west: float, north: float, east: float, timeout: int) -> str:
+    """
+    Query Overpass de calles con nombre dentro de un bounding box.
+    
+    Las consultas se hacen por celda de coordenadas (ver
+    _get_nearby_streets_from_overpass), así que los bbox se repiten.
+    """
+    return f"""
+            [out:json][timeout:{timeout}];
+            (
+              way["highway"]["name"]({south},{west},{north},{east});
+            );
+            out geom;
+            """
+
+
+class StreetSegments(NamedTuple):
+    """
+    Calles en formato SoA: polilíneas concatenadas (mismo layout que GEOS).
+    
+    - coords: float64 (N, 2) con los vértices de todas las líneas
+    - offsets: int32 (L+1), la línea l es coords[offsets[l]:offsets[l+1]]
+    - street: int32 (L), posición en names de la calle de cada línea
+    - names: nombre de cada calle
+    """
+    coords: np.ndarray
+    offsets: np.ndarray
+    street: np.ndarray
+    names: List[str]
+
+
+def _street_segments(geometries: np.ndarray, names: List[str]) -> StreetSegments:
+    """Convierte las geometrías de las calles (LineString/MultiLineString) a arrays contiguos"""
+    parts, street = shapely.get_parts(geometries, return_index=True)
+    coords, line = shapely.get_coordinates(parts, return_index=True)
+    counts = np.bincount(line, minlength=len(parts))
+    offsets = np.zeros(len(parts) + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    
+    return StreetSegments(
+        coords=np.ascontiguousarray(coords, dtype=np.float64),
+        offsets=offsets,
+        street=street.astype(np.int32),
+        names=names
+    )
+
+
+def _build_address_query(south: float, west: float, north: float, east: float, timeout: int) -> str:
+    """
+    Query Overpass de direcciones (calle + número de puerta) dentro de un bounding box.
+    
+    Nodos, edificios y parcelas con addr:housenumber; "out center" da un
+    punto también para los ways/relations.
+    """
+    return f"""
+            [out:json][timeout:{timeout}];
+            nwr["addr:housenumber"]["addr:street"]({south},{west},{north},{east});
+            out center tags;
+            """
+
+
+def _intersection_points(intersection) -> np.ndarray:
+    """
+    Puntos de una intersección entre calles (ignora tramos superpuestos).
+    
+    Returns:
+        Array (N, 2) con (lon, lat) de cada punto, leído directo de GEOS
+    """
+    parts = shapely.get_parts(intersection)
+    points = parts[shapely.get_type_id(parts) == 0]  # 0 = Point
+    return shapely.get_coordinates(points)
+
+
+def _pairwise_intersection_points(geoms_a: np.ndarray, geoms_b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Intersecta los pares (geoms_a[k], geoms_b[k]) en una sola llamada a GEOS.
+    
+    Returns:
+        (coords, k): array (N, 2) con (lon, lat) de cada punto de cruce y,
+        para cada punto, el índice k del par del que sale (en orden)
+    """
+    intersections = shapely.intersection(geoms_a, geoms_b)
+    parts, index = shapely.get_parts(intersections, return_index=True)
+    is_point = shapely.get_type_id(parts) == 0  # 0 = Point (ignora tramos superpuestos)
+    return shapely.get_coordinates(parts[is_point]), index[is_point]
+
+
+def _project_streets(coordinates: Coordinates, streets: List[Dict]) -> Tuple[np.ndarray, float, float]:
+    """
+    Proyecta las calles y el punto a la zona UTM del punto (metros).
+    
+    Una sola llamada de transformación para todas las geometrías.
+    
+    Returns:
+        (geometrías proyectadas, x, y del punto)
+    """
+    to_utm = get_utm_transformer(coordinates.lat, coordinates.lon)
+    qx, qy = to_utm.transform(coordinates.lon, coordinates.lat)
+    geometries = shapely.transform(
+        np.array([street["geometry"] for street in streets], dtype=object),
+        lambda xy: np.column_stack(to_utm.transform(xy[:, 0], xy[:, 1]))
+    )
+    return geometries, qx, qy
+
+
+def _nearest_pair_points(geoms_a: np.ndarray, geoms_b: np.ndarray, bound2: np.ndarray,
+                         qx: float, qy: float, batch: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Puntos de cruce de los pares (geoms_a[k], geoms_b[k]) con poda por cota.
+    
+    Branch & bound: los pares se intersectan en lotes crecientes, de menor
+    a mayor cota inferior de distancia (bound2, al cuadrado), y se corta en
+    cuanto la cota supera la mejor distancia encontrada. Los pares que
+    quedan sin procesar no pueden tener un punto más cercano.
+    
+    Returns:
+        (coords, k) de los pares procesados, ordenados por k (así el
+        primer mínimo es el mismo que recorriendo todos los pares)
+    """
+    order = np.argsort(bound2, kind='stable')
+    found_points, found_k = [np.empty((0, 2))], [np.empty(0, dtype=np.intp)]
+    best = np.inf
+    start = 0
+    while start < len(order) and bound2[order[start]] <= best * (1 + 1e-9):
+        idx = order[start:start + batch]
+        points, k = _pairwise_intersection_points(geoms_a[idx], geoms_b[idx])
+        if len(points):
+            best = min(best, argmin_sqdist(points[:, 0], points[:, 1], qx, qy)[1])
+        found_points.append(points)
+        found_k.append(idx[k])
+        start += batch
+        batch *= 2
+    
+    points, k = np.concatenate(found_points), np.concatenate(found_k)
+    by_pair = np.argsort(k, kind='stable')
+    return points[by_pair], k[by_pair]
+
+
+def _squared_distances(xs: np.ndarray, ys: np.ndarray, qx: float, qy: float) -> np.ndarray:
+    """
+    Distancia euclídea AL CUADRADO de cada punto (xs, ys) al punto (qx, qy).
+    
+    Para ordenar o elegir el mínimo alcanza (la raíz es monótona): la raíz
+    se calcula solo para los puntos elegidos.
+    """
+    dy = np.asarray(ys, dtype=np.float64) - qy
+    dx = np.asarray(xs, dtype=np.float64) - qx
+    return dy * dy + dx * dx
+
+
+def _nearest_street_names(coordinates: Coordinates, streets: List[Dict],
+                          exclude: List[Optional[str]], limit: int) -> List[str]:
+    """
+    Las `limit` calles más cercanas al punto (distancia punto-segmento, en metros).
+    
+    Sin repetir nombres y sin las de exclude (comparadas normalizadas).
+    """
+    if not streets:
+        return []
+    geometries, qx, qy = _project_streets(coordinates, streets)
+    names = [street["name"] for street in streets]
+    segments = _street_segments(geometries, names)
+    d2 = street_min_sqdist(qx, qy, segments.coords, segments.offsets, segments.street, len(streets))
+    
+    excluded = {normalize_street_name(name) for name in exclude if name}
+    result = []
+    for i in np.argsort(d2, kind='stable'):
+        key = normalize_street_name(names[i])
+        if key not in excluded and np.isfinite(d2[i]):
+            excluded.add(key)
+            result.append(names[i])
+            if len(result) == limit:
+                break
+    return result
+
+
+def _nearest_per_name(labels: List[str], codes: np.ndarray, xs: np.ndarray, ys: np.ndarray,
+                      qx: float, qy: float, limit: int) -> List[Tuple[str, float]]:
+    """
+    Las `limit` calles más cercanas, cada una con su punto más cercano.
+    
+    Mínimo por calle en una pasada sobre los puntos y después nsmallest
+    sobre las calles (empates por orden de aparición de la calle): no se
+    ordenan todos los puntos para quedarse con dos. Los puntos llevan el
+    código entero de su calle, no el nombre.
+    
+    Args:
+        labels: Nombre de cada código
+        codes: int (N,) con el código de la calle de cada punto
+        xs, ys: Coordenadas de cada punto
+    
+    Returns:
+        Lista [(nombre, distancia)] ordenada de menor a mayor distancia
+    """
+    if not len(codes):
+        return []
+    d2 = _squared_distances(xs, ys, qx, qy)
+    best = np.full(len(labels), np.inf)
+    np.minimum.at(best, codes, d2)
+    # Desempate: posición del primer punto de cada calle
+    first_seen = np.full(len(labels), len(codes))
+    np.minimum.at(first_seen, codes, np.arange(len(codes)))
+    
+    present = np.flatnonzero(first_seen < len(codes)).tolist()
+    best_list, first_list = best.tolist(), first_seen.tolist()
+    nearest = heapq.nsmallest(limit, present, key=lambda c: (best_list[c], first_list[c]))
+    return [(labels[c], math.sqrt(best_list[c])) for c in nearest]
+
+
+def _invoke(func, *args, **kwargs):
+    """Llama func(*args, **kwargs); permite un solo RateLimiter para geocode y reverse"""
+    return func(*args, **kwargs)
 
 
 class GeocodingService:
@@ -53,7 +504,8 @@ class GeocodingService:
         self,
         primary_provider: str = "nominatim",
         cache_enabled: bool = True,
-        user_agent: str = "ruteo-inteligente-v1"
+        user_agent: str = "ruteo-inteligente-v1",
+        precision_decimals: int = 3
     ):
         """
         Inicializa el servicio de geocodificación.
@@ -62,20 +514,80 @@ class GeocodingService:
             primary_provider: Proveedor preferido ('nominatim', 'google', 'opencage')
             cache_enabled: Activar cache de resultados
             user_agent: User agent para las solicitudes
+            precision_decimals: Decimales de lat/lon para el cache por
+                coordenadas (3 ≈ celdas de 100 m)
         """
         self.primary_provider = primary_provider
         self.cache_enabled = cache_enabled
         self.user_agent = user_agent
+        self.precision_decimals = precision_decimals
         
         # Inicializar geocodificadores
         self.geocoders = self._initialize_geocoders()
         
-        # Cache en memoria (en producción usar Redis)
-        self._cache: Dict[str, Coordinates] = {}
+        # Cache persistente y compartido entre workers (Redis > disco > memoria)
+        self._cache = create_cache_backend()
+        
+        # Índices de nombres por departamento/localidad (autocompletado)
+        self._street_name_indexes: Dict[str, StreetNameIndex] = {}
         
-        # Rate limiting (tiempo mínimo entre requests)
-        self._last_request_time = 0
-        self._min_request_interval = 1.0  # Nominatim requiere 1 segundo entre requests
+        # Listados de calles pre-armados (prefetch_streets.py --listados)
+        self._street_lists = StreetListStore(STREETS_LIST_DB)
+        
+        # Direcciones que fallaron hace poco (no se reintentan) y errores del
+        # proveedor (geocoder u Overpass) en la geocodificación en curso de
+        # cada thread
+        self._failed_addresses = RecentFailures()
+        self._provider_errors = threading.local()
+        
+        # Aciertos / fallos del cache (direcciones, esquinas y reverse)
+        self._cache_counts: Counter = Counter()
+        self._cache_counts_lock = threading.Lock()
+        
+        # Memo del proceso para calles cercanas: evita el round-trip a Redis
+        # y decodificar WKB en cada punto de un lote
+        self._nearby_streets_memo = MemoryCacheBackend(
+            maxsize=NEARBY_STREETS_MEMO_SIZE, ttl=NEARBY_STREETS_MEMO_TTL
+        )
+        self._reverse_memo = MemoryCacheBackend(maxsize=REVERSE_MEMO_SIZE, ttl=REVERSE_MEMO_TTL)
+        
+        # Sesión HTTP compartida para Overpass: reutiliza conexiones TCP/TLS
+        # entre consultas en lugar de abrir una nueva por request
+        self._overpass_session = self._create_overpass_session()
+        
+        # Sesión HTTP para /search del Nominatim propio (camino caliente de
+        # geocode): evita el overhead de geopy y reutiliza conexiones
+        self._nominatim_session = requests.Session()
+        self._nominatim_session.headers.update({'User-Agent': self.user_agent})
+        self._nominatim_session.mount(
+            f"{NOMINATIM_SCHEME}://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=16)  # Reintentos: RateLimiter
+        )
+        
+        # Snapshot local de calles (prefetch_city): si existe, las geometrías
+        # y calles cercanas se resuelven en memoria sin ir a Overpass
+        self._street_index: Optional[StreetIndex] = StreetIndex.load()
+        # Snapshots por departamento (prefetch_department): se cargan la
+        # primera vez que se consulta un punto fuera del snapshot principal
+        self._department_indexes: Optional[List[StreetIndex]] = None
+        self._department_indexes_lock = threading.Lock()
+        
+        # Pool para consultas HTTP independientes (I/O-bound, el GIL no influye)
+        self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="geocoding-io")
+        
+        # Rate limiting por proveedor: RateLimiter de geopy es thread-safe, así
+        # que requests concurrentes no se saltean el intervalo mínimo. Un solo
+        # limitador por proveedor cubre geocode y reverse (mismo límite)
+        self._rate_limiters = {
+            name: RateLimiter(
+                _invoke,
+                min_delay_seconds=PROVIDER_MIN_DELAY_SECONDS.get(name, 1.0),
+                error_wait_seconds=5.0,
+                max_retries=2,
+                swallow_exceptions=False
+            )
+            for name in self.geocoders
+        }
         
         logger.info(f"GeocodingService inicializado con proveedor primario: {primary_provider}")
     
@@ -95,11 +607,11 @@ class GeocodingService:
             # Usar HTTP explícitamente para evitar problemas de SSL
             geocoders['nominatim'] = Nominatim(
                 user_agent=self.user_agent,
-                timeout=10,
-                domain="nominatim.riogas.uy",
-                scheme="http"  # ⭐ Forzar HTTP en lugar de HTTPS
+                timeout=NOMINATIM_TIMEOUT,
+                domain=NOMINATIM_DOMAIN,
+                scheme=NOMINATIM_SCHEME  # ⭐ Forzar HTTP en lugar de HTTPS
             )
-            logger.info(f"✓ Nominatim geocoder inicializado con servidor: http://nominatim.riogas.uy/")
+            logger.info(f"✓ Nominatim geocoder inicializado con servidor: {NOMINATIM_SCHEME}://{NOMINATIM_DOMAIN}/")
         except Exception as e:
             logger.warning(f"✗ No se pudo inicializar Nominatim: {e}")
         
@@ -132,12 +644,60 @@ class GeocodingService:
         
         return geocoders
     
+    def _create_overpass_session(self) -> requests.Session:
+        """
+        Crea la sesión HTTP para Overpass con pool de conexiones y reintentos.
+        
+        Reintenta errores de conexión y respuestas 429/5xx con backoff (las
+        consultas son de solo lectura, así que POST es seguro de repetir).
+        Los timeouts de lectura no se reintentan: cada llamador ya tiene su
+        propio fallback y no conviene acumular esperas.
+        """
+        session = requests.Session()
+        session.headers.update({'User-Agent': self.user_agent})
+        retry = Retry(
+            total=3,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=frozenset({'GET', 'POST'}),
+            raise_on_status=False  # El llamador revisa status_code y loguea
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _nominatim_search(self, query: str) -> Optional[dict]:
+        """
+        Llama /search del Nominatim propio directamente (sin geopy).
+        
+        Traduce los errores HTTP a las excepciones de geopy para que el
+        RateLimiter los reintente y los llamadores los manejen igual.
+        
+        Returns:
+            Primer resultado de Nominatim (dict con 'lat', 'lon', ...) o None
+        """
+        try:
+            response = self._nominatim_session.get(
+                f"{NOMINATIM_SCHEME}://{NOMINATIM_DOMAIN}/search",
+                params={"q": query, "format": "json", "limit": 1},
+                timeout=NOMINATIM_TIMEOUT
+            )
+        except requests.exceptions.Timeout as e:
+            raise GeocoderTimedOut(str(e))
+        except requests.exceptions.RequestException as e:
+            raise GeocoderUnavailable(str(e))
+        
+        if response.status_code != 200:
+            raise GeocoderServiceError(f"Nominatim HTTP {response.status_code}")
+        
+        results = _parse_json(response.content)
+        return results[0] if results else None
+    
     def _get_cache_key(self, address: str) -> str:
         """Genera una clave de cache normalizada para una dirección"""
-        # Normalizar: minúsculas, sin espacios extra, sin puntuación especial
-        normalized = address.lower().strip()
-        normalized = ' '.join(normalized.split())  # Normalizar espacios
-        return normalized
+        return _address_cache_key(address)
     
     def _check_cache(self, address: str) -> Optional[Coordinates]:
         """Verifica si la dirección está en cache"""
@@ -145,7 +705,18 @@ class GeocodingService:
             return None
         
         cache_key = self._get_cache_key(address)
-        return self._cache.get(cache_key)
+        data = self._cache.get(cache_key)
+        self._count_cache(hit=bool(data))
+        return Coordinates(**data) if data else None
+    
+    def _count_cache(self, hit: bool, n: int = 1):
+        """Registra aciertos/fallos del cache para get_cache_stats"""
+        self._count("hits" if hit else "misses", n)
+    
+    def _count(self, key: str, n: int = 1):
+        """Suma a un contador de get_cache_stats (geocode_many usa varios hilos)"""
+        with self._cache_counts_lock:
+            self._cache_counts[key] += n
     
     def _save_to_cache(self, address: str, coordinates: Coordinates):
         """Guarda coordenadas en cache"""
@@ -153,20 +724,60 @@ class GeocodingService:
             return
         
         cache_key = self._get_cache_key(address)
-        self._cache[cache_key] = coordinates
-        logger.debug(f"Cache guardado para: {address}")
+        self._cache.set(cache_key, coordinates.model_dump(), ttl=CACHE_TTL_SECONDS)
+        logger.debug("Cache guardado para: {}", address)
     
-    def _respect_rate_limit(self):
-        """Respeta el rate limit entre requests"""
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
+    def _intersection_cache_key(self, street1: str, street2: str, city: str, country: str) -> str:
+        """Clave de cache de una esquina (el orden de las calles no importa)"""
+        pair = "|".join(sorted([normalize_street_name(street1), normalize_street_name(street2)]))
+        return f"{INTERSECTION_CACHE_PREFIX}{pair}|{normalize_street_name(city)}|{normalize_street_name(country)}"
+    
+    def _first_cache_key(self, address: Address) -> Optional[str]:
+        """
+        Clave de cache que geocode() consulta primero para esta dirección.
+        
+        Debe seguir los mismos casos que geocode(): si esta clave está en
+        cache, geocode() retorna ese valor sin salir a la red.
         
-        if time_since_last_request < self._min_request_interval:
-            sleep_time = self._min_request_interval - time_since_last_request
-            logger.debug(f"Rate limiting: esperando {sleep_time:.2f}s")
-            time.sleep(sleep_time)
+        Returns:
+            La clave, o None si la dirección no pasa por el cache
+        """
+        if address.coordinates:
+            return None
+        if address.full_address:
+            return self._get_cache_key(address.full_address)
+        if address.street:
+            if address.number:
+                return self._get_cache_key(
+                    f"{address.street} {address.number}, {address.city}, {address.country}"
+                )
+            if address.corner_1:
+                return self._intersection_cache_key(
+                    address.street, address.corner_1, address.city, address.country
+                )
+            return self._get_cache_key(f"{address.street}, {address.city}, {address.country}")
+        if address.corner_1 and address.corner_2:
+            return self._intersection_cache_key(
+                address.corner_1, address.corner_2, address.city, address.country
+            )
+        if address.corner_1:
+            return self._get_cache_key(f"{address.corner_1}, {address.city}, {address.country}")
+        return None
+    
+    def _coord_cache_key(self, kind: str, lat: float, lon: float) -> str:
+        """Clave de cache para una celda de ~100 m (lat/lon redondeados)"""
+        p = self.precision_decimals
+        return f"{COORD_CACHE_PREFIX}{kind}:{round(lat, p)},{round(lon, p)}"
+    
+    def _call_provider(self, provider_name: str, method: str, *args, **kwargs):
+        """
+        Llama geocode/reverse de un proveedor respetando su rate limit.
         
-        self._last_request_time = time.time()
+        Los errores de servicio se reintentan (RateLimiter) y luego se
+        propagan para que el llamador los maneje.
+        """
+        geocoder = self.geocoders[provider_name]
+        return self._rate_limiters[provider_name](getattr(geocoder, method), *args, **kwargs)
     
     def _enrich_with_utm(self, coords: Coordinates) -> Coordinates:
         """
@@ -209,18 +820,21 @@ class GeocodingService:
             return None
         
         try:
-            logger.debug(f"Geocodificando con {provider_name}: {address}")
-            
-            # Respetar rate limit
-            self._respect_rate_limit()
+            logger.debug("Geocodificando con {}: {}", provider_name, address)
             
-            # Realizar geocodificación
-            location = geocoder.geocode(address)
+            # Realizar geocodificación (con rate limit del proveedor)
+            if provider_name == 'nominatim':
+                # Servidor propio: /search directo por la sesión persistente
+                result = self._rate_limiters[provider_name](self._nominatim_search, address)
+                location = (float(result['lat']), float(result['lon'])) if result else None
+            else:
+                result = self._call_provider(provider_name, 'geocode', address)
+                location = (result.latitude, result.longitude) if result else None
             
             if location:
                 coords = Coordinates(
-                    lat=location.latitude,
-                    lon=location.longitude
+                    lat=location[0],
+                    lon=location[1]
                 )
                 # Enriquecer con coordenadas UTM
                 coords = self._enrich_with_utm(coords)
@@ -232,21 +846,21 @@ class GeocodingService:
                 
         except GeocoderTimedOut:
             logger.error(f"⏱️  Timeout con {provider_name} para: {address}")
+            self._provider_errors.failed = True
             return None
         except (GeocoderServiceError, GeocoderUnavailable) as e:
             logger.error(f"❌ Error de servicio con {provider_name}: {e}")
+            self._provider_errors.failed = True
             return None
         except Exception as e:
             logger.error(f"❌ Error inesperado con {provider_name}: {e}")
+            self._provider_errors.failed = True
             return None
     
     def _get_street_geometry_from_overpass(self, street_name: str, city: str, country: str, timeout: int = 10) -> Optional[LineString]:
         """
         Obtiene la geometría completa de una calle desde Overpass API.
         
-        OPTIMIZACIÓN: Usa bounding box de Montevideo en lugar de búsqueda por área
-        para evitar timeouts.
-        
         Args:
             street_name: Nombre de la calle
             city: Ciudad
@@ -254,72 +868,122 @@ class GeocodingService:
             timeout: Timeout en segundos para la consulta
             
         Returns:
-            LineString con la geometría de la calle o None si falla
+            Geometría de la calle (unión de sus ways) o None si falla
         """
-        try:
-            # URL de Overpass API
-            overpass_url = "https://overpass-api.de/api/interpreter"
+        return self._get_street_geometries_batch([street_name], timeout=timeout).get(street_name)
+    
+    def _get_street_geometries_batch(self, names: List[str], timeout: int = 10) -> Dict[str, object]:
+        """
+        Obtiene las geometrías de varias calles con UNA sola consulta Overpass.
+        
+        OPTIMIZACIÓN: Usa bounding box de Montevideo en lugar de búsqueda por área
+        para evitar timeouts, y una alternancia de regex ("^(calle1|calle2)$")
+        en lugar de una consulta por calle.
+        
+        Args:
+            names: Nombres exactos de las calles
+            timeout: Timeout en segundos para la consulta
             
+        Returns:
+            Diccionario {nombre: geometría} con las calles encontradas
+            (los ways de una misma calle se agrupan en un MultiLineString)
+        """
+        result = {}
+        
+        # Primero el snapshot local; a Overpass solo van las que no están
+        if self._street_index is not None:
+            for name in names:
+                geom = self._street_index.get(name)
+                if geom is not None:
+                    result[name] = geom
+            names = [name for name in names if name not in result]
+            if not names:
+                return result
+        
+        try:
             # Bounding box de Montevideo (sur, oeste, norte, este)
             # Esto es MUCHO más rápido que buscar por área
-            bbox = "-34.95,-56.25,-34.75,-56.05"  # Montevideo aproximado
+            bbox = _MONTEVIDEO_BBOX_QL  # Montevideo aproximado
+            
+            # Regex anclada con los nombres escapados; luego se escapan
+            # barras y comillas para el string literal de Overpass QL
+            pattern = "^(" + "|".join(_ERE_SPECIAL.sub(r"\\\1", name) for name in dict.fromkeys(names)) + ")$"
+            pattern = pattern.replace('\\', '\\\\').replace('"', '\\"')
             
             # Query optimizada con bounding box
             query = f"""
             [out:json][timeout:{timeout}][bbox:{bbox}];
-            way["highway"]["name"="{street_name}"];
+            way["highway"]["name"~"{pattern}"];
             out geom;
             """
             
-            logger.debug(f"🌐 Overpass: {street_name} en bbox {bbox}")
-            
-            response = requests.post(overpass_url, data={"data": query}, timeout=timeout + 5)
-            
-            if response.status_code != 200:
-                logger.warning(f"⚠️ Overpass status {response.status_code}")
-                return None
-            
-            data = response.json()
-            
-            # Verificar si hubo error de runtime
-            if 'remark' in data and 'error' in data['remark'].lower():
-                logger.warning(f"⚠️ Overpass error: {data['remark']}")
-                return None
-            
-            if not data.get("elements"):
-                logger.warning(f"⚠️ Overpass: sin resultados para {street_name}")
-                return None
-            
-            # Extraer coordenadas de todos los ways encontrados
-            all_coords = []
-            for element in data["elements"]:
-                if element.get("type") == "way" and element.get("geometry"):
-                    coords = [(node["lon"], node["lat"]) for node in element["geometry"]]
-                    all_coords.extend(coords)
-            
-            if not all_coords:
-                logger.warning(f"⚠️ Sin coordenadas en respuesta Overpass")
-                return None
+            logger.opt(lazy=True).debug("🌐 Overpass: {} en bbox {}", lambda: ' | '.join(names), lambda: bbox)
             
-            # Construir LineString
-            line = LineString(all_coords)
-            logger.info(f"✓ Geometría: {street_name} ({len(all_coords)} puntos, {len(data['elements'])} ways)")
+            with self._overpass_session.post(
+                OVERPASS_URL, data={"data": query}, timeout=timeout + 5, stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.warning(f"⚠️ Overpass status {response.status_code}")
+                    self._provider_errors.failed = True
+                    return result
+                
+                # Agrupar los ways por nombre de calle (a medida que llegan;
+                # un "remark" de error de runtime corta con excepción)
+                segments: Dict[str, List[LineString]] = {}
+                for element in _iter_overpass_elements(response):
+                    if element.get("type") == "way" and element.get("geometry"):
+                        name = element.get("tags", {}).get("name", "")
+                        coords = [(node["lon"], node["lat"]) for node in element["geometry"]]
+                        if len(coords) >= 2:
+                            segments.setdefault(name, []).append(LineString(coords))
+            
+            for name in names:
+                if name not in segments:
+                    logger.warning(f"⚠️ Overpass: sin resultados para {name}")
+                    continue
+                lines = segments[name]
+                result[name] = lines[0] if len(lines) == 1 else MultiLineString(lines)
+                logger.info(f"✓ Geometría: {name} ({len(lines)} ways)")
             
-            return line
+            return result
             
         except requests.exceptions.Timeout:
-            logger.warning(f"⏱️ Overpass timeout >{timeout}s: {street_name}")
-            return None
+            logger.warning(f"⏱️ Overpass timeout >{timeout}s: {', '.join(names)}")
+            self._provider_errors.failed = True
+            return result
         except Exception as e:
             logger.error(f"❌ Error Overpass: {e}")
-            return None
+            self._provider_errors.failed = True
+            return result
     
     def _calculate_intersection(self, street1: str, street2: str, city: str, country: str) -> Optional[Coordinates]:
+        """
+        Intersección entre dos calles, cacheada por par de calles.
+        
+        Las mismas esquinas se repiten pedido tras pedido: con el cache
+        ("Rivera y Soca" == "soca y rivera") no se vuelve a Overpass ni a
+        calcular la intersección.
+        """
+        cache_key = self._intersection_cache_key(street1, street2, city, country)
+        if self.cache_enabled:
+            data = self._cache.get(cache_key)
+            self._count_cache(hit=bool(data))
+            if data:
+                logger.info(f"✓ Intersección en cache: {street1} ∩ {street2}")
+                return Coordinates(**data)
+        
+        coords = self._compute_intersection(street1, street2, city, country)
+        
+        if coords and self.cache_enabled:
+            self._cache.set(cache_key, coords.model_dump(), ttl=CACHE_TTL_SECONDS)
+        return coords
+    
+    def _compute_intersection(self, street1: str, street2: str, city: str, country: str) -> Optional[Coordinates]:
         """
         Calcula la intersección GEOMÉTRICA REAL entre dos calles.
         
         ESTRATEGIA MEJORADA (PRO):
-        1. Obtiene geometrías completas (LineStrings) de ambas calles desde Overpass API
+        1. Obtiene geometrías completas de ambas calles con una consulta Overpass
         2. Calcula la intersección geométrica real entre las dos líneas
         3. Retorna el punto exacto donde se cruzan
         
@@ -338,47 +1002,43 @@ class GeocodingService:
         try:
             logger.info(f"🔍 Intersección GEOMÉTRICA: {street1} ∩ {street2}")
             
-            # PASO 1: Obtener geometrías con timeout 8s cada una
-            geom1 = self._get_street_geometry_from_overpass(street1, city, country, timeout=8)
+            # PASO 1: Obtener ambas geometrías en una sola consulta (timeout 8s)
+            geoms = self._get_street_geometries_batch([street1, street2], timeout=8)
             
-            # Si la primera falla, hacer fallback inmediato (no esperar la segunda)
-            if not geom1:
-                logger.warning(f"⚠️ {street1} no disponible en Overpass, fallback inmediato")
-                return self._calculate_intersection_fallback(street1, street2, city, country)
+            for name in (street1, street2):
+                if not geoms.get(name):
+                    logger.warning(f"⚠️ {name} no disponible en Overpass, fallback inmediato")
+                    return self._calculate_intersection_fallback(street1, street2, city, country)
             
-            geom2 = self._get_street_geometry_from_overpass(street2, city, country, timeout=8)
+            geom1, geom2 = geoms[street1], geoms[street2]
             
-            if not geom2:
-                logger.warning(f"⚠️ {street2} no disponible en Overpass, fallback")
+            # PASO 2: Calcular intersección geométrica. El predicado es mucho
+            # más barato que construir la intersección: si no se cruzan (ej:
+            # calles paralelas) se va directo al fallback
+            if not shapely.intersects(geom1, geom2):
+                logger.warning(f"⚠️ Sin cruce geométrico")
                 return self._calculate_intersection_fallback(street1, street2, city, country)
             
-            # PASO 2: Calcular intersección geométrica
-            intersection = geom1.intersection(geom2)
+            intersection = shapely.intersection(geom1, geom2)
             
-            # Verificar que la intersección sea un punto
-            if isinstance(intersection, Point):
-                coords = Coordinates(lat=intersection.y, lon=intersection.x)
-                coords = self._enrich_with_utm(coords)
-                logger.info(f"✅ Intersección EXACTA: {coords}")
-                return coords
-            elif not intersection.is_empty:
-                # Si es una colección de puntos, tomar el primero
-                if hasattr(intersection, 'geoms'):
-                    first_point = list(intersection.geoms)[0]
-                    if isinstance(first_point, Point):
-                        coords = Coordinates(lat=first_point.y, lon=first_point.x)
-                        coords = self._enrich_with_utm(coords)
-                        logger.info(f"✅ Intersección EXACTA (múltiple, 1ro): {coords}")
-                        return coords
-            else:
+            # Puntos de cruce (si hay varios, se toma el primero)
+            points = _intersection_points(intersection)
+            if len(points) == 0:
                 logger.warning(f"⚠️ Sin cruce geométrico")
                 return self._calculate_intersection_fallback(street1, street2, city, country)
             
+            lon, lat = points[0]
+            coords = Coordinates(lat=float(lat), lon=float(lon))
+            coords = self._enrich_with_utm(coords)
+            if len(points) == 1:
+                logger.info(f"✅ Intersección EXACTA: {coords}")
+            else:
+                logger.info(f"✅ Intersección EXACTA (múltiple, 1ro): {coords}")
+            return coords
+            
         except Exception as e:
             logger.error(f"❌ Error intersección: {e}")
             return self._calculate_intersection_fallback(street1, street2, city, country)
-        
-        return None
     
     def _calculate_intersection_fallback(self, street1: str, street2: str, city: str, country: str) -> Optional[Coordinates]:
         """
@@ -393,37 +1053,38 @@ class GeocodingService:
             if not geocoder:
                 return None
             
-            self._respect_rate_limit()
-            loc1 = geocoder.geocode(f"{street1}, {city}, {country}", exactly_one=False, limit=5)
-            
-            self._respect_rate_limit()
-            loc2 = geocoder.geocode(f"{street2}, {city}, {country}", exactly_one=False, limit=5)
+            loc1 = self._call_provider(
+                self.primary_provider, 'geocode',
+                f"{street1}, {city}, {country}", exactly_one=False, limit=5
+            )
+            loc2 = self._call_provider(
+                self.primary_provider, 'geocode',
+                f"{street2}, {city}, {country}", exactly_one=False, limit=5
+            )
             
             if not loc1 or not loc2:
                 return None
             
-            # Encontrar puntos más cercanos
-            min_distance = float('inf')
-            best_point = None
-            
-            for l1 in loc1:
-                for l2 in loc2:
-                    dist = ((l1.latitude - l2.latitude)**2 + (l1.longitude - l2.longitude)**2)**0.5
-                    if dist < min_distance:
-                        min_distance = dist
-                        best_point = Coordinates(
-                            lat=(l1.latitude + l2.latitude) / 2,
-                            lon=(l1.longitude + l2.longitude) / 2
-                        )
-            
-            if best_point:
-                # Enriquecer con coordenadas UTM
-                best_point = self._enrich_with_utm(best_point)
-                logger.info(f"✓ Intersección APROXIMADA: {street1} ∩ {street2}")
-                return best_point
+            # Encontrar puntos más cercanos: matriz de distancias al cuadrado
+            # (len(loc1) x len(loc2); para el mínimo no hace falta la raíz)
+            a = np.array([(l.latitude, l.longitude) for l in loc1], dtype=np.float64)
+            b = np.array([(l.latitude, l.longitude) for l in loc2], dtype=np.float64)
+            d2 = np.sum((a[:, None, :] - b[None, :, :]) ** 2, axis=-1)
+            i, j = np.unravel_index(np.argmin(d2), d2.shape)  # Primer mínimo
+            
+            best_point = Coordinates(
+                lat=(a[i, 0] + b[j, 0]) / 2,
+                lon=(a[i, 1] + b[j, 1]) / 2
+            )
+            
+            # Enriquecer con coordenadas UTM
+            best_point = self._enrich_with_utm(best_point)
+            logger.info(f"✓ Intersección APROXIMADA: {street1} ∩ {street2}")
+            return best_point
                 
         except Exception as e:
             logger.error(f"❌ Error fallback: {e}")
+            self._provider_errors.failed = True
         
         return None
     
@@ -447,6 +1108,14 @@ class GeocodingService:
             logger.debug("Dirección ya tiene coordenadas, usando las existentes")
             return address.coordinates
         
+        # Falló hace poco: no volver a consultar al proveedor
+        failure_digest = RecentFailures.digest(address)
+        if failure_digest in self._failed_addresses:
+            self._count("failed_hits")
+            logger.info("⏭️  Dirección que falló recientemente, sin reintentar")
+            return None
+        self._provider_errors.failed = False
+        
         # CASO 1: Dirección completa proporcionada
         if address.full_address:
             cache_key = address.full_address
@@ -537,12 +1206,44 @@ class GeocodingService:
         
         # Si llegamos aquí, no se pudo geocodificar
         logger.error(f"❌ No se pudo geocodificar la dirección proporcionada")
+        # Solo si el proveedor respondió sin resultados: tras un timeout o un
+        # error de servicio se reintenta en el próximo request
+        if not self._provider_errors.failed:
+            self._failed_addresses.add(failure_digest)
+        return None
+    
+    def _covering_street_index(self, lat: float, lon: float, radius: float) -> Optional[StreetIndex]:
+        """
+        Snapshot local que cubre el cuadrado lat/lon ± radius, si hay alguno.
+        
+        Primero el de Montevideo, después los de departamentos (cargados de
+        disco la primera vez que hacen falta).
+        """
+        if self._street_index is not None and self._street_index.covers(lat, lon, radius):
+            return self._street_index
+        
+        if self._department_indexes is None:
+            with self._department_indexes_lock:
+                if self._department_indexes is None:
+                    self._department_indexes = StreetIndex.load_all(DEPARTMENT_SNAPSHOT_DIR)
+        
+        for index in self._department_indexes:
+            if index.covers(lat, lon, radius):
+                return index
         return None
     
     def _get_nearby_streets_from_overpass(self, lat: float, lon: float, radius: float = 0.0005, timeout: int = 10):
         """
         Obtiene todas las calles cercanas a un punto usando Overpass API.
         
+        Cachea por celda de coordenadas (precision_decimals): la consulta
+        cubre la celda completa más el radio, así el resultado sirve para
+        cualquier punto de la celda (entregas agrupadas en pocas cuadras).
+        Primero se busca en un memo del proceso (geometrías ya armadas),
+        después en el cache compartido. Si Overpass falla, la celda queda
+        vacía en el memo por NEARBY_STREETS_FAILURE_TTL segundos para no
+        repetir la consulta por cada punto del lote.
+        
         Args:
             lat: Latitud del punto
             lon: Longitud del punto
@@ -552,62 +1253,150 @@ class GeocodingService:
         Returns:
             Lista de diccionarios con {name: str, geometry: LineString}
         """
+        # Snapshot local: sin red ni cache
+        index = self._covering_street_index(lat, lon, radius)
+        if index is not None:
+            return index.nearby(lat, lon, radius)
+        
+        p = self.precision_decimals
+        center_lat, center_lon = round(lat, p), round(lon, p)
+        cache_key = self._coord_cache_key(f"streets:{radius}", lat, lon)
+        
+        if self.cache_enabled:
+            memo = self._nearby_streets_memo.get(cache_key)
+            if memo is not None:
+                return memo
+            
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug("   💾 Calles cercanas desde cache: {}", cache_key)
+                wkbs = [s["wkb"] for s in cached]
+                streets = [
+                    {"name": s["name"], "geometry": geometry}
+                    for s, geometry in zip(cached, shapely.from_wkb(wkbs))
+                ]
+                self._nearby_streets_memo.set(cache_key, streets)
+                return streets
+        
+        # Radio ampliado en media celda para cubrir cualquier punto de la celda
+        streets = self._fetch_nearby_streets(
+            center_lat, center_lon, radius + 0.5 * 10 ** -p, timeout
+        )
+        
+        if streets is None:
+            if self.cache_enabled:
+                self._nearby_streets_memo.set(cache_key, [], ttl=NEARBY_STREETS_FAILURE_TTL)
+            return []
+        
+        if self.cache_enabled:
+            self._nearby_streets_memo.set(cache_key, streets)
+            if streets:
+                self._cache.set(
+                    cache_key,
+                    [{"name": s["name"], "wkb": shapely.to_wkb(s["geometry"], hex=True)} for s in streets],
+                    ttl=CACHE_TTL_SECONDS
+                )
+        return streets
+    
+    def _get_nearest_address_from_overpass(self, lat: float, lon: float,
+                                           radius: float = REVERSE_ADDRESS_RADIUS,
+                                           timeout: int = 8) -> Optional[Dict[str, str]]:
+        """
+        Dirección (tags addr:*) más cercana al punto, según OSM vía Overpass.
+        
+        Permite resolver el reverse geocoding sin pasar por Nominatim (y su
+        rate limit) cuando hay una puerta mapeada a pocos metros.
+        
+        Returns:
+            Tags del elemento más cercano (addr:street, addr:housenumber,
+            addr:city, ...) o None si no hay ninguno o la consulta falló
+        """
         try:
-            overpass_url = "https://overpass-api.de/api/interpreter"
+            query = _build_address_query(lat - radius, lon - radius, lat + radius, lon + radius, timeout)
+            
+            with self._overpass_session.post(
+                OVERPASS_URL,
+                data={"data": query},
+                timeout=timeout + 5,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.warning(f"   ⚠️  Overpass retornó código {response.status_code}")
+                    return None
+                
+                tags, lons, lats = [], [], []
+                for element in _iter_overpass_elements(response):
+                    position = element.get("center", element)
+                    if "lat" in position and "lon" in position:
+                        tags.append(element.get("tags", {}))
+                        lons.append(position["lon"])
+                        lats.append(position["lat"])
+            
+            if not tags:
+                return None
             
+            # Más cercana en metros (UTM), no en grados
+            to_utm = get_utm_transformer(lat, lon)
+            xs, ys = to_utm.transform(np.array(lons, dtype=np.float64), np.array(lats, dtype=np.float64))
+            qx, qy = to_utm.transform(lon, lat)
+            best, _ = argmin_sqdist(np.asarray(xs), np.asarray(ys), qx, qy)
+            return tags[best]
+            
+        except Exception as e:
+            logger.warning(f"   ⚠️  Error obteniendo direcciones de Overpass: {e}")
+            return None
+    
+    def _fetch_nearby_streets(self, lat: float, lon: float, radius: float, timeout: int):
+        """
+        Consulta Overpass por las calles en el cuadrado lat/lon ± radius.
+        
+        Returns:
+            Lista de {name, geometry} (vacía si no hay calles) o None si la
+            consulta falló
+        """
+        try:
             # Crear bounding box alrededor del punto
             south = lat - radius
             north = lat + radius
             west = lon - radius
             east = lon + radius
             
-            query = f"""
-            [out:json][timeout:{timeout}];
-            (
-              way["highway"]["name"]({south},{west},{north},{east});
-            );
-            out geom;
-            """
+            query = _build_nearby_query(south, west, north, east, timeout)
             
-            logger.debug(f"   🔍 Buscando calles cerca de ({lat:.6f}, {lon:.6f}) en radio {radius}")
+            logger.debug("   🔍 Buscando calles cerca de ({:.6f}, {:.6f}) en radio {}", lat, lon, radius)
             
-            response = requests.post(
-                overpass_url,
+            with self._overpass_session.post(
+                OVERPASS_URL,
                 data={"data": query},
-                timeout=timeout + 5
-            )
-            
-            if response.status_code != 200:
-                logger.warning(f"   ⚠️  Overpass retornó código {response.status_code}")
-                return []
-            
-            data = response.json()
-            
-            # Verificar si hay error
-            if "remark" in data and "error" in data.get("remark", "").lower():
-                logger.warning(f"   ⚠️  Overpass error: {data.get('remark')}")
-                return []
-            
-            # Agrupar segmentos por nombre de calle
-            streets_segments = {}  # {name: [LineString1, LineString2, ...]}
-            
-            for element in data.get("elements", []):
-                if element.get("type") == "way" and element.get("geometry"):
-                    street_name = element.get("tags", {}).get("name", "")
-                    if not street_name:
-                        continue
-                    
-                    coords = [(node["lon"], node["lat"]) for node in element["geometry"]]
-                    
-                    if len(coords) >= 2:
-                        line = LineString(coords)
+                timeout=timeout + 5,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.warning(f"   ⚠️  Overpass retornó código {response.status_code}")
+                    return None
+                
+                # Agrupar segmentos por nombre de calle (parseo incremental;
+                # un "remark" de error corta con excepción)
+                streets_segments = {}  # {name: [LineString1, LineString2, ...]}
+                
+                for element in _iter_overpass_elements(response):
+                    if element.get("type") == "way" and element.get("geometry"):
+                        street_name = element.get("tags", {}).get("name", "")
+                        if not street_name:
+                            continue
                         
-                        if street_name in streets_segments:
-                            streets_segments[street_name].append(line)
-                        else:
-                            streets_segments[street_name] = [line]
+                        coords = [(node["lon"], node["lat"]) for node in element["geometry"]]
+                        
+                        if len(coords) >= 2:
+                            line = LineString(coords)
+                            
+                            if street_name in streets_segments:
+                                streets_segments[street_name].append(line)
+                            else:
+                                streets_segments[street_name] = [line]
             
-            # Combinar segmentos de la misma calle usando unary_union
+            # Agrupar segmentos de la misma calle. Un MultiLineString alcanza
+            # para intersection/distance y evita el noding de unary_union
             result = []
             for name, segments in streets_segments.items():
                 if len(segments) == 1:
@@ -617,19 +1406,19 @@ class GeocodingService:
                         "geometry": segments[0]
                     })
                 else:
-                    # Múltiples segmentos, combinar con unary_union
-                    combined = unary_union(segments)
+                    # Múltiples segmentos, agrupar sin disolver
+                    combined = MultiLineString(segments)
                     result.append({
                         "name": name,
                         "geometry": combined
                     })
             
-            logger.debug(f"   📍 Encontradas {len(result)} calles cerca del punto")
+            logger.debug("   📍 Encontradas {} calles cerca del punto", len(result))
             return result
             
         except Exception as e:
             logger.warning(f"   ⚠️  Error obteniendo calles cercanas de Overpass: {e}")
-            return []
+            return None
     
     def _find_nearest_intersection(self, coordinates: Coordinates, streets: list, prefer_street: Optional[str] = None):
         """
@@ -638,147 +1427,174 @@ class GeocodingService:
         NUEVO: Si se proporciona prefer_street (calle principal), busca las DOS calles
         transversales más cercanas que intersectan con ella (una a cada lado).
         
+        Las calles y el punto se proyectan una vez a UTM (zona del punto):
+        todo el cálculo es en metros sobre un plano local, sin la distorsión
+        de medir distancias en grados (a la latitud de Montevideo un grado
+        de longitud mide ~18% menos que uno de latitud).
+        
         Args:
             coordinates: Punto de referencia
-            streets: Lista de diccionarios {name, geometry}
+            streets: Lista de diccionarios {name, geometry} (lon/lat)
             prefer_street: Nombre de calle principal (para encontrar transversales)
             
         Returns:
             Tupla (corner_1, corner_2, distance) o None si no hay intersección
+            (distance en metros)
         """
-        from itertools import combinations
-        from math import sqrt
+        geometries, qx, qy = _project_streets(coordinates, streets)
+        
+        # Índice espacial de las calles: con predicate='intersects' el árbol
+        # descarta por bounding box y luego por cruce real, todo dentro de GEOS
+        tree = STRtree(geometries)
         
         # CASO 1: Si hay calle preferida, buscar calles TRANSVERSALES
         if prefer_street:
-            # Encontrar la geometría de la calle principal
-            main_street_geom = None
-            main_street_name = None
-            
-            prefer_normalized = prefer_street.lower()
+            # Nombres normalizados una sola vez (el snapshot ya los trae)
+            normalized = [
+                street.get("norm") or normalize_street_name(street["name"])
+                for street in streets
+            ]
+            prefer_normalized = normalize_street_name(prefer_street)
+            
+            def is_main_street(name_normalized: str) -> bool:
+                return prefer_normalized in name_normalized or name_normalized in prefer_normalized
+            
+            # Encontrar la calle principal: coincidencia exacta y, si no hay,
+            # la primera que la contenga (o esté contenida en ella)
+            if prefer_normalized in normalized:
+                main_index = normalized.index(prefer_normalized)
+            else:
+                main_index = next((i for i, name in enumerate(normalized) if is_main_street(name)), None)
             
-            for street in streets:
-                name_normalized = street["name"].lower()
-                # Verificar si es la calle principal
-                if prefer_normalized in name_normalized or name_normalized in prefer_normalized:
-                    main_street_geom = street["geometry"]
-                    main_street_name = street["name"]
-                    break
+            main_street_geom = geometries[main_index] if main_index is not None else None
             
             if main_street_geom:
-                # Buscar todas las calles que intersectan con la principal
-                # Usar diccionario para agrupar por nombre (evitar duplicados)
-                cross_streets_dict = {}
+                # Solo calles que cruzan la principal, sin la principal misma
+                # (en el orden original, para conservar los desempates)
+                candidates = np.array([
+                    i for i in np.sort(tree.query(main_street_geom, predicate='intersects'))
+                    if not is_main_street(normalized[i])
+                ], dtype=np.intp)
                 
-                for street in streets:
-                    # Saltar si es la misma calle principal
-                    street_normalized = street["name"].lower()
-                    if prefer_normalized in street_normalized or street_normalized in prefer_normalized:
-                        continue
-                    
-                    street_name = street["name"]
-                    
-                    try:
-                        intersection = main_street_geom.intersection(street["geometry"])
-                        
-                        if intersection.is_empty:
-                            continue
-                        
-                        # Obtener puntos de intersección
-                        points = []
-                        if isinstance(intersection, Point):
-                            points = [intersection]
-                        elif hasattr(intersection, 'geoms'):
-                            points = [p for p in intersection.geoms if isinstance(p, Point)]
-                        
-                        # Para cada calle, guardar SOLO la intersección más cercana
-                        for point in points:
-                            dist = sqrt(
-                                (point.y - coordinates.lat) ** 2 +
-                                (point.x - coordinates.lon) ** 2
-                            )
-                            
-                            # Si esta calle ya existe, quedarse con la intersección más cercana
-                            if street_name in cross_streets_dict:
-                                if dist < cross_streets_dict[street_name]["distance"]:
-                                    cross_streets_dict[street_name] = {
-                                        "name": street_name,
-                                        "distance": dist,
-                                        "point": point
-                                    }
-                            else:
-                                cross_streets_dict[street_name] = {
-                                    "name": street_name,
-                                    "distance": dist,
-                                    "point": point
-                                }
-                    except Exception as e:
-                        logger.debug(f"   ⚠️  Error calculando intersección con {street['name']}: {e}")
-                        continue
+                # Puntos de cruce con la principal en arrays paralelos (SoA):
+                # índice del par (calle transversal) y coordenadas de cada punto
+                try:
+                    points, k = _pairwise_intersection_points(
+                        np.full(len(candidates), main_street_geom, dtype=object),
+                        geometries[candidates]
+                    )
+                except Exception as e:
+                    logger.debug(f"   ⚠️  Error calculando intersecciones con {streets[main_index]['name']}: {e}")
+                    points, k = np.empty((0, 2)), np.empty(0, dtype=np.intp)
+                # Código entero por nombre (una vez por calle, no por punto)
+                name_codes = {}
+                candidate_codes = np.array(
+                    [name_codes.setdefault(streets[i]["name"], len(name_codes)) for i in candidates],
+                    dtype=np.intp
+                )
                 
-                # Convertir diccionario a lista y ordenar por distancia
-                cross_streets = list(cross_streets_dict.values())
-                cross_streets.sort(key=lambda x: x["distance"])
+                # Para cada calle, SOLO la intersección más cercana; ordenadas por distancia
+                cross_streets = _nearest_per_name(
+                    list(name_codes), candidate_codes[k], points[:, 0], points[:, 1], qx, qy, limit=2
+                )
                 
                 # Tomar las 2 calles DIFERENTES más cercanas
                 if len(cross_streets) >= 2:
-                    corner_1 = cross_streets[0]["name"]
-                    corner_2 = cross_streets[1]["name"]
-                    avg_dist = (cross_streets[0]["distance"] + cross_streets[1]["distance"]) / 2
+                    (corner_1, dist_1), (corner_2, dist_2) = cross_streets
+                    avg_dist = (dist_1 + dist_2) / 2
                     
-                    logger.debug(f"   ✅ Esquinas transversales: {corner_1} (dist: {cross_streets[0]['distance']:.6f}) y {corner_2} (dist: {cross_streets[1]['distance']:.6f})")
+                    logger.debug("   ✅ Esquinas transversales: {} ({:.1f} m) y {} ({:.1f} m)", corner_1, dist_1, corner_2, dist_2)
                     
                     return (corner_1, corner_2, avg_dist)
                 elif len(cross_streets) == 1:
                     # Solo hay una calle transversal cercana
-                    logger.debug(f"   ⚠️  Solo se encontró una esquina transversal: {cross_streets[0]['name']}")
-                    return (cross_streets[0]["name"], None, cross_streets[0]["distance"])
+                    logger.debug("   ⚠️  Solo se encontró una esquina transversal: {}", cross_streets[0][0])
+                    return (cross_streets[0][0], None, cross_streets[0][1])
         
         # CASO 2: Sin calle preferida - buscar cualquier intersección cercana
-        best_intersection = None
-        min_distance = float('inf')
         
-        for street1, street2 in combinations(streets, 2):
-            try:
-                geom1 = street1["geometry"]
-                geom2 = street2["geometry"]
-                
-                intersection = geom1.intersection(geom2)
-                
-                if intersection.is_empty:
-                    continue
-                
-                points = []
-                if isinstance(intersection, Point):
-                    points = [intersection]
-                elif hasattr(intersection, 'geoms'):
-                    points = [p for p in intersection.geoms if isinstance(p, Point)]
-                
-                for point in points:
-                    dist = sqrt(
-                        (point.y - coordinates.lat) ** 2 +
-                        (point.x - coordinates.lon) ** 2
-                    )
-                    
-                    if dist < min_distance:
-                        min_distance = dist
-                        best_intersection = (street1["name"], street2["name"], dist)
-                        
-            except Exception as e:
-                logger.debug(f"   ⚠️  Error calculando intersección: {e}")
-                continue
+        # Pares (i, j) con i < j que se cruzan, en el mismo orden que
+        # itertools.combinations
+        left, right = tree.query(geometries, predicate='intersects')
+        keep = left < right
+        order = np.lexsort((right[keep], left[keep]))
+        left, right = left[keep][order], right[keep][order]
+        
+        # Cota inferior por par: un punto de cruce está sobre ambas calles,
+        # así que dista del punto al menos lo que la más lejana de las dos
+        # (distancia punto-segmento, en una pasada sobre los arrays SoA)
+        segments = _street_segments(geometries, [street["name"] for street in streets])
+        street_d2 = street_min_sqdist(qx, qy, segments.coords, segments.offsets, segments.street, len(streets))
+        bound2 = np.maximum(street_d2[left], street_d2[right])
+        
+        try:
+            points, k = _nearest_pair_points(geometries[left], geometries[right], bound2, qx, qy)
+        except Exception as e:
+            logger.debug(f"   ⚠️  Error calculando intersecciones: {e}")
+            points, k = np.empty((0, 2)), np.empty(0, dtype=np.intp)
+        
+        best_intersection = None
+        best, best_d2 = argmin_sqdist(points[:, 0], points[:, 1], qx, qy)  # Primera en caso de empate
+        if best >= 0:
+            i, j = left[k[best]], right[k[best]]
+            best_intersection = (streets[i]["name"], streets[j]["name"], float(np.sqrt(best_d2)))
         
         if best_intersection:
-            logger.debug(f"   ✅ Intersección más cercana: {best_intersection[0]} y {best_intersection[1]} (dist: {best_intersection[2]:.6f})")
+            logger.debug("   ✅ Intersección más cercana: {} y {} ({:.1f} m)", *best_intersection)
         
         return best_intersection
     
     def reverse_geocode(self, coordinates: Coordinates) -> Optional[Address]:
+        """
+        Geocodificación inversa, cacheada por celda geohash
+        (REVERSE_CACHE_GEOHASH_PRECISION).
+        
+        Los mismos lugares (clientes, depósitos, pings GPS de la flota) se
+        consultan una y otra vez, casi nunca con las mismas coordenadas
+        exactas: los puntos de una misma celda comparten la dirección
+        cacheada. Con REVERSE_CACHE_NEIGHBORS también se buscan las celdas
+        vecinas (una sola consulta al cache).
+        
+        El cache se consulta antes que cualquier proveedor: un acierto no
+        paga red ni la espera del rate limit. Primero el memo del proceso
+        (microsegundos), después el cache compartido.
+        
+        Se cachea la dirección sin sus coordenadas: las del resultado son
+        siempre las consultadas, no las del primer punto de la celda.
+        """
+        cell = geohash_encode(coordinates.lat, coordinates.lon, REVERSE_CACHE_GEOHASH_PRECISION)
+        cache_key = f"{COORD_CACHE_PREFIX}reverse:{cell}"
+        if self.cache_enabled:
+            data = self._reverse_memo.get(cache_key)
+            if data is None:
+                cells = geohash_neighbors(cell) if REVERSE_CACHE_NEIGHBORS else []
+                keys = [cache_key] + [f"{COORD_CACHE_PREFIX}reverse:{c}" for c in cells]
+                found = self._cache.get_many(keys)
+                # Primero la celda propia, después las vecinas (lados antes que diagonales)
+                key = next((k for k in keys if found.get(k)), None)
+                if key:
+                    logger.debug("💾 Reverse geocoding desde cache: {}", key)
+                    data = found[key]
+                    self._reverse_memo.set(key, data)  # Bajo su celda (puede ser una vecina)
+            self._count_cache(hit=data is not None)
+            if data is not None:
+                return Address(**{**data, "coordinates": coordinates})
+        
+        address = self._compute_reverse_geocode(coordinates)
+        
+        if address and self.cache_enabled:
+            data = address.model_dump(exclude={"coordinates"})
+            self._reverse_memo.set(cache_key, data)
+            self._cache.set(cache_key, data, ttl=CACHE_TTL_SECONDS)
+        return address
+    
+    def _compute_reverse_geocode(self, coordinates: Coordinates) -> Optional[Address]:
         """
         Geocodificación inversa: convierte coordenadas en dirección.
         
         **PROCESO MEJORADO (con Overpass + Shapely):**
-        1. Consulta Nominatim con las coordenadas (obtiene dirección principal)
+        1. Dirección principal: puerta OSM más cercana (Overpass, ~30 m); si
+           no hay ninguna, consulta Nominatim con las coordenadas
         2. Consulta Overpass para calles cercanas al punto (radio ~50m)
         3. Descarga geometrías completas de esas calles
         4. Calcula intersecciones geométricas entre pares de calles
@@ -791,7 +1607,8 @@ class GeocodingService:
         - Consistencia con forward geocoding (mismo algoritmo)
         
         **FALLBACK:**
-        - Si Overpass falla/timeout, usa enfoque Nominatim simple
+        - Si no hay intersecciones, las calles más cercanas de las mismas
+          que trajo Overpass (sin otra consulta a Nominatim)
         
         Args:
             coordinates: Coordenadas a convertir
@@ -805,22 +1622,64 @@ class GeocodingService:
             return None
         
         try:
-            logger.debug(f"🔄 Reverse geocoding: ({coordinates.lat}, {coordinates.lon})")
-            
-            self._respect_rate_limit()
-            
-            # Paso 1: Obtener dirección principal (Nominatim)
-            location = geocoder.reverse(
-                f"{coordinates.lat}, {coordinates.lon}",
-                exactly_one=True
+            logger.debug("🔄 Reverse geocoding: ({}, {})", coordinates.lat, coordinates.lon)
+            
+            # Las calles cercanas (Overpass) no dependen de Nominatim:
+            # se consultan en paralelo mientras se resuelve el Paso 1.
+            # Radio ~100 metros (aumentado de 50m) para mejor cobertura
+            nearby_future = self._io_pool.submit(
+                self._get_nearby_streets_from_overpass,
+                coordinates.lat,
+                coordinates.lon,
+                radius=0.001,
+                timeout=8
             )
             
-            if not location or not location.raw:
-                logger.warning(f"✗ No se encontró dirección para: {coordinates}")
-                return None
-            
-            raw = location.raw
-            address_data = raw.get('address', {})
+            # Paso 1: Dirección principal. Primero la puerta más cercana de
+            # OSM (Overpass, sin rate limit); Nominatim solo si no hay ninguna
+            # o si la puerta no trae localidad (addr:city)
+            osm_address = self._get_nearest_address_from_overpass(coordinates.lat, coordinates.lon)
+            door_data = {
+                key: osm_address.get(f'addr:{tag}', '')
+                for key, tag in (('road', 'street'), ('house_number', 'housenumber'), ('city', 'city'),
+                                 ('state', 'state'), ('country', 'country'), ('postcode', 'postcode'))
+            } if osm_address else {}
+            
+            if door_data.get('city'):
+                address_data = door_data
+                full_address = None
+            else:
+                location = self._call_provider(
+                    self.primary_provider, 'reverse',
+                    f"{coordinates.lat}, {coordinates.lon}",
+                    exactly_one=True
+                )
+                
+                if location and location.raw:
+                    address_data = location.raw.get('address', {})
+                    full_address = location.address
+                elif door_data:
+                    address_data = {}
+                else:
+                    logger.warning(f"✗ No se encontró dirección para: {coordinates}")
+                    return None
+                
+                if door_data:
+                    # La puerta (la más cercana en metros) manda en calle y
+                    # número; Nominatim completa ciudad, departamento y país
+                    address_data = {**address_data, **{k: v for k, v in door_data.items() if v}}
+                    full_address = None
+            
+            city = address_data.get('city') or address_data.get('town', '')
+            if full_address is None:
+                full_address = ", ".join(
+                    part for part in (
+                        f"{address_data.get('road', '')} {address_data.get('house_number', '')}".strip(),
+                        city,
+                        address_data.get('country', '')
+                    ) if part
+                )
+                logger.debug("   🏠 Dirección desde la puerta OSM más cercana: {}", full_address)
             
             # Extraer calle y número de puerta separados
             street = address_data.get('road', '')
@@ -835,16 +1694,12 @@ class GeocodingService:
             # Paso 2: Buscar esquinas GEOMÉTRICAS usando Overpass + Shapely
             corner_1 = None
             corner_2 = None
+            nearby_streets = None
             
             try:
-                # Obtener calles cercanas de Overpass (radio ~100 metros para mejor cobertura)
-                logger.debug(f"   🌐 Consultando Overpass para esquinas geométricas...")
-                nearby_streets = self._get_nearby_streets_from_overpass(
-                    coordinates.lat,
-                    coordinates.lon,
-                    radius=0.001,  # ~100 metros (aumentado de 50m)
-                    timeout=8
-                )
+                # Calles cercanas de Overpass (consulta lanzada antes del Paso 1)
+                logger.debug("   🌐 Consultando Overpass para esquinas geométricas...")
+                nearby_streets = nearby_future.result()
                 
                 if nearby_streets and len(nearby_streets) >= 2:
                     # Encontrar la intersección más cercana, PREFIRIENDO la calle principal
@@ -856,62 +1711,44 @@ class GeocodingService:
                     
                     if intersection:
                         corner_1, corner_2, distance = intersection
-                        logger.info(f"   📍 Esquinas GEOMÉTRICAS encontradas: {corner_1} y {corner_2} (dist: {distance:.6f})")
+                        logger.info(f"   📍 Esquinas GEOMÉTRICAS encontradas: {corner_1} y {corner_2} (dist: {distance:.1f} m)")
                     else:
-                        logger.debug(f"   ⚠️  No se encontraron intersecciones geométricas, usando fallback Nominatim")
+                        logger.debug("   ⚠️  No se encontraron intersecciones geométricas, usando calles cercanas")
                 else:
-                    logger.debug(f"   ⚠️  Pocas calles encontradas ({len(nearby_streets)}), usando fallback Nominatim")
+                    logger.debug("   ⚠️  Pocas calles encontradas ({}), usando calles cercanas", len(nearby_streets or []))
                 
             except Exception as e:
                 logger.debug(f"   ⚠️  Error en detección geométrica de esquinas: {e}")
             
-            # Paso 3: FALLBACK - Si no se encontraron esquinas geométricas, usar enfoque Nominatim
-            if not corner_1 or not corner_2:
+            # Paso 3: FALLBACK - Si no se encontraron esquinas geométricas, las
+            # calles más cercanas de las que ya trajo Overpass (Nominatim no
+            # tiene reverse por lotes: otra consulta solo agregaría latencia)
+            if (not corner_1 or not corner_2) and nearby_streets:
                 try:
-                    logger.debug(f"   🔄 Fallback: Buscando esquinas con Nominatim...")
-                    nearby_streets = set()
-                    
-                    self._respect_rate_limit()
-                    nearby_results = geocoder.reverse(
-                        f"{coordinates.lat}, {coordinates.lon}",
-                        exactly_one=False,
-                        addressdetails=True
-                    )
+                    closest = iter(_nearest_street_names(
+                        coordinates, nearby_streets, exclude=[street, corner_1, corner_2], limit=2
+                    ))
+                    # SOLO completar las esquinas que estén vacías
+                    corner_1 = corner_1 or next(closest, None)
+                    corner_2 = corner_2 or next(closest, None)
                     
-                    if nearby_results and len(nearby_results) > 1:
-                        for result in nearby_results[:5]:
-                            if result.raw and 'address' in result.raw:
-                                nearby_road = result.raw['address'].get('road', '')
-                                if nearby_road and nearby_road != street:
-                                    nearby_streets.add(nearby_road)
-                                    if len(nearby_streets) >= 2:
-                                        break
-                    
-                    if nearby_streets:
-                        nearby_list = list(nearby_streets)
-                        # SOLO sobrescribir las esquinas que estén vacías
-                        if not corner_1:
-                            corner_1 = nearby_list[0] if len(nearby_list) > 0 else None
-                        if not corner_2:
-                            corner_2 = nearby_list[1] if len(nearby_list) > 1 else nearby_list[0] if len(nearby_list) > 0 else None
-                        
-                        if corner_1 or corner_2:
-                            logger.info(f"   📍 Esquinas APROXIMADAS (Nominatim): {corner_1} y {corner_2}")
+                    if corner_1 or corner_2:
+                        logger.info(f"   📍 Esquinas APROXIMADAS (calles cercanas): {corner_1} y {corner_2}")
                     
                 except Exception as e:
-                    logger.debug(f"   ⚠️  Fallback Nominatim también falló: {e}")
+                    logger.debug(f"   ⚠️  Fallback por calles cercanas también falló: {e}")
             
             # Construir Address con todos los datos (número separado)
             address = Address(
                 street=street,  # Sin número
                 number=house_number if house_number else None,  # Número separado
-                city=address_data.get('city') or address_data.get('town', ''),
-                state=address_data.get('state', ''),
-                country=address_data.get('country', ''),
+                city=city,
+                state=address_data.get('state') or None,
+                country=address_data.get('country') or "Uruguay",  # Default del modelo: nunca ''
                 postal_code=address_data.get('postcode', ''),
                 corner_1=corner_1,
                 corner_2=corner_2,
-                full_address=location.address,
+                full_address=full_address,
                 coordinates=coordinates
             )
             
@@ -930,12 +1767,78 @@ class GeocodingService:
             logger.error(f"❌ Error en reverse geocoding: {e}")
             return None
     
+    def geocode_many(self, addresses: List[Address], max_workers: Optional[int] = None) -> List[Optional[Coordinates]]:
+        """
+        Geocodifica muchas direcciones en paralelo (I/O-bound).
+        
+        Las direcciones repetidas se geocodifican una sola vez. El cache se
+        consulta para todo el lote de una vez (un MGET con Redis) y solo las
+        direcciones que no están pasan por geocode(). El ritmo hacia cada
+        proveedor lo sigue controlando su RateLimiter.
+        
+        Args:
+            addresses: Direcciones a geocodificar
+            max_workers: Requests simultáneos (default GEOCODING_CONCURRENCY)
+            
+        Returns:
+            Coordenadas de cada dirección, en el mismo orden (None si falla)
+        """
+        unique: Dict[str, Address] = {}
+        keys = []
+        for address in addresses:
+            key = address.model_dump_json()
+            unique.setdefault(key, address)
+            keys.append(key)
+        
+        if not unique:
+            return []
+        
+        results: Dict[str, Optional[Coordinates]] = {}
+        if self.cache_enabled:
+            cache_keys = {key: self._first_cache_key(address) for key, address in unique.items()}
+            cached = self._cache.get_many([ck for ck in dict.fromkeys(cache_keys.values()) if ck])
+            for key, cache_key in cache_keys.items():
+                if cache_key in cached:
+                    results[key] = Coordinates(**cached[cache_key])
+            if results:
+                # Los fallos los cuenta geocode() al consultar de nuevo
+                self._count_cache(hit=True, n=len(results))
+                logger.info(f"✓ Cache: {len(results)}/{len(unique)} direcciones ya geocodificadas")
+        
+        pending = {key: address for key, address in unique.items() if key not in results}
+        if pending:
+            workers = min(max_workers or GEOCODING_CONCURRENCY, len(pending))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="geocode-many") as pool:
+                results.update(zip(pending, pool.map(self.geocode, pending.values())))
+        
+        return [results[key] for key in keys]
+    
+    async def geocode_async(self, address: Address) -> Optional[Coordinates]:
+        """
+        Versión async de geocode para los endpoints.
+        
+        Corre en un thread: tanto el cache compartido (Redis) como los
+        proveedores son llamadas bloqueantes que no deben frenar el event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.geocode, address)
+    
+    async def reverse_geocode_async(self, coordinates: Coordinates) -> Optional[Address]:
+        """Versión async de reverse_geocode (corre en un thread, no bloquea el event loop)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.reverse_geocode, coordinates)
+    
+    async def geocode_many_async(self, addresses: List[Address]) -> List[Optional[Coordinates]]:
+        """Versión async de geocode_many (corre en un thread, no bloquea el event loop)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.geocode_many, addresses)
+    
     def batch_geocode(self, addresses: list[Address]) -> Dict[str, Optional[Coordinates]]:
         """
         Geocodifica múltiples direcciones en batch.
         
         OPTIMIZACIONES:
-        - Procesa todas las direcciones de una vez
+        - Procesa las direcciones en paralelo (geocode_many)
         - Aprovecha cache para evitar requests duplicados
         - Útil para inicializar sistema con direcciones históricas
         
@@ -949,10 +1852,7 @@ class GeocodingService:
         
         logger.info(f"📦 Batch geocoding de {len(addresses)} direcciones")
         
-        for i, address in enumerate(addresses, 1):
-            logger.debug(f"Procesando {i}/{len(addresses)}")
-            coords = self.geocode(address)
-            
+        for address, coords in zip(addresses, self.geocode_many(addresses)):
             address_str = address.full_address or f"{address.street}, {address.city}"
             results[address_str] = coords
         
@@ -961,14 +1861,226 @@ class GeocodingService:
         
         return results
     
+    def warm_up(self) -> None:
+        """
+        Compila (o carga del cache de Numba) los kernels de esquinas con datos
+        mínimos, con los mismos tipos de array que las búsquedas reales.
+        """
+        points = np.zeros((2, 2))
+        argmin_sqdist(points[:, 0], points[:, 1], 0.0, 0.0)  # Columnas de un array (N, 2)
+        argmin_sqdist(np.zeros(2), np.zeros(2), 0.0, 0.0)
+        street_min_sqdist(0.0, 0.0, points, np.array([0, 2], dtype=np.int32), np.zeros(1, dtype=np.int32), 1)
+    
     def get_cache_stats(self) -> Dict[str, int]:
         """Obtiene estadísticas del cache"""
         return {
-            "cache_size": len(self._cache),
-            "cache_enabled": self.cache_enabled
+            "cache_size": self._cache.size(),
+            "cache_enabled": self.cache_enabled,
+            "cache_backend": self._cache.name,
+            "cache_hits": self._cache_counts["hits"],
+            "cache_misses": self._cache_counts["misses"],
+            "failed_addresses": len(self._failed_addresses),
+            "failed_hits": self._cache_counts["failed_hits"]
         }
     
+    def prefetch_city(self, bbox: Tuple[float, float, float, float] = MONTEVIDEO_BBOX,
+                      timeout: int = 180) -> Optional[StreetIndex]:
+        """
+        Descarga todas las calles con nombre del bounding box en UNA consulta
+        Overpass y las deja como snapshot local (ver app/street_index.py).
+        
+        Después de esto _get_street_geometry_from_overpass y
+        _get_nearby_streets_from_overpass se resuelven en memoria.
+        
+        Args:
+            bbox: (sur, oeste, norte, este)
+            timeout: Timeout de la consulta en segundos
+            
+        Returns:
+            El índice construido o None si falla
+        """
+        index = self._download_street_snapshot(bbox, timeout)
+        if index is None:
+            return None
+        
+        try:
+            path = index.save(STREETS_SNAPSHOT_FILE)
+        except OSError as e:
+            logger.error(f"❌ No se pudo guardar el snapshot de calles: {e}")
+            return None
+        self._street_index = index
+        
+        logger.info(f"✅ Snapshot de calles: {len(index)} calles guardadas en {path}")
+        return index
+    
+    def prefetch_department(self, departamento: str, timeout: int = 300) -> Optional[StreetIndex]:
+        """
+        Snapshot local de las calles de un departamento (fuera de Montevideo).
+        
+        El bounding box sale de Nominatim; el snapshot se guarda en
+        DEPARTMENT_SNAPSHOT_DIR y desde ese momento las calles cercanas de
+        puntos del departamento se resuelven en memoria, sin Overpass.
+        
+        Args:
+            departamento: Departamento de Uruguay (ej: Canelones)
+            timeout: Timeout de la consulta Overpass en segundos
+            
+        Returns:
+            El índice construido o None si falla
+        """
+        try:
+            location = self._call_provider(
+                self.primary_provider, 'geocode', f"{departamento}, Uruguay", exactly_one=True
+            )
+        except Exception as e:
+            logger.error(f"❌ Error geocodificando {departamento}: {e}")
+            return None
+        
+        if not location or not location.raw or 'boundingbox' not in location.raw:
+            logger.error(f"❌ No se pudo obtener el bounding box de {departamento}")
+            return None
+        
+        # Nominatim: [sur, norte, oeste, este]
+        south, north, west, east = (float(c) for c in location.raw['boundingbox'])
+        index = self._download_street_snapshot((south, west, north, east), timeout)
+        if index is None:
+            return None
+        
+        try:
+            path = index.save(department_snapshot_path(departamento, DEPARTMENT_SNAPSHOT_DIR))
+        except OSError as e:
+            logger.error(f"❌ No se pudo guardar el snapshot de {departamento}: {e}")
+            return None
+        with self._department_indexes_lock:
+            if self._department_indexes is not None:
+                self._department_indexes.append(index)
+        
+        logger.info(f"✅ Snapshot de {departamento}: {len(index)} calles guardadas en {path}")
+        return index
+    
+    def prefetch_street_list(self, departamento: str, localidad: Optional[str] = None,
+                             timeout: int = 300) -> Optional[int]:
+        """
+        Pre-arma el listado de calles de un departamento/localidad en
+        STREETS_LIST_DB; desde ese momento get_streets_by_location lo sirve
+        desde SQLite, sin Nominatim ni Overpass.
+        
+        Returns:
+            Cantidad de calles guardadas o None si falla
+        """
+        streets = self._fetch_streets_by_location(departamento, localidad, timeout)
+        if not streets:
+            return None
+        try:
+            count = self._street_lists.put(departamento, localidad, streets)
+        except Exception as e:
+            logger.error(f"❌ No se pudo guardar el listado de calles de {departamento}: {e}")
+            return None
+        
+        self._street_name_indexes.pop(self._streets_list_cache_key(departamento, localidad), None)
+        logger.info(f"✅ Listado de {departamento}" + (f", {localidad}" if localidad else "") +
+                    f": {count} calles guardadas en {self._street_lists.path}")
+        return count
+    
+    def _download_street_snapshot(self, bbox: Tuple[float, float, float, float],
+                                  timeout: int) -> Optional[StreetIndex]:
+        """Consulta Overpass por las calles con nombre del bbox y arma el índice"""
+        try:
+            south, west, north, east = bbox
+            query = f"""
+            [out:json][timeout:{timeout}][bbox:{south},{west},{north},{east}];
+            way["highway"]["name"];
+            out geom;
+            """
+            
+            logger.info(f"🌐 Descargando snapshot de calles de Overpass (bbox {bbox})...")
+            with self._overpass_session.post(
+                OVERPASS_URL, data={"data": query}, timeout=timeout + 30, stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.error(f"❌ Error en Overpass: HTTP {response.status_code}")
+                    return None
+                
+                # Los ways se convierten a LineString a medida que llegan
+                return StreetIndex.from_overpass_elements(_iter_overpass_elements(response), bbox)
+            
+        except requests.exceptions.Timeout:
+            logger.error(f"❌ Timeout al descargar el snapshot de calles (>{timeout}s)")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Error descargando snapshot de calles: {e}")
+            return None
+    
+    def _streets_list_cache_key(self, departamento: str, localidad: Optional[str]) -> str:
+        """Clave de cache del listado de calles de un departamento/localidad"""
+        return f"{STREETS_LIST_CACHE_PREFIX}{normalize_street_name(departamento)}|{normalize_street_name(localidad or '')}"
+    
     def get_streets_by_location(self, departamento: str, localidad: Optional[str] = None, timeout: int = 60) -> List[str]:
+        """
+        Listado de calles de un departamento/localidad, cacheado.
+        
+        Primero busca el listado pre-armado en SQLite (prefetch_street_list).
+        Si no está, la consulta a Overpass de un departamento completo tarda
+        30-60 segundos; el resultado se guarda STREETS_LIST_TTL_SECONDS en
+        el cache compartido.
+        
+        Returns:
+            Lista de nombres de calles únicas (ordenadas alfabéticamente)
+        """
+        streets = self._street_lists.get(departamento, localidad)
+        if streets:
+            return streets
+        
+        cache_key = self._streets_list_cache_key(departamento, localidad)
+        if self.cache_enabled:
+            cached = self._cache.get(cache_key)
+            if cached:
+                logger.info(f"💾 Calles de {departamento}" + (f", {localidad}" if localidad else "") + " desde cache")
+                return cached
+        
+        streets = self._fetch_streets_by_location(departamento, localidad, timeout)
+        
+        if streets and self.cache_enabled:
+            self._cache.set(cache_key, streets, ttl=STREETS_LIST_TTL_SECONDS)
+        return streets
+    
+    def get_streets_index(self, departamento: str, localidad: Optional[str] = None,
+                          timeout: int = 60) -> Optional[StreetNameIndex]:
+        """
+        Índice por prefijo de las calles de un departamento/localidad.
+        
+        Se arma una vez por proceso a partir de get_streets_by_location
+        (que a su vez sale del cache compartido si ya se consultó).
+        
+        Returns:
+            StreetNameIndex o None si no se pudieron obtener las calles
+        """
+        cache_key = self._streets_list_cache_key(departamento, localidad)
+        index = self._street_name_indexes.get(cache_key)
+        if index is None:
+            streets = self.get_streets_by_location(departamento, localidad, timeout)
+            if not streets:
+                return None
+            index = self._street_name_indexes[cache_key] = StreetNameIndex(streets)
+        return index
+    
+    async def get_streets_by_location_async(self, departamento: str, localidad: Optional[str] = None,
+                                            timeout: int = 60) -> List[str]:
+        """Versión async de get_streets_by_location (la consulta a Overpass corre en un thread)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.get_streets_by_location, departamento, localidad, timeout
+        )
+    
+    async def get_streets_index_async(self, departamento: str, localidad: Optional[str] = None,
+                                      timeout: int = 60) -> Optional[StreetNameIndex]:
+        """Versión async de get_streets_index (corre en un thread, no bloquea el event loop)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.get_streets_index, departamento, localidad, timeout
+        )
+    
+    def _fetch_streets_by_location(self, departamento: str, localidad: Optional[str] = None, timeout: int = 60) -> List[str]:
         """
         Obtiene listado de calles de un departamento/localidad en Uruguay usando Overpass API.
         
@@ -982,8 +2094,6 @@ class GeocodingService:
         """
         try:
             # Determinar URL de Overpass (usar servidor personalizado si está disponible)
-            overpass_url = os.getenv('OVERPASS_URL', 'https://overpass-api.de/api/interpreter')
-            
             logger.info(f"🔍 Buscando calles en {departamento}" + 
                        (f", {localidad}" if localidad else "") + ", Uruguay")
             
@@ -1001,8 +2111,7 @@ class GeocodingService:
                 logger.error("No hay geocodificador disponible")
                 return []
             
-            self._respect_rate_limit()
-            location = geocoder.geocode(search_query, exactly_one=True)
+            location = self._call_provider(self.primary_provider, 'geocode', search_query, exactly_one=True)
             
             if not location or not location.raw or 'boundingbox' not in location.raw:
                 logger.error(f"No se pudo geocodificar el área: {search_query}")
@@ -1014,41 +2123,45 @@ class GeocodingService:
             
             logger.debug(f"   Bounding box: S={south}, N={north}, W={west}, E={east}")
             
-            # Query de Overpass usando bounding box
+            # Query de Overpass usando bounding box. Salida CSV con una sola
+            # columna (name): un departamento son miles de ways y con
+            # "out tags" en JSON viajarían todas sus etiquetas. "out count"
+            # agrega la fila final que confirma que la consulta terminó
             query = f"""
-            [out:json][timeout:{timeout}][bbox:{south},{west},{north},{east}];
+            [out:csv(name, ::count; false)][timeout:{timeout}][bbox:{south},{west},{north},{east}];
             (
               way["highway"]["name"];
             );
             out tags;
+            out count;
             """
             
             logger.debug(f"   Consultando Overpass API...")
             
-            response = requests.post(
-                overpass_url,
+            with self._overpass_session.post(
+                OVERPASS_URL,
                 data=query,
-                headers={'Content-Type': 'application/x-www-form-urlencoded'},
-                timeout=timeout
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"❌ Error en Overpass: HTTP {response.status_code}")
-                return []
-            
-            data = response.json()
-            elements = data.get('elements', [])
-            
-            logger.debug(f"   Overpass retornó {len(elements)} elementos")
-            
-            # Extraer nombres únicos de calles
-            street_names = set()
-            for element in elements:
-                tags = element.get('tags', {})
-                name = tags.get('name', '').strip()
+                headers={
+                    'Content-Type': 'application/x-www-form-urlencoded',
+                    'Accept-Encoding': 'gzip'  # CSV repetitivo: comprime ~5-10x
+                },
+                timeout=timeout,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.error(f"❌ Error en Overpass: HTTP {response.status_code}")
+                    return []
                 
-                if name:
-                    street_names.add(name)
+                # Extraer nombres únicos de calles, línea a línea
+                street_names = set()
+                count = 0
+                for name in _iter_overpass_csv_values(response):
+                    count += 1
+                    name = name.strip()
+                    if name:
+                        street_names.add(name)
+            
+            logger.debug(f"   Overpass retornó {count} calles con nombre")
             
             # Convertir a lista ordenada
             streets_list = sorted(list(street_names))
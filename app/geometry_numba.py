@@ -0,0 +1,84 @@
+"""
+Kernels numéricos compilados con Numba para la búsqueda de esquinas.
+
+Operan sobre arrays de coordenadas ya proyectadas (metros UTM, ver
+GeocodingService._find_nearest_intersection): reducciones simples que
+NumPy resolvería con varios arrays temporales, y distancias punto-segmento
+sobre las calles en formato SoA.
+
+Numba es opcional (mismo reemplazo de njit que app/pip_numba.py): sin
+Numba los kernels corren como Python puro, con el mismo resultado.
+"""
+
+import numpy as np
+
+from app.pip_numba import njit
+
+
+@njit(cache=True)
+def argmin_sqdist(xs, ys, qx, qy):
+    """
+    Punto más cercano a (qx, qy) en una sola pasada, sin temporales.
+
+    Args:
+        xs, ys: float64 (N,) con las coordenadas de los puntos
+        qx, qy: Coordenadas del punto de referencia
+
+    Returns:
+        (índice, distancia al cuadrado) del más cercano; el primero en caso
+        de empate (igual que np.argmin). (-1, 0.0) si no hay puntos.
+    """
+    n = xs.shape[0]
+    if n == 0:
+        return -1, 0.0
+    dx = xs[0] - qx
+    dy = ys[0] - qy
+    best_index = 0
+    best = dx * dx + dy * dy
+    for i in range(1, n):
+        dx = xs[i] - qx
+        dy = ys[i] - qy
+        d2 = dx * dx + dy * dy
+        if d2 < best:
+            best = d2
+            best_index = i
+    return best_index, best
+
+
+@njit(cache=True)
+def street_min_sqdist(qx, qy, coords, offsets, street, n_streets):
+    """
+    Distancia al cuadrado de (qx, qy) a cada calle (punto-segmento).
+
+    Recorre todos los segmentos de las polilíneas concatenadas (ver
+    StreetSegments en app/geocoding.py) y se queda con el mínimo por calle.
+
+    Args:
+        qx, qy: Coordenadas del punto de referencia
+        coords: float64 (N, 2) con las polilíneas concatenadas
+        offsets: int32 (L+1), la línea l es coords[offsets[l]:offsets[l+1]]
+        street: int32 (L) con la calle de cada línea
+        n_streets: Cantidad de calles
+
+    Returns:
+        float64 (n_streets,) con la distancia mínima al cuadrado (inf para
+        calles sin segmentos)
+    """
+    result = np.full(n_streets, np.inf)
+    for line in range(offsets.shape[0] - 1):
+        s = street[line]
+        for k in range(offsets[line] + 1, offsets[line + 1]):
+            x1 = coords[k - 1, 0]
+            y1 = coords[k - 1, 1]
+            dx = coords[k, 0] - x1
+            dy = coords[k, 1] - y1
+            length2 = dx * dx + dy * dy
+            t = 0.0
+            if length2 > 0.0:
+                t = min(max(((qx - x1) * dx + (qy - y1) * dy) / length2, 0.0), 1.0)
+            ex = x1 + t * dx - qx
+            ey = y1 + t * dy - qy
+            d2 = ex * ex + ey * ey
+            if d2 < result[s]:
+                result[s] = d2
+    return result
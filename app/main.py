@@ -19,19 +19,57 @@ ARQUITECTURA:
 FastAPI + Pydantic + Servicios de backend
 """
 
+import asyncio
+import hashlib
+import json
 import os
+import signal
 import sys
+import threading
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html
+from fastapi.routing import APIRoute
 from loguru import logger
 from dotenv import load_dotenv
+from pydantic import BaseModel
+
+# uvloop (opcional): event loop sobre libuv, más rápido que el de asyncio
+# para muchas conexiones concurrentes. Viene con uvicorn[standard] en
+# Linux/macOS; en Windows no existe y se usa el loop de asyncio.
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# httptools (opcional): parser HTTP en C para uvicorn (bindings de
+# llhttp), en lugar de h11 en Python puro. También viene con
+# uvicorn[standard].
+try:
+    import httptools
+    HTTPTOOLS_AVAILABLE = True
+except ImportError:
+    HTTPTOOLS_AVAILABLE = False
+
+# orjson (opcional): decodifica los cuerpos JSON de los requests y serializa
+# las respuestas que no son modelos Pydantic (errores); sin orjson se usa el
+# json de la librería estándar
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Cargar variables de entorno
 load_dotenv()
@@ -60,31 +98,191 @@ from app.models import (
     DualZoneResponse,
     ZoneInfo,
 )
-from app.geocoding import get_geocoding_service
-from app.utils import lat_lon_to_utm
+from app.geocoding import GeocodingService, get_geocoding_service
+from app.utils import lat_lon_to_utm, utm_cache_stats
 from app.routing import RouteCalculator
-from app.scoring import ScoringEngine
+from app.scoring import ScoreCache, ScoringEngine, VehicleArrays
 from app.optimizer import RouteOptimizer, ClusteringOptimizer
 from app import zones
 
 
+# ============================================================================
+# INICIALIZACIÓN DE SERVICIOS
+# ============================================================================
+
+class ServiceRegistry:
+    """
+    Servicios compartidos por todos los requests del worker (singleton).
+    
+    El handler `lifespan` los construye una sola vez al arrancar; los
+    endpoints los usan a través de `services` (ServiceRegistry.instance()).
+    """
+    
+    _instance: Optional["ServiceRegistry"] = None
+    __slots__ = ("geocoding", "routes", "scoring", "optimizer", "clustering")
+    
+    def __init__(self):
+        self.geocoding: Optional[GeocodingService] = None
+        self.routes: Optional[RouteCalculator] = None
+        self.scoring: Optional[ScoringEngine] = None
+        self.optimizer: Optional[RouteOptimizer] = None
+        self.clustering: Optional[ClusteringOptimizer] = None
+    
+    @classmethod
+    def instance(cls) -> "ServiceRegistry":
+        """Instancia única (se crea en el primer uso)"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+
+services = ServiceRegistry.instance()
+
+
+def _warm_up() -> None:
+    """
+    Recorre una vez los caminos calientes con datos mínimos: kernels Numba
+    (scoring y esquinas), transformer UTM y lookup de zonas.
+    
+    Un fallo solo se loguea: el servicio arranca igual y el primer request
+    paga la inicialización como antes.
+    """
+    start = time.time()
+    try:
+        services.scoring.warm_up()
+        services.geocoding.warm_up()
+        lat_lon_to_utm(-34.9055, -56.1851)
+        zones.find_zones_by_coordinates(-34.9055, -56.1851)
+        logger.info(f"🔥 Warm-up completado en {time.time() - start:.2f}s")
+    except Exception as e:
+        logger.warning(f"⚠️  Warm-up incompleto: {e}")
+
+
+def _background_startup() -> None:
+    """
+    Lo que no hace falta para atender requests: el grafo grande de
+    Montevideo pre-armado (prefetch_graph.py) y el warm-up.
+    
+    Corre en el pool de threads mientras la API ya acepta requests. Hasta
+    que el grafo termina de cargarse, las rutas usan grafos por área (como
+    sin el archivo).
+    """
+    if services.routes.load_prebuilt_montevideo_graph():
+        logger.info("✅ Grafo de Montevideo pre-cargado")
+    _warm_up()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ciclo de vida: inicializa servicios al arrancar y limpia al cerrar.
+    
+    IMPORTANTE:
+    Los servicios se inicializan una sola vez y se reutilizan
+    para todas las requests, mejorando performance. Lo opcional
+    (_background_startup) sigue en segundo plano: la API empieza a
+    aceptar requests, y pasa el health check, sin esperarlo.
+    """
+    logger.info("🚀 Iniciando Sistema de Ruteo Inteligente...")
+    
+    try:
+        # Inicializar servicios
+        logger.info("Inicializando servicios...")
+        
+        # Geocodificación (índice de calles), rutas y zonas (GeoJSON) no
+        # dependen entre sí: se construyen en paralelo en el pool de threads
+        loop = asyncio.get_running_loop()
+        services.geocoding, services.routes, _ = await asyncio.gather(
+            loop.run_in_executor(None, get_geocoding_service),
+            loop.run_in_executor(None, RouteCalculator),
+            loop.run_in_executor(None, zones.load_zones)
+        )
+        
+        # Configuración por defecto
+        default_config = SystemConfig()
+        
+        services.scoring = ScoringEngine(default_config, services.routes)
+        services.optimizer = RouteOptimizer(services.routes, default_config)
+        services.clustering = ClusteringOptimizer()
+        
+        # Recarga de zonas en caliente con SIGHUP, solo cuando el proceso
+        # corre sin supervisor (python -m app.main / uvicorn sin --workers).
+        # Con --workers (Dockerfile) la señal le llega al supervisor, que
+        # reinicia los workers (uvicorn >= 0.30) y estos cargan las zonas
+        # nuevas al arrancar. Solo se puede registrar desde el thread
+        # principal (no con TestClient ni embebida) ni en Windows
+        if hasattr(signal, "SIGHUP"):
+            try:
+                if threading.current_thread() is not threading.main_thread():
+                    raise RuntimeError("el event loop no corre en el thread principal")
+                loop.add_signal_handler(
+                    signal.SIGHUP,
+                    lambda: loop.run_in_executor(None, zones.reload_zones)
+                )
+                logger.info("📡 SIGHUP registrado para recargar zonas")
+            except (RuntimeError, NotImplementedError) as e:
+                logger.warning(f"⚠️  SIGHUP no registrado, sin recarga de zonas en caliente: {e}")
+        
+        logger.info("✓ Todos los servicios inicializados correctamente")
+        
+    except Exception as e:
+        logger.error(f"❌ Error inicializando servicios: {e}")
+        raise
+    
+    # Grafo pre-armado y warm-up en segundo plano (se guarda la referencia
+    # para que el future no se pierda mientras corre)
+    background_startup = loop.run_in_executor(None, _background_startup)
+    
+    logger.info("🎯 API lista para recibir requests")
+    
+    yield
+    
+    # Limpieza al cerrar la aplicación
+    logger.info("👋 Cerrando Sistema de Ruteo Inteligente...")
+    if not background_startup.done():
+        background_startup.cancel()
+
+
 # ============================================================================
 # CONFIGURACIÓN DE LA APLICACIÓN
 # ============================================================================
 
+def _configure_logging() -> None:
+    """
+    Sinks de loguru según el entorno.
+    
+    - Consola: LOG_LEVEL (default: INFO con DEBUG=True, WARNING en producción)
+    - Archivo: solo si LOG_FILE está definido, con nivel DEBUG. Se escribe
+      desde un thread de loguru (enqueue) y con buffer de 8 KB: los
+      requests no esperan un write() por línea
+    
+    loguru descarta un mensaje sin formatearlo si ningún sink acepta su
+    nivel: en producción sin LOG_FILE, los logger.info/debug por vehículo
+    y por pedido del scoring no cuestan nada. Por eso en esos paths los
+    mensajes pasan sus valores como argumentos ("{} -> {}", a, b) y no
+    como f-strings, que se arman antes de llamar al logger.
+    """
+    debug = os.getenv("DEBUG", "True").lower() == "true"
+    logger.remove()  # Remover handler por defecto
+    logger.add(
+        sys.stderr,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
+        level=os.getenv("LOG_LEVEL") or ("INFO" if debug else "WARNING")
+    )
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        logger.add(
+            log_file,
+            rotation="1 day",
+            retention="7 days",
+            level="DEBUG",
+            enqueue=True,
+            buffering=8192
+        )
+
+
 # Configurar logging
-logger.remove()  # Remover handler por defecto
-logger.add(
-    sys.stderr,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
-    level="INFO"
-)
-logger.add(
-    "logs/api.log",
-    rotation="1 day",
-    retention="7 days",
-    level="DEBUG"
-)
+_configure_logging()
 
 # Crear aplicación FastAPI
 app = FastAPI(
@@ -159,7 +357,8 @@ app = FastAPI(
     license_info={
         "name": "MIT License",
         "url": "https://opensource.org/licenses/MIT",
-    }
+    },
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -171,91 +370,117 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configurar logging detallado de requests
-try:
-    from app.middleware.logging import DetailedRequestLogger
-    app.add_middleware(
-        DetailedRequestLogger,
-        log_dir="/app/logs/requests",
-        max_body_length=10000
-    )
-    logger.info("✅ Middleware de logging activado")
-except ImportError as e:
-    logger.warning(f"⚠️ No se pudo cargar middleware de logging: {e}")
+# Comprimir respuestas grandes (batch con cientos de resultados): el JSON
+# se reduce 5-10x. Las chicas (<1 KB) van sin comprimir; nivel 5 equilibra
+# ratio y CPU por request
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
-# Montar archivos estáticos para CSS personalizado
+# Configurar logging detallado de requests: copia los bodies de request y
+# respuesta y escribe a disco, así que solo se activa para una fracción de
+# los requests (DETAILED_LOG_SAMPLE_RATE, 0 = desactivado)
+detailed_log_sample_rate = float(os.getenv("DETAILED_LOG_SAMPLE_RATE", "0"))
+if detailed_log_sample_rate > 0:
+    try:
+        from app.middleware.logging import DetailedRequestLogger
+        app.add_middleware(
+            DetailedRequestLogger,
+            log_dir="/app/logs/requests",
+            max_body_length=10000,
+            sample_rate=detailed_log_sample_rate
+        )
+        logger.info(f"✅ Middleware de logging activado ({detailed_log_sample_rate:.0%} de los requests)")
+    except ImportError as e:
+        logger.warning(f"⚠️ No se pudo cargar middleware de logging: {e}")
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    Archivos estáticos con cache de un año (Cache-Control immutable).
+    
+    El navegador, y el CDN / proxy que haya adelante, los sirven sin volver
+    a la API. Las URLs llevan la huella del contenido (static_url), así que
+    un archivo modificado se pide con una URL nueva.
+    """
+    
+    CACHE_CONTROL = "public, max-age=31536000, immutable"
+    
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["cache-control"] = self.CACHE_CONTROL
+        return response
+
+
+# Montar archivos estáticos para CSS personalizado. Con SERVE_STATIC=false
+# no se montan: el reverse proxy sirve /static directo desde app/static
 static_path = Path(__file__).parent / "static"
 static_path.mkdir(exist_ok=True)
-app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+if os.getenv("SERVE_STATIC", "true").lower() == "true":
+    app.mount("/static", ImmutableStaticFiles(directory=str(static_path), html=False), name="static")
 
 
-# ============================================================================
-# INICIALIZACIÓN DE SERVICIOS
-# ============================================================================
-
-# Servicios globales (singleton pattern)
-geocoding_service = None
-route_calculator = None
-scoring_engine = None
-route_optimizer = None
-clustering_optimizer = None
+@lru_cache(maxsize=None)
+def static_url(filename: str) -> str:
+    """URL de un archivo estático con la huella de su contenido (?v=sha256)"""
+    digest = hashlib.sha256((static_path / filename).read_bytes()).hexdigest()[:12]
+    return f"/static/{filename}?v={digest}"
 
 
-@app.on_event("startup")
-async def startup_event():
+def model_json_response(model: BaseModel, status_code: int = 200) -> Response:
     """
-    Inicializa servicios al arrancar la aplicación.
+    Serializa un modelo Pydantic directo a bytes JSON con pydantic-core (Rust).
     
-    IMPORTANTE:
-    Los servicios se inicializan una sola vez y se reutilizan
-    para todas las requests, mejorando performance.
+    Evita el jsonable_encoder + json.dumps de FastAPI (salida compacta, sin
+    pasar floats por Python). Se usa en endpoints de alto tráfico como zonas;
+    el response_model del decorador sigue documentando el esquema.
+    
+    También en asignación individual y batch: un batch grande devuelve
+    cientos de resultados con el detalle de scoring anidado.
     """
-    global geocoding_service, route_calculator, scoring_engine
-    global route_optimizer, clustering_optimizer
+    return Response(
+        content=model.model_dump_json(),
+        media_type="application/json",
+        status_code=status_code
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que serializa con orjson si está disponible"""
     
-    logger.info("🚀 Iniciando Sistema de Ruteo Inteligente...")
+    def render(self, content) -> bytes:
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+class FastJSONRequest(Request):
+    """Request que decodifica el cuerpo JSON con orjson si está disponible"""
+    
+    async def json(self):
+        if not hasattr(self, "_json"):
+            body = await self.body()
+            # orjson.JSONDecodeError hereda de json.JSONDecodeError: FastAPI
+            # sigue respondiendo 422 ante un cuerpo inválido
+            self._json = orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Ruta que entrega a FastAPI un FastJSONRequest.
     
-    try:
-        # Inicializar servicios
-        logger.info("Inicializando servicios...")
-        
-        geocoding_service = get_geocoding_service()
-        route_calculator = RouteCalculator()
-        
-        # Cargar zonas desde GeoJSON
-        zones.load_zones()
-        
-        # OPTIMIZACIÓN: Pre-cargar grafo grande de Montevideo (DESACTIVADO)
-        # Descomentar las siguientes líneas para activar (toma 20-30s al inicio)
-        # try:
-        #     logger.info("🗺️  Pre-cargando grafo grande de Montevideo...")
-        #     preload_success = route_calculator.preload_montevideo_graph()
-        #     if preload_success:
-        #         logger.info("✅ Grafo de Montevideo pre-cargado (mejora 10% rendimiento)")
-        #     else:
-        #         logger.warning("⚠️  No se pudo pre-cargar grafo (modo tradicional)")
-        # except Exception as e:
-        #     logger.warning(f"⚠️  Error pre-cargando grafo: {e} (usando modo tradicional)")
-        
-        # Configuración por defecto
-        default_config = SystemConfig()
-        
-        scoring_engine = ScoringEngine(default_config, route_calculator)
-        route_optimizer = RouteOptimizer(route_calculator, default_config)
-        clustering_optimizer = ClusteringOptimizer()
+    Un batch grande trae cientos de pedidos y vehículos: el cuerpo se
+    decodifica con orjson antes de la validación de Pydantic.
+    """
+    
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
         
-        logger.info("✓ Todos los servicios inicializados correctamente")
-        logger.info("🎯 API lista para recibir requests")
+        async def fast_json_route_handler(request: Request) -> Response:
+            return await route_handler(FastJSONRequest(request.scope, request.receive))
         
-    except Exception as e:
-        logger.error(f"❌ Error inicializando servicios: {e}")
-        raise
+        return fast_json_route_handler
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Limpieza al cerrar la aplicación"""
-    logger.info("👋 Cerrando Sistema de Ruteo Inteligente...")
+app.router.route_class = FastJSONRoute
 
 
 # ============================================================================
@@ -274,7 +499,7 @@ async def custom_swagger_ui_html():
         <title>{app.title} - API Documentation</title>
         <link rel="stylesheet" type="text/css" href="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui.css">
         <link rel="icon" type="image/png" href="https://fastapi.tiangolo.com/img/favicon.png">
-        <link rel="stylesheet" type="text/css" href="/static/swagger-custom.css">
+        <link rel="stylesheet" type="text/css" href="{static_url('swagger-custom.css')}">
         <style>
             /* Sidebar Navigation */
             .sidebar-nav {{
@@ -606,6 +831,32 @@ async def health_check():
     )
 
 
+def _find_best_vehicle(request: AssignmentRequest, order: Order) -> Tuple[List[Tuple], Optional[Tuple]]:
+    """
+    Scoring de assign_order: mejor vehículo + 3 alternativas con un solo
+    cálculo de scores.
+    
+    Corre en el pool de threads, así que la config del request se fija acá
+    (el ContextVar no viaja del event loop al thread). Solo vale para este
+    request: el scoring engine es compartido por todos los del worker.
+    
+    Returns:
+        (top_ranked, result); result es (vehículo, score) o None
+    """
+    config_token = services.scoring.set_request_config(request.config)
+    try:
+        top_ranked = services.scoring.find_top_k_vehicles(request.vehicles, order, k=4)
+        result = services.scoring.find_best_vehicle(
+            request.vehicles,
+            order,
+            min_score_threshold=0.2,  # Score mínimo aceptable
+            ranked_vehicles=top_ranked
+        )
+    finally:
+        services.scoring.reset_request_config(config_token)
+    return top_ranked, result
+
+
 @app.post(
     "/api/v1/assign-order",
     response_model=AssignmentResult,
@@ -657,14 +908,14 @@ async def assign_order(request: AssignmentRequest) -> AssignmentResult:
     ```
     """
     try:
-        logger.info(f"📨 Request de asignación recibido: {request.order.id}")
+        logger.info("📨 Request de asignación recibido: {}", request.order.id)
         
         # 1. GEOCODIFICAR DIRECCIÓN (si es necesario)
         order = request.order
         
         if not order.delivery_location and order.address:
-            logger.info(f"🔍 Geocodificando dirección: {order.address.full_address}")
-            coords = geocoding_service.geocode(order.address)
+            logger.info("🔍 Geocodificando dirección: {}", order.address.full_address)
+            coords = await services.geocoding.geocode_async(order.address)
             
             if not coords:
                 raise HTTPException(
@@ -673,7 +924,7 @@ async def assign_order(request: AssignmentRequest) -> AssignmentResult:
                 )
             
             order.delivery_location = coords
-            logger.info(f"✓ Dirección geocodificada: {coords}")
+            logger.info("✓ Dirección geocodificada: {}", coords)
         
         if not order.delivery_location:
             raise HTTPException(
@@ -688,24 +939,19 @@ async def assign_order(request: AssignmentRequest) -> AssignmentResult:
                 detail="No se proporcionaron vehículos disponibles"
             )
         
-        # Actualizar config del scoring engine
-        if request.config:
-            scoring_engine.config = request.config
-        
         # 3. ENCONTRAR MEJOR VEHÍCULO
-        logger.info(f"🔍 Evaluando {len(request.vehicles)} vehículos...")
+        logger.info("🔍 Evaluando {} vehículos...", len(request.vehicles))
         
-        result = scoring_engine.find_best_vehicle(
-            request.vehicles,
-            order,
-            min_score_threshold=0.2  # Score mínimo aceptable
+        # Scoring CPU-bound: en el pool de threads (no bloquea el event loop)
+        top_ranked, result = await asyncio.get_running_loop().run_in_executor(
+            None, _find_best_vehicle, request, order
         )
         
         if not result:
             # No hay vehículos disponibles o adecuados
             logger.warning(f"⚠️  No se encontró vehículo adecuado para {order.id}")
             
-            return AssignmentResult(
+            return model_json_response(AssignmentResult(
                 order_id=order.id,
                 assigned_vehicle_id=None,
                 confidence_score=0.0,
@@ -715,13 +961,14 @@ async def assign_order(request: AssignmentRequest) -> AssignmentResult:
                     "Verifica que los vehículos estén disponibles",
                     "El pedido puede ser demasiado urgente o lejano"
                 ]
-            )
+            ))
         
         best_vehicle, best_score = result
         
         logger.info(
-            f"✓ Vehículo seleccionado: {best_vehicle.id} "
-            f"(score: {best_score.total_score:.3f})"
+            "✓ Vehículo seleccionado: {} "
+            "(score: {:.3f})",
+            best_vehicle.id, best_score.total_score
         )
         
         # 4. CALCULAR RUTA (opcional, puede ser costoso)
@@ -729,15 +976,14 @@ async def assign_order(request: AssignmentRequest) -> AssignmentResult:
         estimated_delivery_time = best_score.estimated_arrival_time
         
         # 5. PREPARAR RESPUESTA
-        # Obtener top 3 alternativas
-        all_ranked = scoring_engine.rank_vehicles(request.vehicles, order)
+        # Top 3 alternativas (ya calculadas en top_ranked)
         alternatives = [
             {
                 "vehicle_id": v.id,
                 "score": s.total_score,
                 "distance_km": s.distance_to_delivery_km
             }
-            for v, s in all_ranked[1:4]  # Top 2-4
+            for v, s in top_ranked[1:4]  # Top 2-4
         ]
         
         result = AssignmentResult(
@@ -757,9 +1003,9 @@ async def assign_order(request: AssignmentRequest) -> AssignmentResult:
             ]
         )
         
-        logger.info(f"✅ Asignación completada exitosamente: {order.id} -> {best_vehicle.id}")
+        logger.info("✅ Asignación completada exitosamente: {} -> {}", order.id, best_vehicle.id)
         
-        return result
+        return model_json_response(result)
         
     except HTTPException:
         raise
@@ -843,7 +1089,7 @@ async def geocode_address(address: Address) -> Coordinates:
     try:
         logger.info(f"🔍 Geocodificando: {address.full_address or address.street}")
         
-        coords = geocoding_service.geocode(address)
+        coords = await services.geocoding.geocode_async(address)
         
         if not coords:
             raise HTTPException(
@@ -939,7 +1185,7 @@ async def reverse_geocode_coordinates(coordinates: Coordinates) -> Address:
             except Exception as e:
                 logger.warning(f"No se pudo calcular coordenadas UTM: {e}")
         
-        address = geocoding_service.reverse_geocode(coordinates)
+        address = await services.geocoding.reverse_geocode_async(coordinates)
         
         if not address:
             raise HTTPException(
@@ -1068,9 +1314,14 @@ async def calculate_distance(request: DistanceCalculationRequest) -> DistanceCal
         # 1. Resolver coordenadas de origen
         logger.info(f"📏 Calculando distancia/tiempo entre dos puntos")
         
+        # Origen y destino se geocodifican juntos (en paralelo y sin
+        # bloquear el event loop)
+        addresses = [p.address for p in (request.origin, request.destination) if p.address]
+        geocoded = iter(await services.geocoding.geocode_many_async(addresses))
+        
         if request.origin.address:
             logger.debug(f"  Geocodificando origen: {request.origin.address.full_address or request.origin.address.street}")
-            origin_coords = geocoding_service.geocode(request.origin.address)
+            origin_coords = next(geocoded)
             if not origin_coords:
                 raise HTTPException(
                     status_code=400,
@@ -1082,7 +1333,7 @@ async def calculate_distance(request: DistanceCalculationRequest) -> DistanceCal
         # 2. Resolver coordenadas de destino
         if request.destination.address:
             logger.debug(f"  Geocodificando destino: {request.destination.address.full_address or request.destination.address.street}")
-            dest_coords = geocoding_service.geocode(request.destination.address)
+            dest_coords = next(geocoded)
             if not dest_coords:
                 raise HTTPException(
                     status_code=400,
@@ -1119,19 +1370,18 @@ async def calculate_distance(request: DistanceCalculationRequest) -> DistanceCal
         radius_meters = max(radius_meters, 5000)  # Mínimo 5km
         radius_meters = min(radius_meters, 50000)  # Máximo 50km
         
-        graph = route_calculator.get_graph_for_area(
-            center=center,
-            radius_meters=radius_meters,
-            location_name=location_name
+        # Carga del grafo (disco u OSM) y ruta en el pool de threads: son
+        # bloqueantes y no deben frenar el event loop
+        loop = asyncio.get_running_loop()
+        graph = await loop.run_in_executor(
+            None, services.routes.get_graph_for_area, center, radius_meters, location_name
         )
         
         # 4. Calcular ruta
         logger.debug(f"  Calculando ruta óptima (optimize_by={request.optimize_by})")
-        route_result = route_calculator.calculate_route(
-            graph=graph,
-            origin=origin_coords,
-            destination=dest_coords,
-            optimize_by=request.optimize_by
+        route_result = await loop.run_in_executor(
+            None, services.routes.calculate_route,
+            graph, origin_coords, dest_coords, request.optimize_by
         )
         
         if not route_result:
@@ -1196,7 +1446,13 @@ async def calculate_distance(request: DistanceCalculationRequest) -> DistanceCal
     response_model=DualZoneResponse,
     tags=["zones"]
 )
-async def detect_montevideo_zones(request: DualZoneRequest) -> DualZoneResponse:
+async def detect_montevideo_zones(
+    request: DualZoneRequest,
+    fields: Optional[str] = Query(
+        None,
+        description="Propiedades adicionales del GeoJSON separadas por coma (ej: 'OBJECTID,PERIMETER' o '*')"
+    )
+) -> DualZoneResponse:
     """
     Determina en qué zonas de Montevideo se encuentra una dirección o coordenadas.
     
@@ -1259,6 +1515,9 @@ async def detect_montevideo_zones(request: DualZoneRequest) -> DualZoneResponse:
     ```
     
     Si el punto no está en alguna de las zonas, ese campo será `null`.
+    
+    Por defecto `properties` incluye solo `Codigo`, `Shape_Area` y `name`;
+    usar `?fields=OBJECTID,PERIMETER` (o `?fields=*`) para pedir más.
     """
     try:
         # 1. Obtener coordenadas (geocodificar si es necesario)
@@ -1266,7 +1525,7 @@ async def detect_montevideo_zones(request: DualZoneRequest) -> DualZoneResponse:
         
         if request.address:
             logger.info(f"🔍 Geocodificando dirección: {request.address}")
-            coords = geocoding_service.geocode(request.address)
+            coords = await services.geocoding.geocode_async(request.address)
             address_str = f"{request.address.street} {request.address.number}, {request.address.city}, {request.address.country}"
         else:
             coords = request.coordinates
@@ -1276,15 +1535,10 @@ async def detect_montevideo_zones(request: DualZoneRequest) -> DualZoneResponse:
         logger.info(f"🗺️  Buscando zonas para coordenadas ({coords.lat}, {coords.lon})")
         zones_result = zones.find_zones_by_coordinates(coords.lat, coords.lon)
         
-        # 3. Remover campo geometry para respuesta más ligera
-        zona_flete = zones_result.get('flete')
-        zona_global = zones_result.get('global')
-        
-        if zona_flete and 'geometry' in zona_flete:
-            zona_flete = {k: v for k, v in zona_flete.items() if k != 'geometry'}
-        
-        if zona_global and 'geometry' in zona_global:
-            zona_global = {k: v for k, v in zona_global.items() if k != 'geometry'}
+        # 3. Las zonas no incluyen geometry (se serializa solo bajo demanda
+        #    con zones.get_zone_geometry), la respuesta ya es ligera
+        zona_flete = zones.with_properties(zones_result.get('flete'), fields, 'ZONAS_F.geojson')
+        zona_global = zones.with_properties(zones_result.get('global'), fields, 'ZONAS_4.geojson')
         
         # 4. Construir respuesta
         response = DualZoneResponse(
@@ -1305,7 +1559,7 @@ async def detect_montevideo_zones(request: DualZoneRequest) -> DualZoneResponse:
         else:
             logger.info(f"ℹ️  Punto no está en ninguna zona de Montevideo")
         
-        return response
+        return model_json_response(response)
         
     except HTTPException:
         raise
@@ -1324,7 +1578,13 @@ async def detect_montevideo_zones(request: DualZoneRequest) -> DualZoneResponse:
     response_model=ZoneResponse,
     tags=["zones"]
 )
-async def detect_zone(request: ZoneRequest) -> ZoneResponse:
+async def detect_zone(
+    request: ZoneRequest,
+    fields: Optional[str] = Query(
+        None,
+        description="Propiedades adicionales del GeoJSON separadas por coma (ej: 'descripcion' o '*')"
+    )
+) -> ZoneResponse:
     """
     Determina en qué zona se encuentra una dirección o coordenadas.
     
@@ -1369,7 +1629,7 @@ async def detect_zone(request: ZoneRequest) -> ZoneResponse:
         if request.address:
             # Geocodificar dirección
             logger.info(f"Detectando zona para dirección: {request.address}")
-            coords = geocoding_service.geocode(request.address)
+            coords = await services.geocoding.geocode_async(request.address)
             if not coords:
                 raise HTTPException(
                     status_code=404,
@@ -1396,26 +1656,28 @@ async def detect_zone(request: ZoneRequest) -> ZoneResponse:
                 coords = Coordinates(lat=lat, lon=lon)
         
         # Buscar zona usando point-in-polygon
-        zone_info = zones.find_zone_by_coordinates(lat, lon)
+        zone_info = zones.with_properties(
+            zones.find_zone_by_coordinates(lat, lon), fields, 'zonas.geojson'
+        )
         
         if zone_info:
             # Punto está dentro de una zona
-            return ZoneResponse(
+            return model_json_response(ZoneResponse(
                 coordinates=coords,
                 zone_found=True,
                 zone_id=zone_info['id'],
                 zone_name=zone_info['name'],
                 zone_properties=zone_info['properties']
-            )
+            ))
         else:
             # Punto no está en ninguna zona
-            return ZoneResponse(
+            return model_json_response(ZoneResponse(
                 coordinates=coords,
                 zone_found=False,
                 zone_id=None,
                 zone_name=None,
                 zone_properties=None
-            )
+            ))
     
     except HTTPException:
         raise
@@ -1443,6 +1705,8 @@ async def get_streets(request: StreetsRequest) -> StreetsResponse:
     - Sin duplicados (nombres únicos)
     - Ordenado alfabéticamente
     - Soporta búsqueda por departamento completo o localidad específica
+    - Autocompletado: con `prefijo` retorna solo las calles que empiezan así
+    - El listado de cada departamento/localidad queda en cache (7 días)
     
     ## Ejemplo 1: Todo el departamento
     
@@ -1465,6 +1729,19 @@ async def get_streets(request: StreetsRequest) -> StreetsResponse:
     
     **Respuesta**: Solo calles de Ciudad de la Costa (más rápido, 10-20 segundos)
     
+    ## Ejemplo 3: Autocompletado
+    
+    ```json
+    {
+        "departamento": "Montevideo",
+        "prefijo": "bule",
+        "limite": 10
+    }
+    ```
+    
+    **Respuesta**: Hasta 10 calles que empiezan con "bule" (sin distinguir
+    mayúsculas ni tildes), resueltas en memoria después de la primera consulta
+    
     ## Departamentos válidos de Uruguay
     
     - Montevideo
@@ -1506,11 +1783,20 @@ async def get_streets(request: StreetsRequest) -> StreetsResponse:
                    (f", {request.localidad}" if request.localidad else ""))
         
         # Obtener calles del servicio de geocodificación
-        calles = geocoding_service.get_streets_by_location(
-            departamento=request.departamento,
-            localidad=request.localidad,
-            timeout=60
-        )
+        if request.prefijo:
+            # Autocompletado: búsqueda por prefijo en el índice del departamento
+            index = await services.geocoding.get_streets_index_async(
+                departamento=request.departamento,
+                localidad=request.localidad,
+                timeout=60
+            )
+            calles = index.search(request.prefijo, limit=request.limite) if index else []
+        else:
+            calles = await services.geocoding.get_streets_by_location_async(
+                departamento=request.departamento,
+                localidad=request.localidad,
+                timeout=60
+            )
         
         if not calles:
             raise HTTPException(
@@ -1554,10 +1840,13 @@ async def get_stats():
     Útil para monitoreo y debugging.
     """
     try:
-        geocoding_stats = geocoding_service.get_cache_stats()
+        # El tamaño del cache es una consulta a Redis/disco: fuera del event loop
+        loop = asyncio.get_running_loop()
+        geocoding_stats = await loop.run_in_executor(None, services.geocoding.get_cache_stats)
         
         return {
             "geocoding": geocoding_stats,
+            "utm_cache": utm_cache_stats(),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -1573,7 +1862,7 @@ async def get_stats():
 async def http_exception_handler(request, exc):
     """Manejo personalizado de excepciones HTTP"""
     logger.error(f"HTTP Error: {exc.status_code} - {exc.detail}")
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
@@ -1587,7 +1876,7 @@ async def http_exception_handler(request, exc):
 async def general_exception_handler(request, exc):
     """Manejo de excepciones generales"""
     logger.error(f"Unhandled error: {exc}", exc_info=True)
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "error": "Error interno del servidor",
@@ -1603,6 +1892,215 @@ async def general_exception_handler(request, exc):
 
 
 
+def _batch_fleet(vehicles: List[Vehicle]) -> List[Vehicle]:
+    """
+    Copia de la flota para ir actualizando su carga durante el batch.
+    
+    El batch solo reasigna current_load / current_weight_kg y agrega a
+    current_orders: alcanza con una copia superficial de cada vehículo y
+    una lista de pedidos propia. Ubicación, ítems y pedidos ya asignados
+    se comparten con el request (solo lectura), sin el deep copy de cada
+    submodelo.
+    """
+    return [
+        vehicle.model_copy(update={"current_orders": list(vehicle.current_orders)})
+        for vehicle in vehicles
+    ]
+
+
+def _rank_batch_order(
+    order: Order,
+    vehicles: List[Vehicle],
+    request: BatchAssignmentRequest,
+    config: SystemConfig,
+    arrays: Optional[VehicleArrays] = None,
+    score_cache: Optional[ScoreCache] = None
+) -> Tuple[Optional[List[Tuple]], float]:
+    """
+    Rankea los vehículos para un pedido del batch (modo fast o normal).
+    
+    En modo fast, arrays es la flota en formato SoA armada una vez por batch
+    y score_cache guarda los scores completos de los candidatos, para que
+    el re-ranking de la 2ª pasada no recalcule los que no cambiaron.
+    
+    Returns:
+        (ranking, segundos); ranking es None si el pedido no tiene coordenadas
+    """
+    order_start_time = time.time()
+    
+    if not order.delivery_location:
+        return None, 0.0
+    
+    if request.fast_mode:
+        # Modo FAST con pre-filtering
+        ranking = services.scoring.rank_vehicles_fast(
+            vehicles,
+            order,
+            config,
+            max_candidates=request.max_candidates_per_order,
+            arrays=arrays,
+            score_cache=score_cache
+        )
+    else:
+        # Modo NORMAL (completo)
+        ranking = services.scoring.rank_vehicles(vehicles, order)
+    
+    return ranking, time.time() - order_start_time
+
+
+def _commit_batch_order(
+    order: Order,
+    ranking: Tuple[Optional[List[Tuple]], float],
+    request: BatchAssignmentRequest,
+    available_vehicles: List[Vehicle],
+    config: SystemConfig,
+    changed_ids: set,
+    arrays: Optional[VehicleArrays] = None,
+    score_cache: Optional[ScoreCache] = None
+) -> BatchAssignmentResult:
+    """
+    Confirma la asignación de un pedido del batch (en el orden de los pedidos).
+    
+    El ranking se calculó en paralelo con los demás pedidos. Cada asignación
+    carga un vehículo (y se anota en changed_ids), así que el ranking solo
+    se corrige si depende de alguno de los vehículos ya cargados:
+    - Modo fast: si alguno está en su pre-filtro geográfico, se recalcula
+    - Modo normal: se recalcula el score solo de esos vehículos (rerank_vehicles)
+    El resultado es el mismo que procesar los pedidos uno por uno, aunque
+    el ranking haya visto parte de esas cargas. Cada asignación también se
+    copia a arrays (modo fast).
+    """
+    scored_vehicles, ranking_time = ranking
+    order_start_time = time.time() - ranking_time
+    
+    logger.info("  🔍 Procesando {}...", order.id)
+    
+    # Validar que el pedido tenga coordenadas
+    if not order.delivery_location:
+        logger.warning(f"    ⚠️  {order.id}: Sin coordenadas de entrega")
+        return BatchAssignmentResult(
+            order_id=order.id,
+            assigned_vehicle_id=None,
+            score=None,
+            assignment_time=time.time() - order_start_time,
+            reasons=["El pedido no tiene coordenadas de entrega"]
+        )
+    
+    # Corregir el ranking si depende de vehículos ya cargados
+    if changed_ids:
+        if request.fast_mode:
+            candidates = services.scoring.geographic_candidates(available_vehicles, order, arrays)
+            if any(vehicle.id in changed_ids for vehicle in candidates):
+                scored_vehicles, _ = _rank_batch_order(
+                    order, available_vehicles, request, config, arrays, score_cache
+                )
+        else:
+            scored_vehicles = services.scoring.rerank_vehicles(
+                available_vehicles, order, scored_vehicles, changed_ids
+            )
+    
+    # Procesar resultado
+    if scored_vehicles and scored_vehicles[0][1] > 0:
+        # Asignación exitosa
+        best_vehicle, best_score = scored_vehicles[0]
+        
+        # Actualizar vehículo (agregar pedido a su carga)
+        for index, vehicle in enumerate(available_vehicles):
+            if vehicle.id == best_vehicle.id:
+                vehicle.current_orders.append(order)
+                vehicle.current_load += 1
+                vehicle.current_weight_kg += order.items_weight_kg
+                changed_ids.add(vehicle.id)
+                if arrays is not None:
+                    services.scoring.update_vehicle_arrays(arrays, index, vehicle)
+                break
+        
+        logger.info(
+            "    ✓ {} -> {} "
+            "(score: {:.3f}, "
+            "time: {:.2f}s)",
+            order.id, best_vehicle.id, best_score, time.time() - order_start_time
+        )
+        
+        return BatchAssignmentResult(
+            order_id=order.id,
+            assigned_vehicle_id=best_vehicle.id,
+            score=best_score,
+            assignment_time=time.time() - order_start_time,
+            reasons=[
+                f"Mejor score: {best_score:.3f}",
+                f"Vehículo: {best_vehicle.id}",
+                f"Modo: {'Fast' if request.fast_mode else 'Normal'}"
+            ]
+        )
+    
+    # No se pudo asignar
+    logger.warning(f"    ⚠️  {order.id}: No asignado")
+    
+    return BatchAssignmentResult(
+        order_id=order.id,
+        assigned_vehicle_id=None,
+        score=None,
+        assignment_time=time.time() - order_start_time,
+        reasons=["No hay vehículos disponibles que cumplan requisitos"]
+    )
+
+
+def _commit_batch_assignments(
+    request: BatchAssignmentRequest,
+    available_vehicles: List[Vehicle],
+    config: SystemConfig,
+    rankings: List[Tuple[Optional[List[Tuple]], float]],
+    arrays: Optional[VehicleArrays] = None,
+    score_cache: Optional[ScoreCache] = None
+) -> List[BatchAssignmentResult]:
+    """Confirma en orden las asignaciones de todos los pedidos (ver _commit_batch_order)"""
+    changed_ids = set()  # Vehículos cargados en este batch
+    return [
+        _commit_batch_order(
+            order, ranking, request, available_vehicles, config, changed_ids, arrays, score_cache
+        )
+        for order, ranking in zip(request.orders, rankings)
+    ]
+
+
+async def _geocode_batch_orders(orders: List[Order]) -> None:
+    """
+    Geocodifica de una vez los pedidos del batch que traen dirección pero
+    no coordenadas (geocode_many: en paralelo, sin repetir direcciones).
+    
+    Los que no se pudieron geocodificar quedan sin coordenadas y el batch
+    los informa como no asignados.
+    """
+    missing = [order for order in orders if not order.delivery_location and order.address]
+    if not missing:
+        return
+    
+    logger.info(f"🔍 Geocodificando {len(missing)} direcciones del batch")
+    coords_list = await services.geocoding.geocode_many_async([order.address for order in missing])
+    for order, coords in zip(missing, coords_list):
+        order.delivery_location = coords
+    
+    failed = sum(1 for coords in coords_list if coords is None)
+    if failed:
+        logger.warning(f"⚠️  {failed}/{len(missing)} direcciones del batch sin geocodificar")
+
+
+def _validate_batch_request(request: BatchAssignmentRequest) -> None:
+    """Rechaza con 400 un batch sin pedidos o sin vehículos"""
+    if not request.orders:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La lista de pedidos no puede estar vacía"
+        )
+    
+    if not request.vehicles:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La lista de vehículos no puede estar vacía"
+        )
+
+
 @app.post(
     "/api/v1/assign-orders-batch",
     response_model=BatchAssignmentResponse,
@@ -1632,13 +2130,16 @@ async def assign_orders_batch(request: BatchAssignmentRequest) -> BatchAssignmen
     
     **Resultado**: 3-5 segundos para 10 pedidos (vs 30-50 segundos en modo normal)
     
+    Los pedidos con `address` y sin `delivery_location` se geocodifican
+    todos juntos (en paralelo) antes de asignar.
+    
     ## Ejemplo
     
     ```json
     {
         "orders": [
             {"id": "ORD-001", "delivery_location": {...}, ...},
-            {"id": "ORD-002", "delivery_location": {...}, ...}
+            {"id": "ORD-002", "address": {...}, ...}
         ],
         "vehicles": [...],
         "fast_mode": true,
@@ -1658,8 +2159,6 @@ async def assign_orders_batch(request: BatchAssignmentRequest) -> BatchAssignmen
     }
     ```
     """
-    import time
-    
     try:
         start_time = time.time()
         
@@ -1670,108 +2169,43 @@ async def assign_orders_batch(request: BatchAssignmentRequest) -> BatchAssignmen
         )
         
         # Validaciones
-        if not request.orders:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="La lista de pedidos no puede estar vacía"
-            )
-        
-        if not request.vehicles:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="La lista de vehículos no puede estar vacía"
-            )
+        _validate_batch_request(request)
         
         # Configuración
         config = request.config or SystemConfig()
         
-        # Resultados
-        assignments = []
-        assigned_count = 0
-        unassigned_count = 0
+        # Pedidos con dirección y sin coordenadas: geocodificar todos juntos
+        await _geocode_batch_orders(request.orders)
         
         # Copiar lista de vehículos para ir actualizando su carga
-        available_vehicles = [v.model_copy(deep=True) for v in request.vehicles]
-        
-        # Procesar cada pedido
-        for order in request.orders:
-            order_start_time = time.time()
-            
-            logger.info(f"  🔍 Procesando {order.id}...")
-            
-            # Validar que el pedido tenga coordenadas
-            if not order.delivery_location:
-                logger.warning(f"    ⚠️  {order.id}: Sin coordenadas de entrega")
-                assignments.append(BatchAssignmentResult(
-                    order_id=order.id,
-                    assigned_vehicle_id=None,
-                    score=None,
-                    assignment_time=time.time() - order_start_time,
-                    reasons=["El pedido no tiene coordenadas de entrega"]
-                ))
-                unassigned_count += 1
-                continue
-            
-            # Asignar usando modo correspondiente
-            if request.fast_mode:
-                # Modo FAST con pre-filtering
-                scored_vehicles = scoring_engine.rank_vehicles_fast(
-                    available_vehicles,
-                    order,
-                    config,
-                    max_candidates=request.max_candidates_per_order
-                )
-            else:
-                # Modo NORMAL (completo)
-                scored_vehicles = scoring_engine.rank_vehicles(
-                    available_vehicles,
-                    order
-                )
-            
-            # Procesar resultado
-            if scored_vehicles and scored_vehicles[0][1] > 0:
-                # Asignación exitosa
-                best_vehicle, best_score = scored_vehicles[0]
-                
-                # Actualizar vehículo (agregar pedido a su carga)
-                for vehicle in available_vehicles:
-                    if vehicle.id == best_vehicle.id:
-                        vehicle.current_orders.append(order)
-                        vehicle.current_load += 1
-                        total_weight = sum(item.weight_kg for item in order.items)
-                        vehicle.current_weight_kg += total_weight
-                        break
-                
-                assignments.append(BatchAssignmentResult(
-                    order_id=order.id,
-                    assigned_vehicle_id=best_vehicle.id,
-                    score=best_score,
-                    assignment_time=time.time() - order_start_time,
-                    reasons=[
-                        f"Mejor score: {best_score:.3f}",
-                        f"Vehículo: {best_vehicle.id}",
-                        f"Modo: {'Fast' if request.fast_mode else 'Normal'}"
-                    ]
-                ))
-                assigned_count += 1
-                
-                logger.info(
-                    f"    ✓ {order.id} -> {best_vehicle.id} "
-                    f"(score: {best_score:.3f}, "
-                    f"time: {time.time() - order_start_time:.2f}s)"
-                )
-            else:
-                # No se pudo asignar
-                assignments.append(BatchAssignmentResult(
-                    order_id=order.id,
-                    assigned_vehicle_id=None,
-                    score=None,
-                    assignment_time=time.time() - order_start_time,
-                    reasons=["No hay vehículos disponibles que cumplan requisitos"]
-                ))
-                unassigned_count += 1
-                
-                logger.warning(f"    ⚠️  {order.id}: No asignado")
+        available_vehicles = _batch_fleet(request.vehicles)
+        
+        # Modo fast: la flota en arrays (SoA) una sola vez para todo el batch
+        arrays = services.scoring.vehicle_arrays(available_vehicles) if request.fast_mode else None
+        
+        # Scores completos ya calculados (vehículo, pedido, carga), compartidos
+        # por las dos pasadas
+        score_cache: ScoreCache = {}
+        
+        # 1ª pasada (en paralelo): rankear todos los pedidos contra el estado
+        # inicial de la flota, en el pool de threads (no bloquea el event loop)
+        loop = asyncio.get_running_loop()
+        rankings = await asyncio.gather(*(
+            loop.run_in_executor(
+                None, _rank_batch_order,
+                order, available_vehicles, request, config, arrays, score_cache
+            )
+            for order in request.orders
+        ))
+        
+        # 2ª pasada (serial): confirmar asignaciones en orden, corrigiendo los
+        # rankings que dependen de vehículos ya cargados en este batch
+        assignments = await loop.run_in_executor(
+            None, _commit_batch_assignments,
+            request, available_vehicles, config, rankings, arrays, score_cache
+        )
+        assigned_count = sum(1 for result in assignments if result.assigned_vehicle_id is not None)
+        unassigned_count = len(assignments) - assigned_count
         
         # Preparar respuesta
         total_time = time.time() - start_time
@@ -1791,7 +2225,7 @@ async def assign_orders_batch(request: BatchAssignmentRequest) -> BatchAssignmen
             f"(promedio: {total_time/len(request.orders):.2f}s/pedido)"
         )
         
-        return response
+        return model_json_response(response)
         
     except HTTPException:
         raise
@@ -1803,6 +2237,83 @@ async def assign_orders_batch(request: BatchAssignmentRequest) -> BatchAssignmen
         )
 
 
+@app.post(
+    "/api/v1/assign-orders-batch/stream",
+    summary="🔄 Asignar múltiples pedidos a vehículos (Batch, streaming NDJSON)",
+    response_description="Un BatchAssignmentResult JSON por línea, en el orden de los pedidos",
+    status_code=status.HTTP_200_OK,
+    tags=["routing"]
+)
+async def assign_orders_batch_stream(request: BatchAssignmentRequest) -> StreamingResponse:
+    """
+    Igual que `/api/v1/assign-orders-batch`, pero envía cada resultado apenas se confirma.
+    
+    La respuesta es NDJSON (`application/x-ndjson`): una línea por pedido con
+    el mismo `BatchAssignmentResult` que trae `assignments` en el endpoint
+    normal, en el orden de los pedidos. Útil para batches grandes: el cliente
+    muestra resultados a medida que llegan y el servidor no acumula la lista.
+    
+    Los rankings corren en paralelo igual que en el endpoint normal; cada
+    pedido se confirma apenas terminan su ranking y los de los anteriores.
+    
+    ```
+    {"order_id": "ORD-001", "assigned_vehicle_id": "MOV-001", "score": 0.87, ...}
+    {"order_id": "ORD-002", "assigned_vehicle_id": null, "score": null, ...}
+    ```
+    """
+    logger.info(
+        f"📨 Batch (stream) recibido: {len(request.orders)} pedidos, "
+        f"{len(request.vehicles)} vehículos, "
+        f"fast_mode={request.fast_mode}"
+    )
+    
+    # Validaciones (antes de empezar a responder: después ya no hay status)
+    _validate_batch_request(request)
+    
+    config = request.config or SystemConfig()
+    await _geocode_batch_orders(request.orders)
+    available_vehicles = _batch_fleet(request.vehicles)
+    arrays = services.scoring.vehicle_arrays(available_vehicles) if request.fast_mode else None
+    
+    async def results():
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        # Sin score_cache: acá los rankings corren mientras se confirman
+        # asignaciones, y un score calculado a mitad de una carga quedaría
+        # guardado con la clave equivocada
+        rankings = [
+            loop.run_in_executor(
+                None, _rank_batch_order, order, available_vehicles, request, config, arrays
+            )
+            for order in request.orders
+        ]
+        changed_ids = set()  # Vehículos cargados en este batch
+        assigned_count = 0
+        
+        try:
+            for order, ranking in zip(request.orders, rankings):
+                result = await loop.run_in_executor(
+                    None, _commit_batch_order,
+                    order, await ranking, request, available_vehicles, config, changed_ids, arrays
+                )
+                assigned_count += result.assigned_vehicle_id is not None
+                yield result.model_dump_json() + "\n"
+            
+            logger.info(
+                f"✅ Batch (stream) completado: {assigned_count}/{len(request.orders)} asignados "
+                f"en {time.time() - start_time:.2f}s"
+            )
+        except Exception as e:
+            # Ya se envió el status 200: el cliente ve el stream cortado
+            logger.error(f"❌ Error en assign_orders_batch_stream: {e}", exc_info=True)
+        finally:
+            # Error o cliente desconectado: descartar los rankings pendientes
+            for ranking in rankings:
+                ranking.cancel()
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 # ============================================================================
 # ENTRY POINT
 # ============================================================================
@@ -1815,13 +2326,25 @@ if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     debug = os.getenv("DEBUG", "True").lower() == "true"
     
-    logger.info(f"🚀 Iniciando servidor en {host}:{port}")
+    # Un proceso por core: cada request de asignación es CPU-bound. Con
+    # reload (DEBUG) uvicorn corre un solo proceso
+    workers = 1 if debug else int(os.getenv("WORKERS", os.cpu_count() or 1))
+    
+    event_loop = "uvloop" if UVLOOP_AVAILABLE else "asyncio"
+    http_parser = "httptools" if HTTPTOOLS_AVAILABLE else "h11"
+    logger.info(
+        f"🚀 Iniciando servidor en {host}:{port} "
+        f"(event loop: {event_loop}, http: {http_parser}, workers: {workers})"
+    )
     
     uvicorn.run(
         "app.main:app",
         host=host,
         port=port,
         reload=debug,
+        workers=workers,
+        loop=event_loop,
+        http=http_parser,
         log_level="info"
     )
 
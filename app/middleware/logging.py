@@ -3,33 +3,62 @@ Middleware de logging detallado para la API de Ruteo
 Registra todos los requests y responses con metadata completa
 """
 
+import atexit
 import json
+import queue
+import random
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Callable
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Receive, Scope, Send
 from starlette.responses import StreamingResponse
 import logging
+from logging.handlers import QueueHandler, QueueListener
+
+
+def _add_queued_file_handler(logger: logging.Logger, log_file: Path) -> None:
+    """
+    Agrega al logger un FileHandler detrás de una cola.
+    
+    El request solo encola el registro; un thread (QueueListener) lo
+    escribe a disco, así el event loop no se bloquea en write().
+    """
+    handler = logging.FileHandler(log_file, encoding='utf-8')
+    handler.setLevel(logging.INFO)
+    
+    # Formato: una línea JSON por registro
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)  # Escribe lo pendiente al salir
+    logger.addHandler(QueueHandler(log_queue))
 
 
 class DetailedRequestLogger(BaseHTTPMiddleware):
     """
     Middleware que registra información detallada de cada request/response
+    
+    Con sample_rate < 1 solo se registra esa fracción de los requests; el
+    resto pasa directo a la app, sin copiar bodies ni bufferear la respuesta.
     """
     
     def __init__(
         self,
         app: ASGIApp,
         log_dir: str = "/app/logs/requests",
-        max_body_length: int = 10000
+        max_body_length: int = 10000,
+        sample_rate: float = 1.0
     ):
         super().__init__(app)
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
         self.max_body_length = max_body_length
+        self.sample_rate = sample_rate
         
         # Configurar logger específico para requests
         self.logger = self._setup_logger()
@@ -43,17 +72,18 @@ class DetailedRequestLogger(BaseHTTPMiddleware):
         if logger.handlers:
             return logger
         
-        # Handler para archivo actual
-        log_file = self.log_dir / "requests.log"
-        handler = logging.FileHandler(log_file, encoding='utf-8')
-        handler.setLevel(logging.INFO)
-        
-        # Formato: una línea JSON por request
-        handler.setFormatter(logging.Formatter('%(message)s'))
-        logger.addHandler(handler)
+        # Handler para archivo actual (escritura en segundo plano)
+        _add_queued_file_handler(logger, self.log_dir / "requests.log")
         
         return logger
     
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Decide el muestreo antes de que BaseHTTPMiddleware arme el request"""
+        if scope["type"] == "http" and random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+    
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """
         Intercepta cada request y registra información detallada
@@ -191,12 +221,8 @@ class EndpointLogger:
         if logger.handlers:
             return logger
         
-        # Archivo específico por endpoint
-        log_file = self.log_dir / f"{self.endpoint_name}.log"
-        handler = logging.FileHandler(log_file, encoding='utf-8')
-        handler.setLevel(logging.INFO)
-        handler.setFormatter(logging.Formatter('%(message)s'))
-        logger.addHandler(handler)
+        # Archivo específico por endpoint (escritura en segundo plano)
+        _add_queued_file_handler(logger, self.log_dir / f"{self.endpoint_name}.log")
         
         return logger
     
@@ -245,12 +245,19 @@ class StreetsRequest(BaseModel):
     """
     departamento: str = Field(..., description="Departamento de Uruguay (ej: Montevideo, Canelones, Maldonado)")
     localidad: Optional[str] = Field(None, description="Localidad específica dentro del departamento (opcional)")
+    prefijo: Optional[str] = Field(None, description="Solo calles que empiezan con este texto, sin distinguir tildes (autocompletado)")
+    limite: Optional[int] = Field(None, ge=1, description="Máximo de calles a retornar cuando se usa prefijo")
     
     model_config = ConfigDict(json_schema_extra={
         "examples": [
             {
                 "departamento": "Montevideo"
             },
+            {
+                "departamento": "Montevideo",
+                "prefijo": "bulevar",
+                "limite": 10
+            },
             {
                 "departamento": "Canelones",
                 "localidad": "Ciudad de la Costa"
@@ -354,6 +361,16 @@ class Order(BaseModel):
             raise ValueError('El deadline debe ser posterior a la fecha de creación')
         return v
     
+    @property
+    def items_weight_kg(self) -> float:
+        """
+        Peso de los items (suma de weight_kg), el que suma a la carga del vehículo.
+        
+        Sin cache: con pocos items la suma es trivial, y un valor cacheado
+        quedaría desactualizado al reasignar items o con model_copy.
+        """
+        return sum(item.weight_kg for item in self.items)
+    
     model_config = ConfigDict(json_schema_extra={
         "example": {
             "id": "PED-001",
@@ -926,7 +943,7 @@ class ZoneInfo(BaseModel):
     name: str = Field(..., description="Nombre de la zona")
     properties: Dict[str, Any] = Field(
         default_factory=dict,
-        description="Propiedades adicionales de la zona del GeoJSON"
+        description="Propiedades de la zona del GeoJSON (Codigo, Shape_Area y name; el resto con ?fields=)"
     )
     geometry: Optional[Dict[str, Any]] = Field(
         None,
@@ -939,8 +956,8 @@ class ZoneInfo(BaseModel):
             "codigo": 64,
             "name": "Zona 64",
             "properties": {
-                "AREA": 11123482.046664737,
-                "PERIMETER": 16682.853975
+                "Codigo": 64,
+                "Shape_Area": 7965967.647245987
             }
         }
     })
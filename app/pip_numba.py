@@ -0,0 +1,79 @@
+"""
+Point-in-polygon compilado con Numba (ray casting sobre arrays SoA).
+
+Opera directamente sobre las coordenadas contiguas de cada zona
+(ZoneRings en app/zones.py), sin cruzar la frontera Python/GEOS por
+cada punto. Pensado para lotes de puntos (geocodificación masiva).
+
+Numba es opcional: si no está instalado los kernels corren como Python
+puro y app.zones usa los polígonos preparados de Shapely.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Reemplazo sin compilación cuando Numba no está disponible"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True)
+def point_in_rings(px, py, coords, ring_offsets):
+    """
+    Test de paridad de cruces (ray casting) sobre todos los anillos de una zona.
+
+    Con regla par-impar los huecos se restan solos: un punto dentro de un
+    hueco cruza el anillo exterior y el interior, y queda afuera.
+
+    Args:
+        px, py: Coordenadas del punto (lon, lat)
+        coords: float64 (N, 2) con los anillos concatenados (cerrados)
+        ring_offsets: int32 (R+1) con el inicio de cada anillo en coords
+
+    Returns:
+        True si el punto está dentro de la zona
+    """
+    inside = False
+    for r in range(ring_offsets.shape[0] - 1):
+        start = ring_offsets[r]
+        end = ring_offsets[r + 1]
+        for k in range(start + 1, end):
+            x1 = coords[k - 1, 0]
+            y1 = coords[k - 1, 1]
+            x2 = coords[k, 0]
+            y2 = coords[k, 1]
+            if (y1 > py) != (y2 > py):
+                x_cross = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+                if px < x_cross:
+                    inside = not inside
+    return inside
+
+
+@njit(cache=True, parallel=True)
+def contains_batch(points_xy, coords, ring_offsets):
+    """
+    Evalúa point_in_rings para un lote de puntos en paralelo.
+
+    Args:
+        points_xy: float64 (M, 2) con (lon, lat) de cada punto
+        coords, ring_offsets: Arrays SoA de la zona
+
+    Returns:
+        Array bool (M,) con True para los puntos dentro de la zona
+    """
+    n = points_xy.shape[0]
+    result = np.zeros(n, dtype=np.bool_)
+    for i in prange(n):
+        result[i] = point_in_rings(points_xy[i, 0], points_xy[i, 1], coords, ring_offsets)
+    return result
@@ -26,6 +26,8 @@ CONCEPTOS CLAVE:
 
 import os
 import pickle
+import tempfile
+import threading
 from typing import List, Optional, Tuple, Dict
 from datetime import datetime, timedelta
 import time
@@ -68,6 +70,9 @@ class RouteCalculator:
     - Múltiples algoritmos de routing disponibles
     """
     
+    # Clave en cache_dir del grafo grande de Montevideo (prefetch_graph.py)
+    MONTEVIDEO_CACHE_KEY = "montevideo_full"
+    
     def __init__(
         self,
         network_type: str = "drive",
@@ -93,6 +98,12 @@ class RouteCalculator:
         # Cache de grafos en memoria
         self._graph_cache: Dict[str, nx.MultiDiGraph] = {}
         
+        # Un lock por clave de grafo: el batch calcula scores en paralelo y
+        # varios threads pueden pedir el mismo grafo a la vez; solo el
+        # primero lo carga/descarga, el resto espera y lo toma de memoria
+        self._graph_locks: Dict[str, threading.Lock] = {}
+        self._graph_locks_guard = threading.Lock()
+        
         # Cache de rutas calculadas entre puntos (para evitar recálculos)
         # Key: (lat1, lon1, lat2, lon2), Value: (route_nodes, distance_m, time_s)
         self._route_cache: Dict[Tuple[float, float, float, float], Tuple[List, float, float]] = {}
@@ -168,7 +179,7 @@ class RouteCalculator:
             logger.warning(f"   Se usará lógica simplificada como fallback")
             return False
     
-    def preload_montevideo_graph(self) -> bool:
+    def preload_montevideo_graph(self, refresh: bool = False) -> bool:
         """
         PRE-CARGA el grafo grande de Montevideo para optimizar rendimiento.
         
@@ -177,20 +188,21 @@ class RouteCalculator:
         - Evita cargar 20-30 grafos pequeños durante ejecución
         - Reduce tiempo total de 100 pedidos de 10min a 1-2min
         
+        Args:
+            refresh: Descargar de OSM aunque esté en cache (prefetch_graph.py)
+        
         Returns:
             True si se cargó exitosamente, False en caso contrario
         """
-        if self._montevideo_graph is not None:
+        if self._montevideo_graph is not None and not refresh:
             logger.debug("Grafo de Montevideo ya está pre-cargado")
             return True
         
-        cache_key = "montevideo_full"
+        cache_key = self.MONTEVIDEO_CACHE_KEY
         
         # 1. Intentar cargar desde cache en disco
-        cached_graph = self._load_graph_from_cache(cache_key)
-        if cached_graph:
-            self._montevideo_graph = cached_graph
-            logger.info(f"✅ Grafo grande de Montevideo cargado desde cache: {len(cached_graph.nodes)} nodos")
+        if not refresh and self.load_prebuilt_montevideo_graph():
+            logger.info(f"✅ Grafo grande de Montevideo cargado desde cache: {len(self._montevideo_graph.nodes)} nodos")
             return True
         
         # 2. Descargar desde OSM
@@ -233,6 +245,18 @@ class RouteCalculator:
             logger.warning("   Se usarán grafos pequeños por área (modo tradicional)")
             return False
     
+    def load_prebuilt_montevideo_graph(self) -> bool:
+        """
+        Carga el grafo grande de Montevideo solo si ya está en disco
+        (generado con prefetch_graph.py); nunca lo descarga.
+        
+        Returns:
+            True si el grafo quedó cargado
+        """
+        if self._montevideo_graph is None:
+            self._montevideo_graph = self._load_graph_from_cache(self.MONTEVIDEO_CACHE_KEY)
+        return self._montevideo_graph is not None
+    
     def _get_cache_filename(self, location: str) -> str:
         """Genera nombre de archivo para cache de grafo"""
         safe_name = location.replace(" ", "_").replace(",", "")
@@ -259,13 +283,20 @@ class RouteCalculator:
         """Guarda grafo en cache en disco"""
         cache_file = self._get_cache_filename(location)
         
+        tmp_file = None
         try:
             logger.debug(f"Guardando grafo en cache: {cache_file}")
-            with open(cache_file, 'wb') as f:
+            # Temporal único en el mismo directorio: varios threads o workers
+            # pueden guardar el mismo grafo a la vez sin pisarse
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as f:
+                tmp_file = f.name
                 pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)  # Reemplazo atómico: los workers nunca leen a medias
             logger.info(f"✓ Grafo guardado en cache")
         except Exception as e:
             logger.error(f"Error guardando cache: {e}")
+            if tmp_file and os.path.exists(tmp_file):
+                os.remove(tmp_file)
     
     def get_graph_for_area(
         self,
@@ -310,6 +341,25 @@ class RouteCalculator:
             logger.debug("Grafo encontrado en cache de memoria")
             return self._graph_cache[cache_key]
         
+        with self._graph_lock(cache_key):
+            # Otro thread pudo haberlo cargado mientras se esperaba el lock
+            if cache_key in self._graph_cache:
+                return self._graph_cache[cache_key]
+            return self._load_or_download_graph(cache_key, center, radius_meters, location_name)
+    
+    def _graph_lock(self, cache_key: str) -> threading.Lock:
+        """Lock de carga del grafo de cache_key (se crea en el primer uso)"""
+        with self._graph_locks_guard:
+            return self._graph_locks.setdefault(cache_key, threading.Lock())
+    
+    def _load_or_download_graph(
+        self,
+        cache_key: str,
+        center: Coordinates,
+        radius_meters: int,
+        location_name: Optional[str]
+    ) -> nx.MultiDiGraph:
+        """Carga el grafo desde el cache en disco o lo descarga de OSM (con el lock de cache_key tomado)"""
         # 2. Verificar cache en disco
         cached_graph = self._load_graph_from_cache(cache_key)
         if cached_graph:
@@ -515,20 +565,7 @@ class RouteCalculator:
             )
             
             # Calcular métricas de la ruta
-            total_distance = 0
-            total_time = 0
-            
-            for i in range(len(route_nodes) - 1):
-                u, v = route_nodes[i], route_nodes[i + 1]
-                
-                # Obtener datos de la arista
-                # Nota: MultiDiGraph puede tener múltiples aristas entre nodos
-                edge_data = graph.get_edge_data(u, v)
-                if edge_data:
-                    # Tomar la primera arista (key=0)
-                    data = edge_data[0]
-                    total_distance += data.get('length', 0)
-                    total_time += data.get('travel_time', 0)
+            total_distance, total_time = self._path_metrics(graph, route_nodes)
             
             # Guardar en cache
             result = (route_nodes, total_distance, total_time)
@@ -548,6 +585,76 @@ class RouteCalculator:
             logger.error(f"❌ Error calculando ruta: {e}")
             return None
     
+    @staticmethod
+    def _path_metrics(graph: nx.MultiDiGraph, route_nodes: List[int]) -> Tuple[float, float]:
+        """Distancia (m) y tiempo (s) de una ruta, sumando sus aristas"""
+        total_distance = 0
+        total_time = 0
+        
+        for u, v in zip(route_nodes, route_nodes[1:]):
+            # Obtener datos de la arista
+            # Nota: MultiDiGraph puede tener múltiples aristas entre nodos
+            edge_data = graph.get_edge_data(u, v)
+            if edge_data:
+                # Tomar la primera arista (key=0)
+                data = edge_data[0]
+                total_distance += data.get('length', 0)
+                total_time += data.get('travel_time', 0)
+        
+        return total_distance, total_time
+    
+    def batch_route_metrics(
+        self,
+        graph: nx.MultiDiGraph,
+        origins: List[Coordinates],
+        destinations: List[Coordinates],
+        optimize_by: str = "time"
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Distancia y tiempo de la ruta óptima de cada origen a cada destino.
+        
+        Mismo resultado que calculate_route par por par, pero con todos los
+        puntos ubicados en el grafo en una sola llamada a nearest_nodes y un
+        solo Dijkstra por origen (hacia todos los destinos a la vez): N
+        búsquedas en lugar de N×M.
+        
+        Args:
+            graph: Grafo de la red vial
+            origins: Coordenadas de origen (filas)
+            destinations: Coordenadas de destino (columnas)
+            optimize_by: 'time' (tiempo) o 'distance' (distancia)
+            
+        Returns:
+            (distancia_metros, tiempo_segundos), matrices de
+            len(origins) x len(destinations); inf donde no hay ruta
+        """
+        weight = 'travel_time' if optimize_by == 'time' else 'length'
+        points = list(origins) + list(destinations)
+        nodes = ox.nearest_nodes(graph, [p.lon for p in points], [p.lat for p in points])
+        origin_nodes, dest_nodes = nodes[:len(origins)], nodes[len(origins):]
+        
+        distances = np.full((len(origins), len(destinations)), np.inf)
+        durations = np.full((len(origins), len(destinations)), np.inf)
+        rows: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}  # Orígenes en el mismo nodo
+        
+        for i, source in enumerate(origin_nodes):
+            if source not in rows:
+                # Solo predecesores: armar el camino a cada nodo alcanzable
+                # (single_source_dijkstra) cuesta mucho más que recorrer
+                # hacia atrás los M caminos que se usan
+                pred, dist = nx.dijkstra_predecessor_and_distance(graph, source, weight=weight)
+                for j, target in enumerate(dest_nodes):
+                    if target in dist:
+                        path = [target]
+                        while path[-1] != source:
+                            path.append(pred[path[-1]][0])  # El primero: el mismo camino de single_source_dijkstra
+                        distances[i, j], durations[i, j] = self._path_metrics(graph, path[::-1])
+                rows[source] = (distances[i], durations[i])
+            else:
+                distances[i], durations[i] = rows[source]
+        
+        return distances, durations
+    
     def get_route_coordinates(
         self,
         graph: nx.MultiDiGraph,
@@ -678,7 +785,6 @@ class RouteCalculator:
             Matriz NxN donde matrix[i][j] = distancia de i a j
         """
         n = len(locations)
-        matrix = np.zeros((n, n))
         
         logger.info(f"📊 Calculando matriz de distancias {n}x{n}")
         
@@ -686,22 +792,9 @@ class RouteCalculator:
         center = locations[0]
         graph = self.get_graph_for_area(center, 20000, location_name)
         
-        # Calcular distancias
-        for i in range(n):
-            for j in range(n):
-                if i == j:
-                    matrix[i][j] = 0
-                else:
-                    result = self.calculate_route(
-                        graph,
-                        locations[i],
-                        locations[j]
-                    )
-                    if result:
-                        _, distance, _ = result
-                        matrix[i][j] = distance
-                    else:
-                        matrix[i][j] = float('inf')
+        # Calcular distancias (un Dijkstra por origen)
+        matrix, _ = self.batch_route_metrics(graph, locations, locations)
+        np.fill_diagonal(matrix, 0)
         
         return matrix
 
@@ -739,6 +832,34 @@ def haversine_distance(coord1: Coordinates, coord2: Coordinates) -> float:
     return distance
 
 
+def haversine_distances(lats: np.ndarray, lons: np.ndarray, coord: Coordinates) -> np.ndarray:
+    """
+    Versión vectorizada de haversine_distance: de muchos puntos a uno.
+    
+    Misma fórmula, con arrays de NumPy en lugar de un punto por llamada
+    (el kernel quick_scores de app/scoring_numba.py la repite por candidato).
+    
+    Args:
+        lats, lons: float64 (N,) con las coordenadas en grados
+        coord: Punto de referencia
+        
+    Returns:
+        float64 (N,) con las distancias en metros
+    """
+    R = 6371000  # Radio de la Tierra en metros
+    
+    lat1, lon1 = np.radians(lats), np.radians(lons)
+    lat2, lon2 = np.radians(coord.lat), np.radians(coord.lon)
+    
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+    
+    return R * c
+
+
 # ============================================================================
 # EJEMPLO DE USO
 # ============================================================================
@@ -24,10 +24,14 @@ POR QUÉ ESTE ENFOQUE:
 - Robusto: No depende de un solo factor
 """
 
+from contextvars import ContextVar
 from datetime import datetime, timedelta
-from typing import List, Tuple, Dict, TYPE_CHECKING
+import heapq
+from typing import List, NamedTuple, Optional, Set, Tuple, Dict, TYPE_CHECKING
 import math
 
+import numpy as np
+
 if TYPE_CHECKING:
     import networkx as nx
 
@@ -35,9 +39,44 @@ from loguru import logger
 
 from app.models import (
     Order, Vehicle, Coordinates, AssignmentScore,
-    SystemConfig, OrderPriority
+    SystemConfig, OrderPriority, VehicleType
 )
 from app.routing import RouteCalculator, haversine_distance
+from app.scoring_numba import quick_scores
+
+# Config del request en curso (None = la del engine). El ScoringEngine es
+# uno solo por proceso: la config de un request no se pisa con la de otro
+_request_config: ContextVar[Optional[SystemConfig]] = ContextVar("scoring_request_config", default=None)
+
+# Scores ya calculados en un request: (vehículo, pedido, carga del vehículo).
+# Con la carga en la clave, asignarle un pedido al vehículo invalida sus
+# entradas (en un batch la carga solo crece)
+ScoreCache = Dict[Tuple[str, str, int], AssignmentScore]
+
+
+class VehicleArrays(NamedTuple):
+    """
+    Flota en formato SoA (un array por atributo, una posición por vehículo).
+    
+    Se arma una vez por batch (ScoringEngine.vehicle_arrays) y el pre-filtro
+    del modo fast opera sobre los arrays en lugar de recorrer los modelos
+    Pydantic. Solo current_load y current_weight_kg cambian al asignar
+    pedidos: se actualizan en el lugar (update_vehicle_arrays).
+    
+    - lat / lon: float64, ubicación actual
+    - zone: object, zona geográfica de la ubicación (_get_geographic_zone)
+    - max_capacity / current_load: int64, pedidos
+    - max_weight_kg / current_weight_kg: float64, kg (inf = sin límite de peso)
+    - performance: float64, score de performance del conductor
+    """
+    lat: np.ndarray
+    lon: np.ndarray
+    zone: np.ndarray
+    max_capacity: np.ndarray
+    current_load: np.ndarray
+    max_weight_kg: np.ndarray
+    current_weight_kg: np.ndarray
+    performance: np.ndarray
 
 
 class ScoringEngine:
@@ -60,11 +99,35 @@ class ScoringEngine:
             config: Configuración del sistema con pesos
             route_calculator: Calculador de rutas
         """
-        self.config = config
+        self._default_config = config
         self.route_calculator = route_calculator
         
         logger.info("ScoringEngine inicializado")
     
+    @property
+    def config(self) -> SystemConfig:
+        """Config del request en curso (set_request_config) o la del engine"""
+        return _request_config.get() or self._default_config
+    
+    @config.setter
+    def config(self, config: SystemConfig) -> None:
+        self._default_config = config
+    
+    @staticmethod
+    def set_request_config(config: Optional[SystemConfig]):
+        """
+        Usa config solo en el request (contexto asyncio) actual.
+        
+        Returns:
+            Token para volver a la config anterior con reset_request_config
+        """
+        return _request_config.set(config)
+    
+    @staticmethod
+    def reset_request_config(token) -> None:
+        """Vuelve a la config que había antes de set_request_config"""
+        _request_config.reset(token)
+    
     def calculate_distance_score(
         self,
         vehicle: Vehicle,
@@ -101,8 +164,9 @@ class ScoringEngine:
         score = 1.0 / (1.0 + normalized_distance * 5)
         
         logger.debug(
-            f"Distance score: {vehicle.id} -> {order.id}: "
-            f"{distance_km:.2f}km = {score:.3f}"
+            "Distance score: {} -> {}: "
+            "{:.2f}km = {:.3f}",
+            vehicle.id, order.id, distance_km, score
         )
         
         return score, distance_km
@@ -137,8 +201,9 @@ class ScoringEngine:
             score = available / max_capacity
         
         logger.debug(
-            f"Capacity score: {vehicle.id}: "
-            f"{available}/{max_capacity} = {score:.3f}"
+            "Capacity score: {}: "
+            "{}/{} = {:.3f}",
+            vehicle.id, available, max_capacity, score
         )
         
         return score, available
@@ -204,10 +269,11 @@ class ScoringEngine:
         score = min(score, 1.0)  # Mantener en rango 0-1
         
         logger.debug(
-            f"Time urgency score: {vehicle.id} -> {order.id}: "
-            f"{time_until_deadline:.0f}min disponible, "
-            f"{total_time_needed:.0f}min necesario, "
-            f"on_time={will_arrive_on_time}, score={score:.3f}"
+            "Time urgency score: {} -> {}: "
+            "{:.0f}min disponible, "
+            "{:.0f}min necesario, "
+            "on_time={}, score={:.3f}",
+            vehicle.id, order.id, time_until_deadline, total_time_needed, will_arrive_on_time, score
         )
         
         return score, time_until_deadline, will_arrive_on_time
@@ -291,10 +357,11 @@ class ScoringEngine:
         performance_score = (success_rate * 0.7) + (experience_score * 0.3)
         
         logger.debug(
-            f"Performance score: {vehicle.id}: "
-            f"success={success_rate:.2f}, "
-            f"exp={experience_score:.2f}, "
-            f"total={performance_score:.3f}"
+            "Performance score: {}: "
+            "success={:.2f}, "
+            "exp={:.2f}, "
+            "total={:.3f}",
+            vehicle.id, success_rate, experience_score, performance_score
         )
         
         return performance_score
@@ -329,7 +396,7 @@ class ScoringEngine:
         """
         from app.models import SERVICE_TIME_MINUTES
         
-        logger.info(f"🔍 Verificando factibilidad: {vehicle.id} + {new_order.id}")
+        logger.info("🔍 Verificando factibilidad: {} + {}", vehicle.id, new_order.id)
         
         # Si no hay pedidos actuales, solo verificar el nuevo
         if not vehicle.current_orders or len(vehicle.current_orders) == 0:
@@ -363,8 +430,9 @@ class ScoringEngine:
                 }
                 
                 logger.info(
-                    f"{'✓' if can_meet_deadline else '❌'} Vehículo sin pedidos: "
-                    f"{total_minutes:.1f}min, deadline_met={can_meet_deadline}"
+                    "{} Vehículo sin pedidos: "
+                    "{:.1f}min, deadline_met={}",
+                    '✓' if can_meet_deadline else '❌', total_minutes, can_meet_deadline
                 )
                 
                 return can_meet_deadline, info
@@ -476,9 +544,11 @@ class ScoringEngine:
             }
             
             logger.info(
-                f"{'✓' if all_deadlines_met else '❌'} Ruta completa: "
-                f"{len(stops_info)} stops, {total_time:.1f}min, "
-                f"deadlines_met={sum(deadlines_met)}/{len(deadlines_met)}"
+                "{} Ruta completa: "
+                "{} stops, {:.1f}min, "
+                "deadlines_met={}/{}",
+                '✓' if all_deadlines_met else '❌', len(stops_info), total_time,
+                sum(deadlines_met), len(deadlines_met)
             )
             
             return all_deadlines_met, info
@@ -516,7 +586,7 @@ class ScoringEngine:
         """
         from app.models import SERVICE_TIME_MINUTES
         
-        logger.debug(f"📊 Calculando interferencia (FAST): {vehicle.id} + {new_order.id}")
+        logger.debug("📊 Calculando interferencia (FAST): {} + {}", vehicle.id, new_order.id)
         
         # Si no hay pedidos actuales, interferencia es CERO (mejor caso)
         if not vehicle.current_orders or len(vehicle.current_orders) == 0:
@@ -549,7 +619,7 @@ class ScoringEngine:
             distances.sort(key=lambda x: x[0])
             orders_to_consider = [order for _, order in distances[:3]]
             
-            logger.debug(f"   Reducido: {len(vehicle.current_orders)} -> {len(orders_to_consider)} pedidos cercanos")
+            logger.debug("   Reducido: {} -> {} pedidos cercanos", len(vehicle.current_orders), len(orders_to_consider))
         
         # APROXIMACIÓN RÁPIDA: Calcular interferencia con distancias euclidianas
         # Solo calcular rutas reales si el nuevo pedido está "cerca" de alguno existente
@@ -574,7 +644,7 @@ class ScoringEngine:
             additional_time = (dist_to_new / 25.0) * 60 + SERVICE_TIME_MINUTES
             interference_score = 0.95  # Casi sin interferencia
             
-            logger.debug(f"   Pedido LEJOS ({min_distance_to_existing:.1f}km): interferencia mínima")
+            logger.debug("   Pedido LEJOS ({:.1f}km): interferencia mínima", min_distance_to_existing)
             return interference_score, additional_time
         
         # Si está CERCA (<10km), calcular con más precisión
@@ -638,8 +708,9 @@ class ScoringEngine:
             interference_score = max(0.0, 0.3 - (additional_time - 30) / 120)
         
         logger.debug(
-            f"   Interferencia (FAST): +{additional_time:.1f}min, "
-            f"score={interference_score:.3f}, dist_min={min_distance_to_existing:.1f}km"
+            "   Interferencia (FAST): +{:.1f}min, "
+            "score={:.3f}, dist_min={:.1f}km",
+            additional_time, interference_score, min_distance_to_existing
         )
         
         return interference_score, additional_time
@@ -677,7 +748,7 @@ class ScoringEngine:
         Returns:
             AssignmentScore con desglose completo
         """
-        logger.info(f"📊 Calculando score COMPLETO: {vehicle.id} <- {order.id}")
+        logger.info("📊 Calculando score COMPLETO: {} <- {}", vehicle.id, order.id)
         
         # 1. Score de CAPACIDAD (verificación rápida)
         capacity_score, available_capacity = self.calculate_capacity_score(vehicle)
@@ -726,8 +797,9 @@ class ScoringEngine:
                 )
                 
                 logger.info(
-                    f"✓ {vehicle.id}: Factible con +{additional_time:.1f}min, "
-                    f"interferencia_score={interference_score:.3f}"
+                    "✓ {}: Factible con +{:.1f}min, "
+                    "interferencia_score={:.3f}",
+                    vehicle.id, additional_time, interference_score
                 )
                 
             except Exception as e:
@@ -798,10 +870,12 @@ class ScoringEngine:
         )
         
         logger.info(
-            f"✓ Score calculado: {vehicle.id} <- {order.id}: {total_score:.3f} "
-            f"(dist={distance_score:.2f}, cap={capacity_score:.2f}, "
-            f"time={time_urgency_score:.2f}, route={route_compatibility_score:.2f}, "
-            f"perf={vehicle_performance_score:.2f}, interference={interference_score:.2f})"
+            "✓ Score calculado: {} <- {}: {:.3f} "
+            "(dist={:.2f}, cap={:.2f}, "
+            "time={:.2f}, route={:.2f}, "
+            "perf={:.2f}, interference={:.2f})",
+            vehicle.id, order.id, total_score, distance_score, capacity_score,
+            time_urgency_score, route_compatibility_score, vehicle_performance_score, interference_score
         )
         
         return assignment_score
@@ -973,7 +1047,7 @@ class ScoringEngine:
         Returns:
             Lista de tuplas (vehículo, score) ordenada por score descendente
         """
-        logger.info(f"🏆 Rankeando {len(vehicles)} vehículos para {order.id}")
+        logger.info("🏆 Rankeando {} vehículos para {}", len(vehicles), order.id)
         
         # Calcular score para cada vehículo
         scored_vehicles = []
@@ -984,18 +1058,131 @@ class ScoringEngine:
                 score = self.calculate_total_score(vehicle, order)
                 scored_vehicles.append((vehicle, score))
             else:
-                logger.debug(f"Vehículo {vehicle.id} no disponible, ignorado")
+                logger.debug("Vehículo {} no disponible, ignorado", vehicle.id)
         
         # Ordenar por score descendente (mejor primero)
         scored_vehicles.sort(key=lambda x: x[1].total_score, reverse=True)
         
         best_score = scored_vehicles[0][1].total_score if scored_vehicles else 0.0
         logger.info(
-            f"✓ Ranking completado: "
-            f"Mejor opción: {scored_vehicles[0][0].id if scored_vehicles else 'N/A'} "
-            f"(score: {best_score:.3f})"
+            "✓ Ranking completado: "
+            "Mejor opción: {} "
+            "(score: {:.3f})",
+            scored_vehicles[0][0].id if scored_vehicles else 'N/A', best_score
+        )
+        
+        return scored_vehicles
+    
+    def vehicle_arrays(self, vehicles: List[Vehicle]) -> VehicleArrays:
+        """Convierte la flota a VehicleArrays (ver rank_vehicles_fast)"""
+        return VehicleArrays(
+            lat=np.array([v.current_location.lat for v in vehicles], dtype=np.float64),
+            lon=np.array([v.current_location.lon for v in vehicles], dtype=np.float64),
+            zone=np.array([self._get_geographic_zone(v.current_location) for v in vehicles], dtype=object),
+            max_capacity=np.array([v.max_capacity for v in vehicles], dtype=np.int64),
+            current_load=np.array([v.current_load for v in vehicles], dtype=np.int64),
+            max_weight_kg=np.array(
+                [v.max_weight_kg if v.max_weight_kg is not None else np.inf for v in vehicles],
+                dtype=np.float64
+            ),
+            current_weight_kg=np.array([v.current_weight_kg for v in vehicles], dtype=np.float64),
+            performance=np.array([v.performance_score for v in vehicles], dtype=np.float64)
+        )
+    
+    def warm_up(self) -> None:
+        """Compila (o carga del cache de Numba) el kernel del modo fast con una flota de un vehículo"""
+        vehicle = Vehicle(
+            id="WARMUP",
+            vehicle_type=VehicleType.MOTO,
+            current_location=Coordinates(lat=-34.9055, lon=-56.1851)
+        )
+        arrays = self.vehicle_arrays([vehicle])
+        quick_scores(
+            arrays.lat, arrays.lon, arrays.max_capacity, arrays.current_load, arrays.performance,
+            np.flatnonzero(arrays.current_load < arrays.max_capacity), -34.9011, -56.1645
+        )
+    
+    @staticmethod
+    def update_vehicle_arrays(arrays: VehicleArrays, index: int, vehicle: Vehicle) -> None:
+        """Copia a los arrays la carga actual de un vehículo (tras asignarle un pedido)"""
+        arrays.current_load[index] = vehicle.current_load
+        arrays.current_weight_kg[index] = vehicle.current_weight_kg
+    
+    def _geographic_mask(self, arrays: VehicleArrays, order: Order) -> np.ndarray:
+        """Máscara de vehículos en la zona del pedido o adyacentes (todos si ninguno)"""
+        order_zone = self._get_geographic_zone(order.delivery_location)
+        allowed_zones = [order_zone] + self._get_adjacent_zones(order_zone)
+        mask = np.isin(arrays.zone, allowed_zones)
+        
+        logger.info(
+            "  🗺️  Filtro geográfico: {}/{} "
+            "vehículos en zona {} o adyacentes",
+            int(mask.sum()), len(mask), order_zone
         )
         
+        if not mask.any():
+            logger.warning("⚠️  Ningún vehículo en zonas relevantes, usando todos")
+            mask = np.ones(len(mask), dtype=bool)  # Fallback
+        
+        return mask
+    
+    def geographic_candidates(
+        self,
+        vehicles: List[Vehicle],
+        order: Order,
+        arrays: Optional[VehicleArrays] = None
+    ) -> List[Vehicle]:
+        """
+        Vehículos en la zona geográfica del pedido o en una adyacente.
+        
+        Es el pre-filtro de rank_vehicles_fast. Depende solo de la ubicación
+        de los vehículos (no de su carga), así que asignar pedidos no cambia
+        el resultado: el batch lo usa para saber qué vehículos pueden afectar
+        el ranking de cada pedido.
+        
+        Returns:
+            Vehículos filtrados, o todos si ninguno cae en zonas relevantes
+        """
+        if arrays is None:
+            arrays = self.vehicle_arrays(vehicles)
+        mask = self._geographic_mask(arrays, order)
+        return [vehicles[i] for i in np.flatnonzero(mask)]
+    
+    def rerank_vehicles(
+        self,
+        vehicles: List[Vehicle],
+        order: Order,
+        ranking: List[Tuple[Vehicle, AssignmentScore]],
+        changed_ids: Set[str]
+    ) -> List[Tuple[Vehicle, AssignmentScore]]:
+        """
+        Actualiza un ranking de rank_vehicles después de modificar algunos vehículos.
+        
+        El score de un vehículo depende solo del vehículo y del pedido, así
+        que se recalcula únicamente para los de changed_ids; el resto se
+        reutiliza. El orden final es el mismo que daría rank_vehicles sobre
+        el estado actual (mismo recorrido y mismo sort estable).
+        
+        Args:
+            vehicles: Lista de vehículos (estado actual)
+            order: Pedido a asignar
+            ranking: Resultado previo de rank_vehicles para este pedido
+            changed_ids: IDs de los vehículos modificados desde ese ranking
+            
+        Returns:
+            Lista de tuplas (vehículo, score) ordenada por score descendente
+        """
+        scores = {vehicle.id: score for vehicle, score in ranking}
+        
+        scored_vehicles = []
+        for vehicle in vehicles:
+            if vehicle.id in changed_ids:
+                if vehicle.is_available:
+                    scored_vehicles.append((vehicle, self.calculate_total_score(vehicle, order)))
+            elif vehicle.id in scores:
+                scored_vehicles.append((vehicle, scores[vehicle.id]))
+        
+        scored_vehicles.sort(key=lambda x: x[1].total_score, reverse=True)
         return scored_vehicles
     
     def _get_geographic_zone(self, location: Coordinates) -> str:
@@ -1053,11 +1240,40 @@ class ScoringEngine:
         }
         return adjacency.get(zone, [])
     
+    def find_top_k_vehicles(
+        self,
+        vehicles: List[Vehicle],
+        order: Order,
+        k: int = 4
+    ) -> List[Tuple[Vehicle, AssignmentScore]]:
+        """
+        Los k mejores vehículos para un pedido (mejor primero).
+        
+        Calcula el score de cada vehículo disponible una sola vez y se queda
+        con los k primeros con heapq.nlargest: mismo resultado que
+        rank_vehicles(...)[:k] sin ordenar toda la flota.
+        
+        Args:
+            vehicles: Lista de vehículos disponibles
+            order: Pedido a asignar
+            k: Cantidad de vehículos a retornar
+            
+        Returns:
+            Lista de hasta k tuplas (vehículo, score) ordenada por score descendente
+        """
+        scored_vehicles = [
+            (vehicle, self.calculate_total_score(vehicle, order))
+            for vehicle in vehicles
+            if vehicle.is_available
+        ]
+        return heapq.nlargest(k, scored_vehicles, key=lambda x: x[1].total_score)
+    
     def find_best_vehicle(
         self,
         vehicles: List[Vehicle],
         order: Order,
-        min_score_threshold: float = 0.3
+        min_score_threshold: float = 0.3,
+        ranked_vehicles: Optional[List[Tuple[Vehicle, AssignmentScore]]] = None
     ) -> Tuple[Vehicle, AssignmentScore] | None:
         """
         Encuentra el MEJOR vehículo para un pedido.
@@ -1066,11 +1282,14 @@ class ScoringEngine:
             vehicles: Lista de vehículos disponibles
             order: Pedido a asignar
             min_score_threshold: Score mínimo aceptable
+            ranked_vehicles: Ranking ya calculado (ej: find_top_k_vehicles),
+                para no volver a calcular los scores
             
         Returns:
             Tupla (mejor_vehículo, score) o None si no hay opciones válidas
         """
-        ranked_vehicles = self.rank_vehicles(vehicles, order)
+        if ranked_vehicles is None:
+            ranked_vehicles = self.rank_vehicles(vehicles, order)
         
         if not ranked_vehicles:
             logger.warning("No hay vehículos disponibles")
@@ -1087,8 +1306,9 @@ class ScoringEngine:
             return None
         
         logger.info(
-            f"🎯 Mejor vehículo seleccionado: {best_vehicle.id} "
-            f"(score: {best_score.total_score:.3f})"
+            "🎯 Mejor vehículo seleccionado: {} "
+            "(score: {:.3f})",
+            best_vehicle.id, best_score.total_score
         )
         
         return best_vehicle, best_score
@@ -1098,7 +1318,9 @@ class ScoringEngine:
         vehicles: List[Vehicle],
         order: Order,
         config: SystemConfig,
-        max_candidates: int = 3
+        max_candidates: int = 3,
+        arrays: Optional[VehicleArrays] = None,
+        score_cache: Optional[ScoreCache] = None
     ) -> List[Tuple[Vehicle, float]]:
         """
         Modo RÁPIDO con pre-filtering: Reduce 90-95% del tiempo de cálculo.
@@ -1111,105 +1333,72 @@ class ScoringEngine:
         4. Seleccionar top-N candidatos
         5. Solo para top-N: calcular rutas reales y scores completos
         
+        Las fases 0-3 son operaciones vectorizadas sobre VehicleArrays; el
+        batch pasa los arrays ya armados para no convertir la flota por pedido.
+        
         Args:
             vehicles: Lista de vehículos disponibles
             order: Pedido a asignar
             config: Configuración del sistema
             max_candidates: Número máximo de candidatos a evaluar completamente
+            arrays: La misma flota en formato SoA (se arma si no se pasa)
+            score_cache: Scores completos ya calculados en el request (el
+                batch re-rankea pedidos cuyos candidatos no cambiaron)
             
         Returns:
             Lista de (vehículo, score) ordenada por score descendente
         """
-        logger.info(f"🚀 Modo FAST: Pre-filtrando {len(vehicles)} vehículos para {order.id}")
-        
-        # FASE 0: Pre-filtro GEOGRÁFICO (nuevo - mayor impacto)
-        order_zone = self._get_geographic_zone(order.delivery_location)
-        adjacent_zones = self._get_adjacent_zones(order_zone)
-        allowed_zones = [order_zone] + adjacent_zones
+        logger.info("🚀 Modo FAST: Pre-filtrando {} vehículos para {}", len(vehicles), order.id)
         
-        geographic_filtered = []
-        for vehicle in vehicles:
-            vehicle_zone = self._get_geographic_zone(vehicle.current_location)
-            if vehicle_zone in allowed_zones:
-                geographic_filtered.append(vehicle)
+        if arrays is None:
+            arrays = self.vehicle_arrays(vehicles)
         
-        logger.info(
-            f"  🗺️  Filtro geográfico: {len(geographic_filtered)}/{len(vehicles)} "
-            f"vehículos en zona {order_zone} o adyacentes"
-        )
-        
-        if not geographic_filtered:
-            logger.warning("⚠️  Ningún vehículo en zonas relevantes, usando todos")
-            geographic_filtered = vehicles  # Fallback
+        # FASE 0: Pre-filtro GEOGRÁFICO (nuevo - mayor impacto)
+        mask = self._geographic_mask(arrays, order)
         
         # FASE 1: Pre-filtro por capacidad y peso (elimina imposibles)
-        candidates = []
-        for vehicle in geographic_filtered:
-            # Verificar capacidad
-            if vehicle.current_load >= vehicle.max_capacity:
-                logger.debug(f"  ❌ {vehicle.id}: Sin capacidad")
-                continue
-            
-            # Verificar peso
-            total_weight = sum(item.weight_kg for item in order.items)
-            if vehicle.current_weight_kg + total_weight > vehicle.max_weight_kg:
-                logger.debug(f"  ❌ {vehicle.id}: Excede peso máximo")
-                continue
-            
-            candidates.append(vehicle)
+        total_weight = order.items_weight_kg
+        mask &= arrays.current_load < arrays.max_capacity
+        mask &= arrays.current_weight_kg + total_weight <= arrays.max_weight_kg
+        candidates = np.flatnonzero(mask)
         
-        if not candidates:
+        if len(candidates) == 0:
             logger.warning("⚠️  Ningún vehículo cumple requisitos básicos")
             return []
         
-        logger.info(f"  ✓ {len(candidates)}/{len(vehicles)} vehículos cumplen requisitos básicos")
+        logger.info("  ✓ {}/{} vehículos cumplen requisitos básicos", len(candidates), len(vehicles))
         
         # FASE 2: Calcular scores rápidos (solo distancia euclidea + factores básicos)
-        quick_scores = []
-        for vehicle in candidates:
-            # Distancia euclidea (rápida)
-            distance_km = self.calculate_distance(
-                vehicle.current_location,
-                order.delivery_location
-            )
-            
-            # Score de distancia (0-1, 1=cerca)
-            distance_score = self._calculate_distance_score(distance_km, config)
-            
-            # Score de capacidad (0-1, 1=mucho espacio)
-            capacity_score = self._calculate_capacity_score(vehicle)
-            
-            # Score de performance (0-1, 1=mejor conductor)
-            performance_score = self._calculate_performance_score(vehicle)
-            
-            # Score rápido = promedio ponderado de factores básicos
-            # No incluye rutas reales, factibilidad ni interferencia
-            quick_score = (
-                distance_score * 0.4 +      # 40% distancia
-                capacity_score * 0.3 +       # 30% capacidad
-                performance_score * 0.3      # 30% performance
-            )
-            
-            quick_scores.append((vehicle, quick_score, distance_km))
+        # Score rápido = 40% distancia + 30% capacidad + 30% performance, en
+        # una pasada compilada (app/scoring_numba.py). No incluye rutas
+        # reales, factibilidad ni interferencia
+        quick_score, distance_km = quick_scores(
+            arrays.lat, arrays.lon, arrays.max_capacity, arrays.current_load, arrays.performance,
+            candidates, order.delivery_location.lat, order.delivery_location.lon
+        )
         
-        # Ordenar por quick_score descendente
-        quick_scores.sort(key=lambda x: x[1], reverse=True)
+        # Ordenar por quick_score descendente (sort estable: empates en orden de flota)
+        ranking = np.argsort(-quick_score, kind='stable')
         
         # FASE 3: Seleccionar top-N candidatos
-        top_candidates = quick_scores[:max_candidates]
+        top_candidates = [
+            (vehicles[candidates[k]], float(quick_score[k]), float(distance_km[k]))
+            for k in ranking[:max_candidates]
+        ]
         
         logger.info(
-            f"  ✓ Top {len(top_candidates)} candidatos seleccionados para análisis completo:"
+            "  ✓ Top {} candidatos seleccionados para análisis completo:",
+            len(top_candidates)
         )
         for vehicle, score, dist in top_candidates:
-            logger.info(f"    - {vehicle.id}: quick_score={score:.3f}, dist={dist:.2f}km")
+            logger.info("    - {}: quick_score={:.3f}, dist={:.2f}km", vehicle.id, score, dist)
         
         # FASE 4: Calcular scores COMPLETOS solo para top-N
-        logger.info(f"  🔍 Calculando scores completos para top {len(top_candidates)}...")
+        logger.info("  🔍 Calculando scores completos para top {}...", len(top_candidates))
         
         final_scores = []
         for vehicle, _, _ in top_candidates:
-            assignment_score = self.calculate_total_score(vehicle, order)
+            assignment_score = self.cached_total_score(vehicle, order, score_cache)
             if assignment_score.total_score > 0:  # Solo incluir si es factible
                 final_scores.append((vehicle, assignment_score.total_score))
         
@@ -1218,27 +1407,29 @@ class ScoringEngine:
         
         if final_scores:
             best_vehicle, best_score = final_scores[0]
-            logger.info(f"  ✓ Mejor opción (modo fast): {best_vehicle.id} (score: {best_score:.3f})")
+            logger.info("  ✓ Mejor opción (modo fast): {} (score: {:.3f})", best_vehicle.id, best_score)
         
         return final_scores
     
+    def cached_total_score(
+        self,
+        vehicle: Vehicle,
+        order: Order,
+        score_cache: Optional[ScoreCache] = None
+    ) -> AssignmentScore:
+        """calculate_total_score consultando primero score_cache (si se pasa)"""
+        if score_cache is None:
+            return self.calculate_total_score(vehicle, order)
+        
+        key = (vehicle.id, order.id, vehicle.current_load)
+        score = score_cache.get(key)
+        if score is None:
+            score = score_cache[key] = self.calculate_total_score(vehicle, order)
+        return score
+    
     def calculate_distance(self, loc1: Coordinates, loc2: Coordinates) -> float:
         """Calcula distancia euclidea en km."""
         return haversine_distance(loc1, loc2) / 1000
-    
-    def _calculate_distance_score(self, distance_km: float, config: SystemConfig) -> float:
-        """Score de distancia normalizado."""
-        normalized_distance = min(distance_km / 20.0, 1.0)
-        return 1.0 / (1.0 + normalized_distance)
-    
-    def _calculate_capacity_score(self, vehicle: Vehicle) -> float:
-        """Score de capacidad disponible."""
-        available = vehicle.max_capacity - vehicle.current_load
-        return available / vehicle.max_capacity
-    
-    def _calculate_performance_score(self, vehicle: Vehicle) -> float:
-        """Score de performance del conductor."""
-        return vehicle.performance_score if hasattr(vehicle, 'performance_score') else 0.5
 
 
 # ============================================================================
@@ -0,0 +1,57 @@
+"""
+Kernel de score rápido del modo fast, compilado con Numba.
+
+Una sola pasada sobre los candidatos de rank_vehicles_fast (VehicleArrays
+en formato SoA): haversine al pedido y score rápido de distancia,
+capacidad y performance, sin los arrays temporales de la versión NumPy.
+
+Numba es opcional (mismo reemplazo de njit que app/pip_numba.py): sin
+Numba el kernel corre como Python puro, con el mismo resultado.
+"""
+
+import math
+
+import numpy as np
+
+from app.pip_numba import njit
+
+EARTH_RADIUS_M = 6371000.0  # Igual que haversine_distance (app/routing.py)
+
+
+@njit(cache=True)
+def quick_scores(lat, lon, max_capacity, current_load, performance, candidates, order_lat, order_lon):
+    """
+    Score rápido de cada candidato para un pedido.
+
+    quick_score = 0.4 * distancia + 0.3 * capacidad + 0.3 * performance,
+    con distancia = 1 / (1 + min(km / 20, 1)) y capacidad = libre / máxima.
+
+    Args:
+        lat, lon: float64 (V,) ubicación de la flota en grados
+        max_capacity, current_load: int64 (V,) capacidad y carga de la flota
+        performance: float64 (V,) performance de cada conductor
+        candidates: int64 (N,) índices de la flota a evaluar
+        order_lat, order_lon: Ubicación del pedido en grados
+
+    Returns:
+        (quick_score, distance_km), float64 (N,) cada uno en el orden de
+        candidates
+    """
+    n = candidates.shape[0]
+    scores = np.empty(n)
+    distances = np.empty(n)
+    lat2 = math.radians(order_lat)
+    lon2 = math.radians(order_lon)
+    cos_lat2 = math.cos(lat2)
+    for k in range(n):
+        i = candidates[k]
+        lat1 = math.radians(lat[i])
+        dlat = lat2 - lat1
+        dlon = lon2 - math.radians(lon[i])
+        a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * cos_lat2 * math.sin(dlon / 2) ** 2
+        distance_km = EARTH_RADIUS_M * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)) / 1000
+        distance_score = 1.0 / (1.0 + min(distance_km / 20.0, 1.0))
+        capacity_score = (max_capacity[i] - current_load[i]) / max_capacity[i]
+        scores[k] = distance_score * 0.4 + capacity_score * 0.3 + performance[i] * 0.3
+        distances[k] = distance_km
+    return scores, distances
@@ -0,0 +1,272 @@
+"""
+Índice local de calles de la ciudad (snapshot de Overpass).
+
+En lugar de consultar Overpass por cada calle o intersección, se descarga
+una vez el snapshot completo de calles con nombre del bounding box de
+Montevideo, se agrupa por nombre y se guarda en disco (pickle). El servicio
+de geocodificación lo carga al iniciar y resuelve geometrías y calles
+cercanas en memoria (dict + STRtree).
+
+Generar / actualizar el snapshot:
+    python prefetch_streets.py
+
+Fuera de Montevideo se puede generar un snapshot por departamento
+(DEPARTMENT_SNAPSHOT_DIR), que el servicio carga la primera vez que
+consulta un punto fuera del snapshot principal:
+    python prefetch_streets.py Canelones Maldonado
+
+StreetNameIndex indexa nombres de calles por prefijo (autocompletado).
+
+StreetListStore guarda listados de calles por departamento/localidad en
+SQLite (STREETS_LIST_DB), pre-armados con:
+    python prefetch_streets.py --listados Montevideo Canelones
+"""
+
+import os
+import pickle
+import sqlite3
+import tempfile
+from bisect import bisect_left
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import shapely
+from loguru import logger
+from shapely.geometry import LineString, MultiLineString, box
+from shapely.strtree import STRtree
+
+# Bounding box de Montevideo (sur, oeste, norte, este)
+MONTEVIDEO_BBOX = (-34.95, -56.25, -34.75, -56.05)
+
+STREETS_SNAPSHOT_FILE = Path(os.getenv("CACHE_DIR", "./cache")) / "streets" / "montevideo.pkl"
+DEPARTMENT_SNAPSHOT_DIR = STREETS_SNAPSHOT_FILE.parent / "departamentos"
+STREETS_LIST_DB = STREETS_SNAPSHOT_FILE.parent / "listados.sqlite3"
+
+
+@lru_cache(maxsize=65536)
+def normalize_street_name(name: str) -> str:
+    """
+    Minúsculas, sin tildes y con espacios normalizados ("José" == "jose").
+
+    Memoizada: se llama en cada consulta de cache y en cada búsqueda de
+    esquinas, casi siempre con los mismos nombres.
+    """
+    normalized = name.lower()
+    if not normalized.isascii():  # Sin tildes no hay nada que descomponer
+        normalized = unicodedata.normalize('NFKD', normalized)
+        normalized = ''.join(c for c in normalized if not unicodedata.combining(c))
+    # split() sin argumentos corta por los mismos espacios que \s y
+    # descarta los de los extremos: equivale a re.sub(r'\s+', ' ').strip()
+    return ' '.join(normalized.split())
+
+
+def department_snapshot_path(departamento: str, directory: Path = DEPARTMENT_SNAPSHOT_DIR) -> Path:
+    """Archivo del snapshot de un departamento (ej: "Cerro Largo" → cerro_largo.pkl)"""
+    slug = normalize_street_name(departamento).replace(' ', '_')
+    return directory / f"{slug}.pkl"
+
+
+class StreetIndex:
+    """
+    Calles de un bounding box indexadas por nombre y por ubicación.
+
+    - names / geometries: listas paralelas (una entrada por calle, con sus
+      ways agrupados en un MultiLineString)
+    - normalized: nombres normalizados (normalize_street_name), precalculados
+    - by_name: nombre normalizado → posición
+    - tree: STRtree sobre las geometrías para búsquedas por bounding box
+    """
+
+    def __init__(self, names: List[str], geometries: List[Any], bbox: Tuple[float, float, float, float]):
+        self.names = names
+        self.geometries = geometries
+        self.bbox = bbox
+        self.normalized = [normalize_street_name(name) for name in names]
+        self.by_name: Dict[str, int] = {}
+        for i, name in enumerate(self.normalized):
+            self.by_name.setdefault(name, i)
+        self.tree = STRtree(geometries)
+        # Geometrías preparadas: se reutilizan en cada consulta, así los
+        # predicados (shapely.intersects) no rearman sus índices internos
+        shapely.prepare(self.tree.geometries)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_overpass_elements(cls, elements: Iterable[Dict[str, Any]],
+                               bbox: Tuple[float, float, float, float]) -> "StreetIndex":
+        """Construye el índice desde los elementos de una respuesta Overpass (out geom)"""
+        segments: Dict[str, List[LineString]] = {}
+        for element in elements:
+            if element.get("type") != "way" or not element.get("geometry"):
+                continue
+            name = element.get("tags", {}).get("name", "")
+            coords = [(node["lon"], node["lat"]) for node in element["geometry"]]
+            if name and len(coords) >= 2:
+                segments.setdefault(name, []).append(LineString(coords))
+
+        names = list(segments)
+        geometries = [
+            lines[0] if len(lines) == 1 else MultiLineString(lines)
+            for lines in segments.values()
+        ]
+        return cls(names, geometries, bbox)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Geometría de una calle por nombre (sin distinguir mayúsculas ni tildes)"""
+        i = self.by_name.get(normalize_street_name(name))
+        return self.geometries[i] if i is not None else None
+
+    def covers(self, lat: float, lon: float, radius: float = 0.0) -> bool:
+        """True si el cuadrado lat/lon ± radius queda dentro del snapshot"""
+        south, west, north, east = self.bbox
+        return (south <= lat - radius and lat + radius <= north and
+                west <= lon - radius and lon + radius <= east)
+
+    def nearby(self, lat: float, lon: float, radius: float) -> List[Dict[str, Any]]:
+        """
+        Calles que cruzan el cuadrado lat/lon ± radius.
+
+        Returns:
+            Lista de diccionarios con {name: str, geometry: LineString, norm: str}
+            (mismo formato que _get_nearby_streets_from_overpass, más el
+            nombre normalizado)
+        """
+        area = box(lon - radius, lat - radius, lon + radius, lat + radius)
+        hits = sorted(self.tree.query(area, predicate='intersects'))
+        return [
+            {"name": self.names[i], "geometry": self.geometries[i], "norm": self.normalized[i]}
+            for i in hits
+        ]
+
+    def save(self, path: Path = STREETS_SNAPSHOT_FILE) -> Path:
+        """Guarda el snapshot en disco (el STRtree se reconstruye al cargar)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Temporal único: dos prefetch del mismo snapshot no escriben el mismo archivo
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(
+                    {"names": self.names, "geometries": self.geometries, "bbox": self.bbox},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, path)  # Reemplazo atómico: los workers nunca leen a medias
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path = STREETS_SNAPSHOT_FILE) -> Optional["StreetIndex"]:
+        """Carga el snapshot si existe; None si no hay o está corrupto"""
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+            index = cls(data["names"], data["geometries"], tuple(data["bbox"]))
+            logger.info(f"✓ Índice de calles cargado: {len(index)} calles ({path})")
+            return index
+        except Exception as e:
+            logger.warning(f"⚠️  No se pudo cargar el índice de calles {path}: {e}")
+            return None
+
+    @classmethod
+    def load_all(cls, directory: Path = DEPARTMENT_SNAPSHOT_DIR) -> List["StreetIndex"]:
+        """Carga todos los snapshots de un directorio (los corruptos se saltean)"""
+        indexes = []
+        for path in sorted(directory.glob("*.pkl")):
+            index = cls.load(path)
+            if index is not None:
+                indexes.append(index)
+        return indexes
+
+
+class StreetNameIndex:
+    """
+    Nombres de calles indexados por prefijo, para autocompletado.
+
+    Lista ordenada de nombres normalizados (normalize_street_name) +
+    bisect: buscar un prefijo es O(log N + k) en lugar de recorrer todas
+    las calles del departamento.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        entries = sorted((normalize_street_name(name), name) for name in set(names))
+        self._keys = [key for key, _ in entries]
+        self._names = [name for _, name in entries]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def search(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Calles cuyo nombre empieza con prefix (sin distinguir mayúsculas ni tildes)"""
+        key = normalize_street_name(prefix)
+        start = bisect_left(self._keys, key)
+        end = bisect_left(self._keys, key + "\U0010ffff", lo=start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self._names[start:end]
+
+
+class StreetListStore:
+    """
+    Listados de calles por departamento/localidad en SQLite.
+
+    Una fila por calle, con clave (departamento, localidad, nombre)
+    normalizados con normalize_street_name (localidad '' = departamento
+    completo). Servir un listado es una consulta sobre la clave primaria
+    en lugar de Nominatim + Overpass (30-60 s).
+
+    Cada llamada abre su propia conexión: los endpoints la usan desde los
+    threads del executor y sqlite3 no comparte conexiones entre threads.
+    """
+
+    def __init__(self, path: Path = STREETS_LIST_DB):
+        self.path = path
+
+    @staticmethod
+    def _key(departamento: str, localidad: Optional[str]) -> Tuple[str, str]:
+        return normalize_street_name(departamento), normalize_street_name(localidad or '')
+
+    def get(self, departamento: str, localidad: Optional[str] = None) -> Optional[List[str]]:
+        """Listado pre-armado (ordenado alfabéticamente); None si no está en la base"""
+        if not self.path.exists():
+            return None
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            try:
+                rows = conn.execute(
+                    "SELECT name FROM streets WHERE departamento = ? AND localidad = ? ORDER BY name",
+                    self._key(departamento, localidad)
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️  No se pudo leer el listado de calles {self.path}: {e}")
+            return None
+        return [name for (name,) in rows] or None
+
+    def put(self, departamento: str, localidad: Optional[str], names: Iterable[str]) -> int:
+        """Reemplaza el listado de un departamento/localidad; devuelve la cantidad de calles"""
+        key = self._key(departamento, localidad)
+        rows = [(*key, name) for name in set(names)]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:  # Una transacción: los lectores ven el listado viejo o el nuevo
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS streets ("
+                    "departamento TEXT NOT NULL, localidad TEXT NOT NULL, name TEXT NOT NULL, "
+                    "PRIMARY KEY (departamento, localidad, name)) WITHOUT ROWID"
+                )
+                conn.execute("DELETE FROM streets WHERE departamento = ? AND localidad = ?", key)
+                conn.executemany("INSERT INTO streets VALUES (?, ?, ?)", rows)
+        finally:
+            conn.close()
+        return len(rows)
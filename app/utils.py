@@ -2,14 +2,71 @@
 Utilidades para conversión de coordenadas y funciones auxiliares.
 """
 
-from typing import Tuple
+from functools import lru_cache
+from typing import Dict, List, Tuple
 from pyproj import Transformer, CRS
 from loguru import logger
 
+WGS84_CRS = CRS('EPSG:4326')  # WGS84 (lat/lon)
+
+# Decimales para memoizar lat_lon_to_utm (5 decimales ≈ 1 metro)
+UTM_CACHE_DECIMALS = 5
+
+# Alfabeto base32 de geohash (sin a, i, l, o)
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+@lru_cache(maxsize=64)
+def _get_utm_transformers(zone_number: int, south: bool) -> Tuple[Transformer, Transformer]:
+    """
+    Transformadores WGS84 → UTM y UTM → WGS84 de una zona.
+
+    Construir el CRS y el Transformer cuesta mucho más que transformar un
+    punto, así que se crean una sola vez por zona/hemisferio.
+    """
+    utm_crs = CRS(proj='utm', zone=zone_number, ellps='WGS84', south=south)
+    return (
+        Transformer.from_crs(WGS84_CRS, utm_crs, always_xy=True),
+        Transformer.from_crs(utm_crs, WGS84_CRS, always_xy=True)
+    )
+
+
+def get_utm_transformer(lat: float, lon: float) -> Transformer:
+    """
+    Transformador WGS84 → UTM (x, y en metros) de la zona del punto.
+
+    Cacheado por zona: sirve para proyectar muchas geometrías de una vez
+    (ej: shapely.transform) y trabajar en metros en un plano local.
+    """
+    zone_number = int((lon + 180) / 6) + 1
+    return _get_utm_transformers(zone_number, lat < 0)[0]
+
+
+@lru_cache(maxsize=65536)
+def _utm_cached(lat: float, lon: float) -> Tuple[float, float, str]:
+    """Conversión a UTM memoizada (recibe coordenadas ya redondeadas)"""
+    # Calcular zona UTM automáticamente
+    # Zona UTM = floor((lon + 180) / 6) + 1
+    zone_number = int((lon + 180) / 6) + 1
+
+    # Determinar hemisferio (N o S)
+    hemisphere_letter = 'N' if lat >= 0 else 'S'
+
+    to_utm, _ = _get_utm_transformers(zone_number, lat < 0)
+
+    # Convertir (lon, lat) -> (utm_x, utm_y)
+    utm_x, utm_y = to_utm.transform(lon, lat)
+
+    # Formato de zona: "21S" para Uruguay
+    return utm_x, utm_y, f"{zone_number}{hemisphere_letter}"
+
 
 def lat_lon_to_utm(lat: float, lon: float) -> Tuple[float, float, str]:
     """
     Convierte coordenadas geográficas (latitud, longitud) a UTM (X, Y).
+
+    Las coordenadas se redondean a UTM_CACHE_DECIMALS (~1 m) y el resultado
+    se memoiza: en los lotes se repiten los mismos puntos una y otra vez.
     
     Args:
         lat: Latitud en grados decimales
@@ -27,28 +84,13 @@ def lat_lon_to_utm(lat: float, lon: float) -> Tuple[float, float, str]:
         UTM: 427633.84, 6138077.45 - Zona: 21S
     """
     try:
-        # Calcular zona UTM automáticamente
-        # Zona UTM = floor((lon + 180) / 6) + 1
-        zone_number = int((lon + 180) / 6) + 1
-        
-        # Determinar hemisferio (N o S)
-        hemisphere = 'north' if lat >= 0 else 'south'
-        hemisphere_letter = 'N' if lat >= 0 else 'S'
-        
-        # Crear sistema de coordenadas UTM
-        utm_crs = CRS(proj='utm', zone=zone_number, ellps='WGS84', south=(hemisphere == 'south'))
-        wgs84_crs = CRS('EPSG:4326')  # WGS84 (lat/lon)
-        
-        # Crear transformador
-        transformer = Transformer.from_crs(wgs84_crs, utm_crs, always_xy=True)
-        
-        # Convertir (lon, lat) -> (utm_x, utm_y)
-        utm_x, utm_y = transformer.transform(lon, lat)
+        utm_x, utm_y, zone_str = _utm_cached(
+            round(lat, UTM_CACHE_DECIMALS),
+            round(lon, UTM_CACHE_DECIMALS)
+        )
         
-        # Formato de zona: "21S" para Uruguay
-        zone_str = f"{zone_number}{hemisphere_letter}"
-        
-        logger.debug(f"Conversión UTM: ({lat}, {lon}) -> ({utm_x:.2f}, {utm_y:.2f}) Zona {zone_str}")
+        # Argumentos diferidos: con DEBUG apagado un acierto del memo no formatea nada
+        logger.debug("Conversión UTM: ({}, {}) -> ({:.2f}, {:.2f}) Zona {}", lat, lon, utm_x, utm_y, zone_str)
         
         return utm_x, utm_y, zone_str
         
@@ -57,6 +99,12 @@ def lat_lon_to_utm(lat: float, lon: float) -> Tuple[float, float, str]:
         raise
 
 
+def utm_cache_stats() -> Dict[str, int]:
+    """Aciertos / fallos / tamaño del memo de lat_lon_to_utm (para /api/v1/stats)"""
+    info = _utm_cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+
 def utm_to_lat_lon(utm_x: float, utm_y: float, zone_number: int, hemisphere: str = 'south') -> Tuple[float, float]:
     """
     Convierte coordenadas UTM (X, Y) a geográficas (latitud, longitud).
@@ -76,15 +124,11 @@ def utm_to_lat_lon(utm_x: float, utm_y: float, zone_number: int, hemisphere: str
         Lat/Lon: -34.903300, -56.188200
     """
     try:
-        # Crear sistema de coordenadas UTM
-        utm_crs = CRS(proj='utm', zone=zone_number, ellps='WGS84', south=(hemisphere == 'south'))
-        wgs84_crs = CRS('EPSG:4326')  # WGS84 (lat/lon)
-        
-        # Crear transformador
-        transformer = Transformer.from_crs(utm_crs, wgs84_crs, always_xy=True)
+        # Transformador cacheado por zona
+        _, to_wgs84 = _get_utm_transformers(zone_number, hemisphere == 'south')
         
         # Convertir (utm_x, utm_y) -> (lon, lat)
-        lon, lat = transformer.transform(utm_x, utm_y)
+        lon, lat = to_wgs84.transform(utm_x, utm_y)
         
         logger.debug(f"Conversión lat/lon: ({utm_x:.2f}, {utm_y:.2f}) -> ({lat}, {lon})")
         
@@ -93,3 +137,82 @@ def utm_to_lat_lon(utm_x: float, utm_y: float, zone_number: int, hemisphere: str
     except Exception as e:
         logger.error(f"Error en conversión UTM a lat/lon: {e}")
         raise
+
+
+def geohash_encode(lat: float, lon: float, precision: int = 8) -> str:
+    """
+    Geohash de un punto: celda rectangular identificada por un string.
+
+    Puntos cercanos comparten celda (precisión 8 ≈ 38 x 19 m en el ecuador),
+    así que sirve como clave de cache espacial.
+
+    Args:
+        lat, lon: Coordenadas del punto
+        precision: Cantidad de caracteres (5 bits cada uno)
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # Los bits alternan longitud / latitud, empezando por longitud
+
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = value * 2 + 1
+            rng[0] = mid
+        else:
+            value = value * 2
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_BASE32[value])
+            bits = 0
+            value = 0
+
+    return ''.join(chars)
+
+
+def geohash_bounds(code: str) -> Tuple[float, float, float, float]:
+    """Límites (lat_min, lat_max, lon_min, lon_max) de una celda geohash"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in code:
+        value = _GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def geohash_neighbors(code: str) -> List[str]:
+    """
+    Las 8 celdas vecinas de una celda geohash (misma precisión).
+
+    Orden: primero las que comparten lado (N, S, E, O), después las diagonales.
+    """
+    lat_min, lat_max, lon_min, lon_max = geohash_bounds(code)
+    lat = (lat_min + lat_max) / 2
+    lon = (lon_min + lon_max) / 2
+    dlat = lat_max - lat_min
+    dlon = lon_max - lon_min
+
+    neighbors = []
+    for i, j in ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)):
+        neighbor_lat = lat + i * dlat
+        if not -90 < neighbor_lat < 90:
+            continue
+        neighbor_lon = (lon + j * dlon + 180) % 360 - 180
+        neighbors.append(geohash_encode(neighbor_lat, neighbor_lon, len(code)))
+    return neighbors
@@ -7,61 +7,471 @@ Soporta dos tipos de zonificación para Montevideo:
 - Zonas Globales (ZONAS_4): Zonas administrativas/geográficas generales
 """
 
+import hashlib
 import json
 import logging
+import os
+import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, NamedTuple
 
-from shapely.geometry import Point, Polygon, shape, MultiPolygon
+import numpy as np
+import shapely
+from shapely.geometry import Point, shape, mapping, MultiPolygon, box
 from shapely.prepared import prep
+from shapely.strtree import STRtree
+
+from app.pip_numba import NUMBA_AVAILABLE, contains_batch
 
 logger = logging.getLogger(__name__)
 
+# GeoParquet (opcional): geometrías en WKB, mucho más rápido que parsear GeoJSON.
+# Se genera en cache/zones la primera vez que se lee cada GeoJSON (o antes,
+# con geojson_to_parquet.py); si geopandas no está disponible se usa el GeoJSON.
+try:
+    import geopandas as gpd
+    GEOPANDAS_AVAILABLE = True
+except ImportError:
+    GEOPANDAS_AVAILABLE = False
+
+# H3 (opcional): tabla celda → zonas candidatas. Reemplaza el recorrido
+# del STRtree por un lookup en dict para la gran mayoría de las consultas.
+try:
+    import h3
+    H3_AVAILABLE = True
+except ImportError:
+    H3_AVAILABLE = False
+
+# ijson (opcional): parseo en streaming del GeoJSON, feature por feature.
+# `import ijson` elige el backend más rápido disponible (yajl2_c si está).
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Propiedades del GeoJSON que viajan en cada zona. El resto (OBJECTID,
+# PERIMETER, Shape_Leng...) queda en el índice y se pide con ?fields=
+ZONE_DEFAULT_PROPERTIES = ('Codigo', 'Shape_Area', 'name')
+
+H3_RESOLUTION = 8  # Celdas de ~0.74 km²
+# Derivados de los GeoJSON (tablas H3 y GeoParquet), con el hash del
+# archivo en el nombre: fuera de app/data, que se monta como volumen
+ZONES_CACHE_DIR = Path(os.getenv("CACHE_DIR", "./cache")) / "zones"
+
+# Memo de búsquedas por celda de grilla (lat/lon redondeados a 4 decimales, ~11 m)
+ZONE_GRID_SCALE = 10_000
+ZONE_GRID_CACHE_SIZE = int(os.getenv("ZONE_GRID_CACHE_SIZE", "65536"))
+_AMBIGUOUS = object()  # Celda que cruza un borde: requiere búsqueda exacta
+
+
+class ZoneRings(NamedTuple):
+    """
+    Coordenadas de una zona en formato SoA (mismo layout interno que GEOS).
+    
+    - coords: float64 (N, 2) con (lon, lat) de todos los anillos concatenados
+    - ring_offsets: int32 (R+1), el anillo r es coords[ring_offsets[r]:ring_offsets[r+1]]
+    - poly_offsets: int32 (P+1), el polígono p son los anillos poly_offsets[p]:poly_offsets[p+1]
+    - ring_is_hole: bool (R), True para anillos interiores
+    """
+    coords: np.ndarray
+    ring_offsets: np.ndarray
+    poly_offsets: np.ndarray
+    ring_is_hole: np.ndarray
+
+
+def _ring_arrays(geometry: Any) -> ZoneRings:
+    """Convierte un Polygon/MultiPolygon a arrays contiguos de anillos"""
+    rings = []
+    is_hole = []
+    poly_offsets = [0]
+    
+    for polygon in shapely.get_parts(geometry):
+        rings.append(polygon.exterior)
+        is_hole.append(False)
+        rings.extend(polygon.interiors)
+        is_hole.extend([True] * len(polygon.interiors))
+        poly_offsets.append(len(rings))
+    
+    coords, ring_index = shapely.get_coordinates(np.array(rings, dtype=object), return_index=True)
+    counts = np.bincount(ring_index, minlength=len(rings))
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.int32)
+    np.cumsum(counts, out=ring_offsets[1:])
+    
+    return ZoneRings(
+        coords=np.ascontiguousarray(coords, dtype=np.float64),
+        ring_offsets=ring_offsets,
+        poly_offsets=np.asarray(poly_offsets, dtype=np.int32),
+        ring_is_hole=np.asarray(is_hole, dtype=bool)
+    )
+
+
+class ZoneIndex:
+    """
+    Índice espacial de un conjunto de zonas.
+    
+    Combina un STRtree (descarta por bounding box en O(log N)) con los
+    polígonos preparados (confirman el point-in-polygon en O(log V)).
+    Las zonas se guardan ordenadas por área, así que el índice más bajo
+    entre los candidatos es siempre la zona más específica. Las coordenadas
+    de cada zona también quedan en arrays contiguos (ZoneRings) para
+    estadísticas vectorizadas y kernels numéricos.
+    """
+    
+    def __init__(self, zones: List[Dict[str, Any]], geometries: List[Any]):
+        self.zones = zones
+        self.geometries = geometries
+        self.prepared = [prep(geom) for geom in geometries]
+        self.tree = STRtree(geometries)
+        # Áreas en array para reordenar candidatos sin sort en Python
+        self.areas = np.array([zone['area'] or 0 for zone in zones], dtype=np.float64)
+        # Bounding boxes contiguos (minx, miny, maxx, maxy) para prefiltro vectorizado
+        self.bboxes = shapely.bounds(np.array(geometries, dtype=object)).reshape(-1, 4)
+        self.rings = [_ring_arrays(geom) for geom in geometries]
+        # Propiedades completas del GeoJSON (las zonas llevan solo las usadas)
+        self.full_properties: List[Dict[str, Any]] = [{} for _ in zones]
+        # Tabla H3 celda → índices de zonas (ver _load_h3_lookup)
+        self.cells: Optional[Dict[str, List[int]]] = None
+        # LRU por instancia: al recargar las zonas se crea un índice nuevo
+        # y el memo viejo se descarta con él
+        self.zone_for_cell = lru_cache(maxsize=ZONE_GRID_CACHE_SIZE)(self._zone_for_cell)
+    
+    def __len__(self) -> int:
+        return len(self.zones)
+    
+    def position(self, zone_info: Dict[str, Any]) -> Optional[int]:
+        """Posición de una zona en el índice (por identidad o, si no, por ID)"""
+        for i, zone in enumerate(self.zones):
+            if zone is zone_info:
+                return i
+        for i, zone in enumerate(self.zones):
+            if zone['id'] == zone_info.get('id'):
+                return i
+        return None
+    
+    def bbox_candidates(self, lat: float, lon: float) -> np.ndarray:
+        """
+        Índices de zonas cuyo bounding box contiene el punto (en orden de área).
+        
+        Cuatro comparaciones vectorizadas sobre el array de bboxes. Para un
+        solo punto el overhead de NumPy supera al STRtree/H3, así que se usa
+        en lotes y diagnóstico, no en find_zone.
+        """
+        b = self.bboxes
+        mask = (b[:, 0] <= lon) & (lon <= b[:, 2]) & (b[:, 1] <= lat) & (lat <= b[:, 3])
+        return np.flatnonzero(mask)
+    
+    def candidates(self, point: Point) -> List[int]:
+        """Índices de zonas que pueden contener el punto, en orden de área."""
+        if self.cells is not None:
+            cands = self.cells.get(h3.latlng_to_cell(point.y, point.x, H3_RESOLUTION))
+            if cands is not None:
+                return cands
+        cands = self.tree.query(point)
+        return cands[np.argsort(self.areas[cands], kind='stable')].tolist()
+    
+    def find_zone(self, point: Point) -> Optional[Dict[str, Any]]:
+        """
+        Retorna la zona más pequeña que contiene el punto, o None.
+        
+        Corta en el primer candidato que contiene el punto: es la semántica
+        de producción (la zona más específica gana).
+        """
+        for i in self.candidates(point):
+            if self.prepared[i].contains(point):
+                return self.zones[i]
+        return None
+    
+    def _zone_for_cell(self, lat_cell: int, lon_cell: int) -> Any:
+        """
+        Resuelve una celda de grilla completa, si es posible.
+        
+        La celda solo se memoiza si no toca ninguna zona (None) o si toca
+        una sola que la contiene entera; si cruza un borde retorna
+        _AMBIGUOUS y el punto se busca de forma exacta. Así el memo nunca
+        cambia el resultado respecto de find_zone.
+        """
+        half = 0.5 / ZONE_GRID_SCALE + 1e-9  # Margen para cubrir la celda cerrada
+        lat = lat_cell / ZONE_GRID_SCALE
+        lon = lon_cell / ZONE_GRID_SCALE
+        cell = box(lon - half, lat - half, lon + half, lat + half)
+        
+        cands = self.tree.query(cell, predicate='intersects')
+        if len(cands) == 0:
+            return None
+        if len(cands) == 1 and self.prepared[cands[0]].contains(cell):
+            return self.zones[cands[0]]
+        return _AMBIGUOUS
+    
+    def find_zone_at(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """
+        find_zone con memo por celda de ~11 m (direcciones repetidas).
+        
+        Las celdas en el interior de una zona se resuelven desde el LRU;
+        las que caen sobre un borde pasan por find_zone con el punto exacto.
+        """
+        zone_info = self.zone_for_cell(round(lat * ZONE_GRID_SCALE), round(lon * ZONE_GRID_SCALE))
+        if zone_info is _AMBIGUOUS:
+            return self.find_zone(Point(lon, lat))
+        return zone_info
+    
+    def diagnose_zone(self, point: Point) -> List[int]:
+        """
+        Retorna los índices de TODAS las zonas que contienen el punto.
+        
+        Solo para diagnóstico (scripts de análisis): evalúa todos los
+        candidatos en lugar de cortar en el primero.
+        """
+        return [i for i in self.candidates(point) if self.prepared[i].contains(point)]
+    
+    def find_zone_indices(self, points_xy: np.ndarray) -> np.ndarray:
+        """
+        Versión por lotes de find_zone para muchos puntos a la vez.
+        
+        Recorre las zonas en orden de área y evalúa solo los puntos todavía
+        sin zona que caen en el bounding box. Usa el kernel Numba sobre los
+        arrays SoA si está disponible, o shapely.contains_xy si no.
+        
+        Args:
+            points_xy: Array (M, 2) con (lon, lat) de cada punto
+        
+        Returns:
+            Array int64 (M,) con el índice de zona de cada punto (-1 si ninguna)
+        """
+        points_xy = np.ascontiguousarray(points_xy, dtype=np.float64)
+        result = np.full(len(points_xy), -1, dtype=np.int64)
+        
+        for i, rings in enumerate(self.rings):
+            pending = np.flatnonzero(result < 0)
+            if len(pending) == 0:
+                break
+            
+            minx, miny, maxx, maxy = self.bboxes[i]  # Prefiltro por bounding box
+            x = points_xy[pending, 0]
+            y = points_xy[pending, 1]
+            pending = pending[(x >= minx) & (x <= maxx) & (y >= miny) & (y <= maxy)]
+            if len(pending) == 0:
+                continue
+            
+            subset = points_xy[pending]
+            if NUMBA_AVAILABLE:
+                hits = contains_batch(subset, rings.coords, rings.ring_offsets)
+            else:
+                hits = shapely.contains_xy(self.geometries[i], subset[:, 0], subset[:, 1])
+            result[pending[hits]] = i
+        
+        return result
+
+
+def _build_h3_lookup(index: ZoneIndex) -> Dict[str, List[int]]:
+    """
+    Construye la tabla celda H3 → zonas que la intersectan (en orden de área).
+    
+    Cubre el bounding box de todas las zonas más un anillo de celdas, así
+    que cualquier punto que pueda caer en una zona tiene su celda en la
+    tabla; celdas con lista vacía no contienen ninguna zona.
+    """
+    minx, miny, maxx, maxy = shapely.total_bounds(index.geometries)
+    bbox = h3.LatLngPoly([(miny, minx), (miny, maxx), (maxy, maxx), (maxy, minx)])
+    cells = set()
+    for cell in h3.h3shape_to_cells(bbox, H3_RESOLUTION):
+        cells.update(h3.grid_disk(cell, 1))
+    cells = sorted(cells)
+    
+    # Bordes de la celda en lon/lat (buffer mínimo para cubrir la diferencia
+    # entre el borde geodésico de H3 y el segmento recto). Los vértices de
+    # todas las celdas van en un solo array: anillos, polígonos y buffer se
+    # arman con una llamada vectorizada cada uno en lugar de uno por celda
+    boundaries = [h3.cell_to_boundary(cell) for cell in cells]
+    ring_index = np.repeat(np.arange(len(cells)), [len(b) for b in boundaries])
+    latlng = np.array([vertex for b in boundaries for vertex in b], dtype=np.float64)
+    rings = shapely.linearrings(latlng[:, ::-1], indices=ring_index)
+    cell_polygons = shapely.buffer(shapely.polygons(rings), 1e-6)
+    cell_idx, zone_idx = index.tree.query(cell_polygons, predicate='intersects')
+    
+    lookup: Dict[str, List[int]] = {cell: [] for cell in cells}
+    for ci, zi in sorted(zip(cell_idx.tolist(), zone_idx.tolist()), key=lambda x: x[1]):
+        lookup[cells[ci]].append(zi)
+    return lookup
+
+
+def _load_h3_lookup(zones_file: Path, index: ZoneIndex) -> Optional[Dict[str, List[int]]]:
+    """
+    Obtiene la tabla H3 de un archivo de zonas, persistida en disco.
+    
+    La tabla depende solo del contenido del archivo, así que se guarda en
+    cache/zones con el hash del archivo en el nombre y se reutiliza entre
+    reinicios y workers.
+    """
+    try:
+        cache_file = ZONES_CACHE_DIR / f"{zones_file.stem}_h3r{H3_RESOLUTION}_{_file_digest(zones_file)}.json"
+        
+        if cache_file.exists():
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        lookup = _build_h3_lookup(index)
+        
+        ZONES_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(lookup, f)
+        logger.info(f"🔷 Tabla H3 de {zones_file.name}: {len(lookup)} celdas → {cache_file.name}")
+        return lookup
+        
+    except Exception as e:
+        logger.warning(f"⚠️  No se pudo construir la tabla H3 de {zones_file.name}: {e}")
+        return None
+
+
+# Índices construidos por archivo: {ruta: (mtime, ZoneIndex)}
+# Se reutilizan entre requests y se reconstruyen solo si cambia el archivo
+_zone_indexes: Dict[str, Tuple[float, ZoneIndex]] = {}
+
 # Variables globales para almacenar las zonas cargadas
 _zones_flete: List[Dict[str, Any]] = []
 _prepared_polygons_flete: List[Tuple[Dict[str, Any], Any]] = []
+_index_flete: Optional[ZoneIndex] = None
 
 _zones_global: List[Dict[str, Any]] = []
 _prepared_polygons_global: List[Tuple[Dict[str, Any], Any]] = []
+_index_global: Optional[ZoneIndex] = None
 
 # Variables para zonas legacy (compatibilidad hacia atrás)
 _zones_data: List[Dict[str, Any]] = []
 _prepared_polygons: List[Tuple[Dict[str, Any], Any]] = []
+_index_legacy: Optional[ZoneIndex] = None
+
+
+def _zones_path(filename: str) -> Path:
+    """Ruta absoluta de un archivo de zonas dentro de app/data"""
+    return Path(__file__).parent / "data" / filename
+
+
+def _file_digest(path: Path) -> str:
+    """Hash corto del contenido de un archivo (nombre de sus derivados en cache/zones)"""
+    return hashlib.sha1(path.read_bytes()).hexdigest()[:16]
+
+
+def zones_parquet_path(zones_file: Path) -> Path:
+    """GeoParquet de un archivo de zonas en cache/zones (cambia con el contenido del GeoJSON)"""
+    return ZONES_CACHE_DIR / f"{zones_file.stem}_{_file_digest(zones_file)}.parquet"
+
+
+def write_zones_parquet(features: List[Tuple[Dict[str, Any], Any]], parquet_file: Path) -> Path:
+    """
+    Guarda las features (properties, geometría shapely) como GeoParquet.
+    
+    Las propiedades se guardan como texto JSON en una columna: las features
+    no tienen todas las mismas columnas y pasarlas a tabla convertiría
+    enteros en float (NaN) y cambiaría los IDs de zona.
+    """
+    gdf = gpd.GeoDataFrame(
+        {'properties': [json.dumps(properties, ensure_ascii=False) for properties, _ in features]},
+        geometry=[polygon for _, polygon in features],
+        crs='EPSG:4326'
+    )
+    parquet_file.parent.mkdir(parents=True, exist_ok=True)
+    # Temporal único + reemplazo atómico: varios workers pueden generarlo a la vez
+    with tempfile.NamedTemporaryFile(dir=parquet_file.parent, suffix='.tmp', delete=False) as f:
+        tmp_file = f.name
+    try:
+        gdf.to_parquet(tmp_file)
+        os.replace(tmp_file, parquet_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return parquet_file
 
 
-def _load_zones_from_file(filename: str) -> Tuple[List[Dict[str, Any]], List[Tuple[Dict[str, Any], Any]]]:
+def _read_zone_features(zones_file: Path) -> Tuple[Path, List[Tuple[Dict[str, Any], Any]]]:
+    """
+    Lee las features de un archivo de zonas.
+    
+    Si existe su GeoParquet en cache/zones (zones_parquet_path, con el hash
+    del GeoJSON en el nombre), se lee ese: las geometrías llegan como WKB y
+    no hace falta reconstruirlas coordenada por coordenada. Si no, el GeoJSON
+    se parsea en streaming con ijson (o json.load si ijson no está instalado)
+    y se guarda el GeoParquet para el próximo arranque y los demás workers.
+    
+    Las coordenadas solo viven como geometría shapely: el dict GeoJSON de
+    cada feature se descarta apenas se construye la geometría.
+    
+    Returns:
+        Tupla con (archivo_leído, [(properties, geometry_shapely)])
+    """
+    parquet_file = zones_parquet_path(zones_file) if GEOPANDAS_AVAILABLE else None
+    
+    if parquet_file is not None and parquet_file.exists():
+        try:
+            gdf = gpd.read_parquet(parquet_file)
+            features = [
+                (json.loads(properties), polygon)
+                for properties, polygon in zip(gdf['properties'], gdf.geometry)
+            ]
+            return parquet_file, features
+        except Exception as e:
+            logger.warning(f"⚠️  No se pudo leer {parquet_file.name}, usando GeoJSON: {e}")
+    
+    features = []
+    
+    if IJSON_AVAILABLE:
+        # Streaming: nunca se materializa la FeatureCollection completa
+        with open(zones_file, 'rb') as f:
+            for feature in ijson.items(f, 'features.item', use_float=True):
+                properties = feature.get('properties') or {}
+                features.append((properties, shape(feature.pop('geometry', {}))))
+    else:
+        with open(zones_file, 'r', encoding='utf-8') as f:
+            geojson_data = json.load(f)
+        
+        for feature in geojson_data.pop('features', []):
+            properties = feature.get('properties', {})
+            # Convertir GeoJSON geometry a shapely Polygon/MultiPolygon
+            features.append((properties, shape(feature.get('geometry', {}))))
+    
+    if parquet_file is not None:
+        try:
+            write_zones_parquet(features, parquet_file)
+            logger.info(f"📦 GeoParquet de {zones_file.name} → {parquet_file}")
+        except Exception as e:
+            logger.warning(f"⚠️  No se pudo guardar {parquet_file.name}: {e}")
+    return zones_file, features
+
+
+def _load_zones_from_file(filename: str) -> Tuple[List[Dict[str, Any]], List[Tuple[Dict[str, Any], Any]], Optional[ZoneIndex]]:
     """
     Carga zonas desde un archivo GeoJSON específico.
     
+    El índice espacial se cachea por archivo y mtime: llamadas repetidas
+    (p.ej. varios workers o recargas) no vuelven a parsear el GeoJSON
+    salvo que el archivo haya cambiado. Si ya hay un GeoParquet del
+    archivo en cache/zones se lee ese en lugar del GeoJSON.
+    
     Args:
         filename: Nombre del archivo GeoJSON (ej: 'ZONAS_F.geojson')
     
     Returns:
-        Tupla con (lista_zonas, lista_prepared_polygons)
+        Tupla con (lista_zonas, lista_prepared_polygons, índice espacial)
     """
-    zones_file = Path(__file__).parent / "data" / filename
+    zones_file = _zones_path(filename)
     
     if not zones_file.exists():
         logger.warning(f"Archivo de zonas no encontrado: {zones_file}")
-        return [], []
+        return [], [], None
     
     try:
-        with open(zones_file, 'r', encoding='utf-8') as f:
-            geojson_data = json.load(f)
+        mtime = zones_file.stat().st_mtime
+        cached = _zone_indexes.get(str(zones_file))
+        if cached and cached[0] == mtime:
+            index = cached[1]
+            return list(index.zones), list(zip(index.zones, index.prepared)), index
+        
+        source_file, features = _read_zone_features(zones_file)
         
         zones_list = []
-        prepared_list = []
         
-        for feature in geojson_data.get('features', []):
-            properties = feature.get('properties', {})
-            geometry = feature.get('geometry', {})
-            
-            # Convertir GeoJSON geometry a shapely Polygon/MultiPolygon
-            polygon = shape(geometry)
-            
-            # Preparar el polígono para búsquedas rápidas
-            prepared_polygon = prep(polygon)
-            
+        for properties, polygon in features:
             # Extraer información de la zona
             # ZONAS_4 usa 'Codigo', ZONAS_F puede usar otros campos
             zone_codigo = properties.get('Codigo')
@@ -74,25 +484,113 @@ def _load_zones_from_file(filename: str) -> Tuple[List[Dict[str, Any]], List[Tup
                 'codigo': zone_codigo,  # Campo específico de Montevideo
                 'name': zone_name,
                 'area': zone_area,  # Guardamos el área para ordenar
-                'properties': properties,
-                'geometry': geometry
+                # Solo las propiedades usadas (ver with_properties para el resto)
+                'properties': {
+                    k: properties[k] for k in ZONE_DEFAULT_PROPERTIES if k in properties
+                }
+                # Sin 'geometry': queda como shapely en el índice (ver get_zone_geometry)
             }
             
-            zones_list.append(zone_info)
-            prepared_list.append((zone_info, prepared_polygon))
+            zones_list.append((zone_info, polygon, properties))
         
         # CRÍTICO: Ordenar por área (menor a mayor) para que zonas específicas 
         # se verifiquen primero. Esto evita que zonas grandes "capturen" puntos 
-        # que pertenecen a zonas más pequeñas y específicas
-        prepared_list.sort(key=lambda x: x[0]['area'])
-        zones_list.sort(key=lambda x: x['area'])
+        # que pertenecen a zonas más pequeñas y específicas.
+        # Se ordena una sola vez aquí; las búsquedas no vuelven a ordenar.
+        order = np.argsort([zone_info['area'] or 0 for zone_info, _, _ in zones_list], kind='stable')
+        zones_list = [zones_list[i] for i in order]
+        
+        # Construir índice espacial (STRtree + polígonos preparados)
+        index = ZoneIndex(
+            [zone_info for zone_info, _, _ in zones_list],
+            [polygon for _, polygon, _ in zones_list]
+        )
+        index.full_properties = [properties for _, _, properties in zones_list]
+        if H3_AVAILABLE:
+            index.cells = _load_h3_lookup(zones_file, index)
+        _zone_indexes[str(zones_file)] = (mtime, index)
         
-        logger.info(f"✅ Cargadas {len(zones_list)} zonas desde {zones_file.name} (ordenadas por área)")
-        return zones_list, prepared_list
+        logger.info(f"✅ Cargadas {len(index)} zonas desde {source_file.name} (ordenadas por área, STRtree)")
+        return list(index.zones), list(zip(index.zones, index.prepared)), index
         
     except Exception as e:
         logger.error(f"❌ Error al cargar zonas desde {zones_file}: {e}")
-        return [], []
+        return [], [], None
+
+
+def get_zone_index(filename: str = 'ZONAS_F.geojson') -> Optional[ZoneIndex]:
+    """
+    Obtiene el índice espacial de un archivo de zonas (singleton por proceso).
+    
+    La primera llamada parsea el GeoJSON y construye geometrías, polígonos
+    preparados y STRtree; las siguientes retornan el mismo índice mientras
+    el archivo no cambie. Lo usan tanto la API como los scripts de análisis.
+    
+    Args:
+        filename: Nombre del archivo GeoJSON (ej: 'ZONAS_F.geojson')
+    
+    Returns:
+        ZoneIndex o None si el archivo no existe o no se pudo cargar
+    """
+    zones_file = _zones_path(filename)
+    cached = _zone_indexes.get(str(zones_file))
+    try:
+        if cached and cached[0] == zones_file.stat().st_mtime:
+            return cached[1]
+    except OSError:
+        pass
+    
+    _, _, index = _load_zones_from_file(filename)
+    return index
+
+
+def get_zone_geometry(zone_info: Dict[str, Any], filename: str = 'ZONAS_F.geojson') -> Optional[Dict[str, Any]]:
+    """
+    Serializa a GeoJSON la geometría de una zona, solo cuando se necesita.
+    
+    Los dicts de zona no llevan la geometría (puede tener miles de
+    coordenadas); para diagnóstico o visualización se pide por acá.
+    
+    Args:
+        zone_info: Dict de zona retornado por las funciones de búsqueda
+        filename: Archivo de zonas al que pertenece la zona
+    
+    Returns:
+        Geometría GeoJSON (dict) o None si la zona no está en el archivo
+    """
+    index = get_zone_index(filename)
+    position = index.position(zone_info) if index else None
+    if position is None:
+        return None
+    return mapping(index.geometries[position])
+
+
+def with_properties(zone_info: Optional[Dict[str, Any]], fields: Optional[str],
+                    filename: str = 'ZONAS_F.geojson') -> Optional[Dict[str, Any]]:
+    """
+    Agrega propiedades adicionales del GeoJSON a una zona (opt-in con ?fields=).
+    
+    Args:
+        zone_info: Dict de zona retornado por las funciones de búsqueda
+        fields: Nombres de propiedades separados por coma ('*' para todas)
+        filename: Archivo de zonas al que pertenece la zona
+    
+    Returns:
+        Copia de la zona con las propiedades pedidas, o la zona sin cambios
+    """
+    if not zone_info or not fields:
+        return zone_info
+    
+    index = get_zone_index(filename)
+    position = index.position(zone_info) if index else None
+    if position is None:
+        return zone_info
+    
+    full = index.full_properties[position]
+    requested = [f.strip() for f in fields.split(',') if f.strip()]
+    extra = full if '*' in requested else {k: full[k] for k in requested if k in full}
+    
+    return {**zone_info, 'properties': {**zone_info['properties'], **extra}}
 
 
 def load_zones() -> None:
@@ -104,16 +602,21 @@ def load_zones() -> None:
     2. ZONAS_4.geojson - Zonas Globales/Administrativas
     3. zonas.geojson - Zonas legacy (compatibilidad)
     
-    Prepara los polígonos para búsqueda rápida usando shapely.prepared.
+    Prepara los polígonos para búsqueda rápida usando shapely.prepared
+    y un STRtree por archivo: cada lookup descarta por bounding box en
+    O(log N) y solo verifica contains() sobre los candidatos.
+    
+    El lifespan de la API la corre en el pool de threads, en paralelo con
+    el índice de calles y el RouteCalculator.
     """
-    global _zones_flete, _prepared_polygons_flete
-    global _zones_global, _prepared_polygons_global
-    global _zones_data, _prepared_polygons
+    global _zones_flete, _prepared_polygons_flete, _index_flete
+    global _zones_global, _prepared_polygons_global, _index_global
+    global _zones_data, _prepared_polygons, _index_legacy
     
     logger.info("🗺️  Iniciando carga de zonas de Montevideo...")
     
     # 1. Cargar Zonas de Flete
-    _zones_flete, _prepared_polygons_flete = _load_zones_from_file('ZONAS_F.geojson')
+    _zones_flete, _prepared_polygons_flete, _index_flete = _load_zones_from_file('ZONAS_F.geojson')
     if _zones_flete:
         logger.info(f"   📦 Zonas de Flete: {len(_zones_flete)} zonas cargadas")
         for zone in _zones_flete[:3]:  # Mostrar solo las primeras 3
@@ -122,7 +625,7 @@ def load_zones() -> None:
             logger.info(f"      ... y {len(_zones_flete) - 3} zonas más")
     
     # 2. Cargar Zonas Globales
-    _zones_global, _prepared_polygons_global = _load_zones_from_file('ZONAS_4.geojson')
+    _zones_global, _prepared_polygons_global, _index_global = _load_zones_from_file('ZONAS_4.geojson')
     if _zones_global:
         logger.info(f"   🌍 Zonas Globales: {len(_zones_global)} zonas cargadas")
         for zone in _zones_global[:3]:  # Mostrar solo las primeras 3
@@ -131,7 +634,7 @@ def load_zones() -> None:
             logger.info(f"      ... y {len(_zones_global) - 3} zonas más")
     
     # 3. Cargar zonas legacy para compatibilidad
-    _zones_data, _prepared_polygons = _load_zones_from_file('zonas.geojson')
+    _zones_data, _prepared_polygons, _index_legacy = _load_zones_from_file('zonas.geojson')
     if _zones_data:
         logger.info(f"   📍 Zonas Legacy: {len(_zones_data)} zonas cargadas")
     
@@ -139,6 +642,18 @@ def load_zones() -> None:
     logger.info(f"✅ Total de zonas cargadas: {total_zones}")
 
 
+def reload_zones() -> None:
+    """
+    Descarta los índices en memoria y vuelve a cargar todas las zonas.
+    
+    Se usa para recargar los GeoJSON en caliente (SIGHUP) tras un deploy
+    que solo cambia app/data, sin reiniciar el proceso. Solo con un proceso
+    sin supervisor: con --workers el SIGHUP reinicia los workers.
+    """
+    logger.info("🔄 Recargando zonas desde disco...")
+    _zone_indexes.clear()
+    load_zones()
+
 
 def find_zone_by_coordinates(lat: float, lon: float) -> Optional[Dict[str, Any]]:
     """
@@ -151,28 +666,23 @@ def find_zone_by_coordinates(lat: float, lon: float) -> Optional[Dict[str, Any]]
     Returns:
         Información de la zona si se encuentra, None si no está en ninguna zona
     """
-    if not _prepared_polygons:
+    if not _index_legacy:
         logger.warning("⚠️  No hay zonas cargadas. Llama a load_zones() primero.")
         return None
     
-    # Crear punto shapely (lon, lat - orden importante en shapely)
-    point = Point(lon, lat)
+    # Buscar en qué zona cae el punto (memo por celda, STRtree + prepared polygon)
+    try:
+        zone_info = _index_legacy.find_zone_at(lat, lon)
+    except Exception as e:
+        logger.error(f"❌ Error al verificar punto en zonas legacy: {e}")
+        zone_info = None
     
-    # Buscar en qué zona cae el punto
-    for zone_info, prepared_polygon in _prepared_polygons:
-        try:
-            # Usar prepared polygon para búsqueda rápida
-            if prepared_polygon.contains(point):
-                logger.info(
-                    f"✅ Coordenadas ({lat}, {lon}) encontradas en zona: "
-                    f"{zone_info['name']} (ID: {zone_info['id']})"
-                )
-                return zone_info
-        except Exception as e:
-            logger.error(
-                f"❌ Error al verificar punto en zona {zone_info['name']}: {e}"
-            )
-            continue
+    if zone_info:
+        logger.info(
+            f"✅ Coordenadas ({lat}, {lon}) encontradas en zona: "
+            f"{zone_info['name']} (ID: {zone_info['id']})"
+        )
+        return zone_info
     
     logger.info(f"ℹ️  Coordenadas ({lat}, {lon}) no están en ninguna zona registrada")
     return None
@@ -200,39 +710,36 @@ def find_zones_by_coordinates(lat: float, lon: float) -> Dict[str, Optional[Dict
         'global': None
     }
     
-    # Crear punto shapely (lon, lat - orden importante en shapely)
-    point = Point(lon, lat)
-    
     # 1. Buscar en zonas de flete
-    # Las zonas están ordenadas por área (menor a mayor), así que
-    # la primera zona que contenga el punto será la más específica
-    for zone_info, prepared_polygon in _prepared_polygons_flete:
+    # El STRtree descarta por bounding box y los candidatos se verifican en
+    # orden de área (menor a mayor): la primera zona que contenga el punto
+    # será la más específica. Las celdas de ~11 m lejos de los bordes se
+    # resuelven desde el memo del índice (find_zone_at)
+    if _index_flete:
         try:
-            if prepared_polygon.contains(point):
+            zone_info = _index_flete.find_zone_at(lat, lon)
+            if zone_info:
                 logger.info(
                     f"✅ Coordenadas ({lat}, {lon}) en Zona Flete: "
                     f"{zone_info['name']} (Código: {zone_info['codigo']}, Área: {zone_info['area']:,.0f} m²)"
                 )
                 result['flete'] = zone_info
-                break  # Tomamos la primera (más pequeña) que contiene el punto
         except Exception as e:
-            logger.error(f"❌ Error al verificar punto en zona flete {zone_info['name']}: {e}")
-            continue
+            logger.error(f"❌ Error al verificar punto en zonas flete: {e}")
     
     # 2. Buscar en zonas globales
     # Mismo principio: la primera zona (más pequeña) que contiene el punto
-    for zone_info, prepared_polygon in _prepared_polygons_global:
+    if _index_global:
         try:
-            if prepared_polygon.contains(point):
+            zone_info = _index_global.find_zone_at(lat, lon)
+            if zone_info:
                 logger.info(
                     f"✅ Coordenadas ({lat}, {lon}) en Zona Global: "
                     f"{zone_info['name']} (Código: {zone_info['codigo']}, Área: {zone_info['area']:,.0f} m²)"
                 )
                 result['global'] = zone_info
-                break  # Tomamos la primera (más pequeña) que contiene el punto
         except Exception as e:
-            logger.error(f"❌ Error al verificar punto en zona global {zone_info['name']}: {e}")
-            continue
+            logger.error(f"❌ Error al verificar punto en zonas globales: {e}")
     
     if not result['flete'] and not result['global']:
         logger.info(f"ℹ️  Coordenadas ({lat}, {lon}) no están en ninguna zona de Montevideo")
@@ -0,0 +1,55 @@
+"""
+Genera el GeoParquet de los archivos de zonas GeoJSON de app/data.
+
+El loader de zonas (app/zones.py) lee el GeoParquet de cache/zones si
+existe (el nombre lleva el hash del GeoJSON, así que un GeoJSON nuevo
+nunca usa uno viejo): las geometrías llegan en WKB y el arranque evita
+parsear miles de coordenadas como texto. Si no existe, el propio loader
+lo genera la primera vez; este script solo lo adelanta (por ejemplo al
+desplegar). Los GeoJSON siguen siendo la fuente de verdad.
+
+Uso:
+    python geojson_to_parquet.py
+"""
+
+import json
+from pathlib import Path
+
+from shapely.geometry import shape
+
+from app.zones import write_zones_parquet, zones_parquet_path
+
+DATA_DIR = Path(__file__).parent / "app" / "data"
+ZONE_FILES = ['ZONAS_F.geojson', 'ZONAS_4.geojson', 'zonas.geojson']
+
+
+def convert(geojson_file: Path) -> Path:
+    """Convierte un GeoJSON a GeoParquet en cache/zones"""
+    with open(geojson_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    features = [
+        (f.get('properties', {}), shape(f['geometry']))
+        for f in data.get('features', [])
+    ]
+    parquet_file = write_zones_parquet(features, zones_parquet_path(geojson_file))
+    
+    size_in = geojson_file.stat().st_size / 1024
+    size_out = parquet_file.stat().st_size / 1024
+    print(f"   ✓ {geojson_file.name} ({size_in:,.0f} KB) → {parquet_file} ({size_out:,.0f} KB)")
+    return parquet_file
+
+
+if __name__ == "__main__":
+    print("="*70)
+    print("📦 CONVERSIÓN DE ZONAS GEOJSON → GEOPARQUET")
+    print("="*70)
+    
+    for filename in ZONE_FILES:
+        geojson_file = DATA_DIR / filename
+        if not geojson_file.exists():
+            print(f"   ⚠️  {filename} no encontrado, se omite")
+            continue
+        convert(geojson_file)
+    
+    print("\n✅ Conversión completada")
@@ -0,0 +1,30 @@
+"""
+Descarga el grafo vial grande de Montevideo (OSMnx) y lo guarda en cache.
+
+El servicio carga el grafo de disco al iniciar (si existe) y calcula todas
+las rutas de Montevideo sobre él, en lugar de descargar grafos por área.
+La descarga toma 20-30s: se corre una vez, fuera del arranque del servicio
+(al desplegar o por cron), y los workers levantan el grafo nuevo al reiniciar.
+
+Uso:
+    python prefetch_graph.py
+"""
+
+import sys
+
+from app.routing import RouteCalculator
+
+
+if __name__ == "__main__":
+    print("="*70)
+    print("🗺️  GRAFO VIAL DE MONTEVIDEO (OSM → CACHE LOCAL)")
+    print("="*70)
+    
+    calculator = RouteCalculator()
+    if not calculator.preload_montevideo_graph(refresh=True):
+        print("\n❌ No se pudo descargar el grafo")
+        sys.exit(1)
+    
+    graph_file = calculator._get_cache_filename(RouteCalculator.MONTEVIDEO_CACHE_KEY)
+    print(f"\n✅ {len(calculator._montevideo_graph.nodes)} nodos guardados en {graph_file}")
+    sys.exit(0)
@@ -0,0 +1,71 @@
+"""
+Descarga el snapshot de calles de Montevideo desde Overpass.
+
+El servicio de geocodificación (app/geocoding.py) carga el snapshot al
+iniciar y resuelve geometrías de calles, intersecciones y calles cercanas
+en memoria, sin consultar Overpass por cada dirección. Conviene correrlo
+una vez por noche (cron) o después de actualizar el servidor Overpass;
+los workers levantan el snapshot nuevo al reiniciar.
+
+Con departamentos como argumentos descarga un snapshot por departamento
+(calles cercanas para reverse geocoding fuera de Montevideo).
+
+Con --listados pre-arma en SQLite los listados de calles por departamento
+que sirve /api/v1/streets (sin departamentos: los 19 del país).
+
+Uso:
+    python prefetch_streets.py
+    python prefetch_streets.py Canelones Maldonado
+    python prefetch_streets.py --listados Montevideo Canelones
+"""
+
+import sys
+
+from app.geocoding import GeocodingService
+from app.street_index import STREETS_LIST_DB, STREETS_SNAPSHOT_FILE, department_snapshot_path
+
+DEPARTAMENTOS = (
+    "Artigas", "Canelones", "Cerro Largo", "Colonia", "Durazno", "Flores", "Florida",
+    "Lavalleja", "Maldonado", "Montevideo", "Paysandú", "Río Negro", "Rivera", "Rocha",
+    "Salto", "San José", "Soriano", "Tacuarembó", "Treinta y Tres",
+)
+
+
+if __name__ == "__main__":
+    print("="*70)
+    print("🗺️  SNAPSHOT DE CALLES (OVERPASS → CACHE LOCAL)")
+    print("="*70)
+    
+    service = GeocodingService()
+    departamentos = sys.argv[1:]
+    
+    if departamentos[:1] == ["--listados"]:
+        fallidos = []
+        for departamento in departamentos[1:] or DEPARTAMENTOS:
+            count = service.prefetch_street_list(departamento)
+            if count is None:
+                print(f"\n❌ No se pudo armar el listado de {departamento}")
+                fallidos.append(departamento)
+            else:
+                print(f"\n✅ {departamento}: {count} calles guardadas en {STREETS_LIST_DB}")
+        sys.exit(1 if fallidos else 0)
+    
+    if not departamentos:
+        index = service.prefetch_city()
+        if index is None:
+            print("\n❌ No se pudo descargar el snapshot")
+            sys.exit(1)
+        
+        print(f"\n✅ {len(index)} calles guardadas en {STREETS_SNAPSHOT_FILE}")
+        sys.exit(0)
+    
+    fallidos = []
+    for departamento in departamentos:
+        index = service.prefetch_department(departamento)
+        if index is None:
+            print(f"\n❌ No se pudo descargar el snapshot de {departamento}")
+            fallidos.append(departamento)
+        else:
+            print(f"\n✅ {departamento}: {len(index)} calles guardadas en {department_snapshot_path(departamento)}")
+    
+    sys.exit(1 if fallidos else 0)
@@ -66,11 +66,12 @@ if response.status_code == 200:
             zonas_f['features'],
             key=lambda f: f['properties'].get('Shape_Area', 0)
         )
+        # Construir las geometrías una sola vez (shape() recorre todo el dict)
+        geoms = [shape(f['geometry']) for f in features_sorted]
         
-        for i, feature in enumerate(features_sorted):
+        for i, (feature, geom) in enumerate(zip(features_sorted, geoms)):
             codigo = feature['properties'].get('Codigo')
             area = feature['properties'].get('Shape_Area', 0)
-            geom = shape(feature['geometry'])
             
             contains = geom.contains(point)
             
@@ -4,15 +4,27 @@ Script de Testing para el Sistema de Ruteo.
 Tests básicos para verificar funcionalidad.
 """
 
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
 import pytest
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 from app.models import (
     Order, Vehicle, Coordinates, Address,
-    VehicleType, OrderPriority, SystemConfig
+    VehicleType, OrderPriority, OrderItem, SystemConfig
 )
 from app.scoring import ScoringEngine
-from app.routing import RouteCalculator, haversine_distance
+from app.scoring_numba import quick_scores
+from app import routing
+from app.routing import RouteCalculator, haversine_distance, haversine_distances
+from app.utils import geohash_bounds, geohash_encode, geohash_neighbors, lat_lon_to_utm, utm_cache_stats, utm_to_lat_lon
 
 
 class TestModels:
@@ -59,6 +71,21 @@ class TestModels:
         )
         
         assert order.deadline > now
+    
+    def test_order_items_weight(self):
+        """Test peso de los items del pedido (fuera del esquema JSON)"""
+        order = Order(
+            id="PED-001",
+            deadline=datetime.now() + timedelta(hours=2),
+            items=[OrderItem(name="Garrafa", weight_kg=13.0), OrderItem(name="Regulador", weight_kg=0.5)]
+        )
+        
+        assert order.items_weight_kg == 13.5
+        assert "items_weight_kg" not in order.model_dump()
+        assert order.model_copy(update={"items": []}).items_weight_kg == 0
+        
+        order.items = [OrderItem(name="Garrafa", weight_kg=45.0)]
+        assert order.items_weight_kg == 45.0
 
 
 class TestRouting:
@@ -75,6 +102,111 @@ class TestRouting:
         # La distancia debe estar entre 1-2 km
         assert 1000 < distance < 2000
     
+    def test_haversine_vectorizada(self):
+        """Test haversine_distances coincide con haversine_distance punto a punto"""
+        destino = Coordinates(lat=-34.9055, lon=-56.1851)
+        puntos = [Coordinates(lat=-34.88, lon=-56.16), Coordinates(lat=-34.91, lon=-56.20), destino]
+        
+        distancias = haversine_distances(
+            np.array([p.lat for p in puntos]), np.array([p.lon for p in puntos]), destino
+        )
+        
+        assert distancias == pytest.approx([haversine_distance(p, destino) for p in puntos])
+    
+    def test_quick_scores_coincide_con_numpy(self):
+        """Test el kernel del modo fast da las mismas distancias y scores que NumPy"""
+        destino = Coordinates(lat=-34.9055, lon=-56.1851)
+        lat = np.array([-34.88, -34.91, -34.60, -34.9055])
+        lon = np.array([-56.16, -56.20, -58.38, -56.1851])
+        max_capacity = np.array([6, 4, 8, 2])
+        current_load = np.array([2, 0, 7, 1])
+        performance = np.array([0.9, 0.5, 0.7, 1.0])
+        candidates = np.array([3, 0, 2])
+        
+        scores, distance_km = quick_scores(
+            lat, lon, max_capacity, current_load, performance, candidates, destino.lat, destino.lon
+        )
+        
+        esperado_km = haversine_distances(lat[candidates], lon[candidates], destino) / 1000
+        esperado = (
+            0.4 / (1 + np.minimum(esperado_km / 20, 1)) +
+            0.3 * (max_capacity - current_load)[candidates] / max_capacity[candidates] +
+            0.3 * performance[candidates]
+        )
+        assert distance_km == pytest.approx(esperado_km)
+        assert scores == pytest.approx(esperado)
+    
+    def test_rutas_en_lote_coinciden(self, monkeypatch):
+        """Test batch_route_metrics da lo mismo que calculate_route par por par"""
+        graph = nx.MultiDiGraph()
+        for node, (lat, lon) in enumerate([(-34.90, -56.18), (-34.90, -56.17), (-34.91, -56.17), (-34.91, -56.18)]):
+            graph.add_node(node, y=lat, x=lon)
+        for u, v, length, travel_time in [(0, 1, 900, 60), (1, 2, 1100, 50), (0, 3, 1100, 200),
+                                          (3, 2, 900, 200), (2, 0, 1500, 90)]:
+            graph.add_edge(u, v, length=length, travel_time=travel_time)
+        # Nodo exacto de cada punto (nearest_nodes necesita scikit-learn)
+        def nearest_nodes(g, X, Y):
+            nodes = [next(n for n, d in g.nodes(data=True) if (d["y"], d["x"]) == (y, x))
+                     for x, y in zip(np.atleast_1d(X), np.atleast_1d(Y))]
+            return nodes if np.ndim(X) else nodes[0]
+        monkeypatch.setattr(routing.ox, "nearest_nodes", nearest_nodes)
+        calculator = RouteCalculator()
+        puntos = [Coordinates(lat=d["y"], lon=d["x"]) for _, d in graph.nodes(data=True)]
+        
+        distancias, tiempos = calculator.batch_route_metrics(graph, puntos[:2], puntos)
+        
+        for i, origen in enumerate(puntos[:2]):
+            for j, destino in enumerate(puntos):
+                _, distancia, tiempo = calculator.calculate_route(graph, origen, destino)
+                assert (distancias[i, j], tiempos[i, j]) == (distancia, tiempo)
+        assert distancias[0, 2] == 2000  # Por el camino más rápido, no el más corto
+    
+    def test_cache_de_grafo_con_escrituras_concurrentes(self, tmp_path, monkeypatch):
+        """Test guardar el mismo grafo desde varios threads deja un pickle válido"""
+        graph = nx.MultiDiGraph()
+        graph.add_edges_from((i, i + 1, {"length": 10.0}) for i in range(2000))
+        calculator = RouteCalculator(cache_dir=str(tmp_path))
+        
+        # Los 8 threads llegan a os.replace con su temporal ya escrito
+        temporales = []
+        barrera = threading.Barrier(8, timeout=10)
+        replace = routing.os.replace
+        
+        def replace_sincronizado(src, dst):
+            temporales.append(src)
+            barrera.wait()
+            replace(src, dst)
+        
+        monkeypatch.setattr(routing.os, "replace", replace_sincronizado)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: calculator._save_graph_to_cache(graph, "zona"), range(8)))
+        
+        assert len(set(temporales)) == 8
+        cargado = calculator._load_graph_from_cache("zona")
+        assert cargado is not None and len(cargado.edges) == 2000
+        assert [p.name for p in tmp_path.iterdir()] == [Path(calculator._get_cache_filename("zona")).name]
+    
+    def test_grafo_por_area_se_descarga_una_vez(self, tmp_path, monkeypatch):
+        """Test varios threads pidiendo el mismo grafo a la vez lo descargan una sola vez"""
+        descargas = []
+        
+        def graph_from_point(center, dist, network_type, simplify):
+            descargas.append(center)
+            time.sleep(0.2)
+            graph = nx.MultiDiGraph()
+            graph.add_edge(0, 1, length=100.0, highway="residential")
+            return graph
+        
+        monkeypatch.setattr(routing.ox, "graph_from_point", graph_from_point)
+        calculator = RouteCalculator(cache_dir=str(tmp_path))
+        centro = Coordinates(lat=-34.9055, lon=-56.1851)
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            grafos = list(pool.map(lambda _: calculator.get_graph_for_area(centro, 20000), range(8)))
+        
+        assert len(descargas) == 1
+        assert all(grafo is grafos[0] for grafo in grafos)
+    
     def test_route_calculator_init(self):
         """Test inicialización del calculador de rutas"""
         calculator = RouteCalculator()
@@ -83,6 +215,37 @@ class TestRouting:
         assert calculator.default_speeds["motorway"] == 80
 
 
+class TestUtils:
+    """Tests para la conversión de coordenadas"""
+    
+    def test_utm_ida_y_vuelta(self):
+        """Test lat/lon → UTM → lat/lon (memoizado) vuelve al mismo punto"""
+        utm_x, utm_y, zone = lat_lon_to_utm(-34.9033, -56.1882)
+        
+        assert zone == "21S"
+        hits = utm_cache_stats()["hits"]
+        assert lat_lon_to_utm(-34.9033, -56.1882) == (utm_x, utm_y, zone)
+        assert lat_lon_to_utm(-34.903300004, -56.188200004) == (utm_x, utm_y, zone)  # Misma celda de ~1 m
+        assert utm_cache_stats()["hits"] == hits + 2
+        
+        lat, lon = utm_to_lat_lon(utm_x, utm_y, 21, 'south')
+        assert lat == pytest.approx(-34.9033, abs=1e-6)
+        assert lon == pytest.approx(-56.1882, abs=1e-6)
+    
+    def test_geohash_y_vecinas(self):
+        """Test geohash conocido y vecinas que rodean la celda"""
+        assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+        
+        cell = geohash_encode(-34.9033, -56.1882)
+        lat_min, lat_max, lon_min, lon_max = geohash_bounds(cell)
+        assert lat_min <= -34.9033 < lat_max and lon_min <= -56.1882 < lon_max
+        
+        vecinas = geohash_neighbors(cell)
+        assert len(set(vecinas)) == 8 and cell not in vecinas
+        # Un punto justo al norte de la celda cae en la primera vecina
+        assert geohash_encode(lat_max + 1e-7, -56.1882) == vecinas[0]
+
+
 class TestScoring:
     """Tests para el sistema de scoring"""
     
@@ -99,6 +262,22 @@ class TestScoring:
             priority=OrderPriority.HIGH
         )
     
+    def test_config_por_request(self):
+        """Test la config de un request no pisa la del engine compartido"""
+        config_request = SystemConfig(weight_distance=0.5)
+        
+        def en_request():
+            token = self.scoring_engine.set_request_config(config_request)
+            vista = self.scoring_engine.config
+            self.scoring_engine.reset_request_config(token)
+            return vista
+        
+        assert contextvars.copy_context().run(en_request) is config_request
+        assert self.scoring_engine.config is self.config
+        
+        self.scoring_engine.set_request_config(None)  # Request sin config
+        assert self.scoring_engine.config is self.config
+    
     def test_distance_score(self):
         """Test score de distancia"""
         vehicle = Vehicle(
@@ -170,6 +349,111 @@ class TestScoring:
         assert len(ranked) == 2
         # El primer vehículo debe tener el mejor score
         assert ranked[0][1].total_score >= ranked[1][1].total_score
+    
+    def test_fast_prefiltro_vectorizado(self, monkeypatch):
+        """Test el modo fast descarta vehículos llenos y acepta los que no tienen peso máximo"""
+        monkeypatch.setattr(self.scoring_engine, "calculate_total_score",
+                            lambda vehicle, order, graph=None: SimpleNamespace(total_score=0.8))
+        vehicles = [
+            Vehicle(id="MOV-LLENO", vehicle_type=VehicleType.MOTO, max_capacity=2, current_load=2,
+                    current_location=Coordinates(lat=-34.604, lon=-58.381)),
+            Vehicle(id="MOV-LEJOS", vehicle_type=VehicleType.MOTO, max_capacity=2,
+                    current_location=Coordinates(lat=-34.700, lon=-58.381)),
+            Vehicle(id="MOV-CERCA", vehicle_type=VehicleType.MOTO, max_capacity=2,
+                    current_location=Coordinates(lat=-34.604, lon=-58.381)),
+        ]
+        arrays = self.scoring_engine.vehicle_arrays(vehicles)
+        
+        ranked = self.scoring_engine.rank_vehicles_fast(
+            vehicles, self.order, self.config, max_candidates=1, arrays=arrays
+        )
+        
+        assert [(v.id, score) for v, score in ranked] == [("MOV-CERCA", 0.8)]
+        
+        vehicles[2].current_load = 2
+        self.scoring_engine.update_vehicle_arrays(arrays, 2, vehicles[2])
+        ranked = self.scoring_engine.rank_vehicles_fast(
+            vehicles, self.order, self.config, max_candidates=1, arrays=arrays
+        )
+        assert [v.id for v, _ in ranked] == ["MOV-LEJOS"]
+    
+    def test_fast_score_cache(self, monkeypatch):
+        """Test el modo fast reutiliza los scores de score_cache mientras la carga no cambie"""
+        calls = []
+        def fake_total_score(vehicle, order, graph=None):
+            calls.append(vehicle.id)
+            return SimpleNamespace(total_score=0.8)
+        
+        monkeypatch.setattr(self.scoring_engine, "calculate_total_score", fake_total_score)
+        vehicles = [
+            Vehicle(id=f"MOV-00{i}", vehicle_type=VehicleType.MOTO, max_capacity=3,
+                    current_location=Coordinates(lat=-34.604, lon=-58.381))
+            for i in range(2)
+        ]
+        arrays = self.scoring_engine.vehicle_arrays(vehicles)
+        score_cache = {}
+        
+        first = self.scoring_engine.rank_vehicles_fast(
+            vehicles, self.order, self.config, arrays=arrays, score_cache=score_cache
+        )
+        second = self.scoring_engine.rank_vehicles_fast(
+            vehicles, self.order, self.config, arrays=arrays, score_cache=score_cache
+        )
+        assert first == second
+        assert sorted(calls) == ["MOV-000", "MOV-001"]
+        
+        vehicles[0].current_load = 1
+        self.scoring_engine.update_vehicle_arrays(arrays, 0, vehicles[0])
+        self.scoring_engine.rank_vehicles_fast(
+            vehicles, self.order, self.config, arrays=arrays, score_cache=score_cache
+        )
+        assert sorted(calls) == ["MOV-000", "MOV-000", "MOV-001"]
+    
+    def test_top_k_coincide_con_ranking(self, monkeypatch):
+        """Test find_top_k_vehicles da los primeros k de rank_vehicles (con empates)"""
+        scores = {"MOV-000": 0.4, "MOV-001": 0.9, "MOV-002": 0.4, "MOV-003": 0.7, "MOV-004": 0.4}
+        monkeypatch.setattr(self.scoring_engine, "calculate_total_score",
+                            lambda vehicle, order, graph=None: SimpleNamespace(total_score=scores[vehicle.id]))
+        vehicles = [
+            Vehicle(id=vehicle_id, vehicle_type=VehicleType.MOTO,
+                    current_location=Coordinates(lat=-34.605, lon=-58.380))
+            for vehicle_id in scores
+        ]
+        
+        top = self.scoring_engine.find_top_k_vehicles(vehicles, self.order, k=4)
+        ranked = self.scoring_engine.rank_vehicles(vehicles, self.order)
+        
+        assert [v.id for v, _ in top] == [v.id for v, _ in ranked[:4]] == ["MOV-001", "MOV-003", "MOV-000", "MOV-002"]
+        assert self.scoring_engine.find_best_vehicle(vehicles, self.order, ranked_vehicles=top)[0].id == "MOV-001"
+    
+    def test_rerank_coincide_con_rank(self, monkeypatch):
+        """Test rerank_vehicles da el mismo ranking que rank_vehicles tras cargar un vehículo"""
+        def fake_total_score(vehicle, order, graph=None):
+            return SimpleNamespace(total_score=vehicle.max_capacity - vehicle.current_load)
+        
+        monkeypatch.setattr(self.scoring_engine, "calculate_total_score", fake_total_score)
+        vehicles = [
+            Vehicle(
+                id=f"MOV-00{i}",
+                vehicle_type=VehicleType.MOTO,
+                current_location=Coordinates(lat=-34.605, lon=-58.380),
+                max_capacity=capacity,
+                current_load=0
+            )
+            for i, capacity in enumerate([3, 2, 1])
+        ]
+        
+        ranked = self.scoring_engine.rank_vehicles(vehicles, self.order)
+        vehicles[0].current_load = 1  # Empata con MOV-001 (sort estable)
+        vehicles[2].current_load = 1  # Queda sin capacidad
+        
+        reranked = self.scoring_engine.rerank_vehicles(
+            vehicles, self.order, ranked, {"MOV-000", "MOV-002"}
+        )
+        esperado = self.scoring_engine.rank_vehicles(vehicles, self.order)
+        
+        assert [(v.id, s.total_score) for v, s in reranked] == \
+            [(v.id, s.total_score) for v, s in esperado] == [("MOV-000", 2), ("MOV-001", 2)]
 
 
 # ============================================================================
@@ -0,0 +1,827 @@
+"""
+Tests para el cache del servicio de geocodificación.
+
+No hacen requests: solo ejercitan las claves y el backend en memoria.
+"""
+
+import asyncio
+import io
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+from pyproj import Geod
+import shapely
+from shapely.geometry import LineString, MultiLineString
+
+from app.cache import MemoryCacheBackend, TieredCacheBackend, create_cache_backend
+from app import geocoding
+from app.geocoding import GeocodingService
+from app.geometry_numba import argmin_sqdist, street_min_sqdist
+from app.models import Address, Coordinates
+from app.street_index import MONTEVIDEO_BBOX, StreetIndex, StreetListStore
+from app.utils import geohash_bounds, geohash_encode
+
+
+class FakeOverpassResponse:
+    """Respuesta Overpass falsa (cuerpo en .content y como stream en .raw)"""
+
+    status_code = 200
+
+    def __init__(self, payload):
+        """payload: dict (salida JSON) o str (salida CSV)"""
+        self.content = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        self.raw = io.BytesIO(self.content)
+        self.encoding = None
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self.content.splitlines():
+            yield line.decode(self.encoding) if decode_unicode else line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _metros(punto: Coordinates, lat: float, lon: float) -> float:
+    """Distancia geodésica (WGS84) en metros, para comparar con las de UTM"""
+    return Geod(ellps="WGS84").inv(punto.lon, punto.lat, lon, lat)[2]
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    """Servicio con cache en memoria (sin Redis ni disco ni snapshot de calles)"""
+    monkeypatch.setenv("GEOCODING_CACHE_BACKEND", "memory")
+    service = GeocodingService()
+    service._street_index = None
+    service._department_indexes = []
+    service._street_lists = StreetListStore(tmp_path / "listados.sqlite3")
+    return service
+
+
+class TestGeocodingCache:
+    """Tests para el cache de direcciones"""
+
+    def test_backend_en_memoria(self, service):
+        """Test GEOCODING_CACHE_BACKEND=memory usa el dict del proceso"""
+        assert isinstance(service._cache, MemoryCacheBackend)
+        assert service.get_cache_stats()["cache_backend"] == "memory"
+
+    def test_cache_roundtrip(self, service):
+        """Test las coordenadas guardadas se recuperan completas"""
+        coords = Coordinates(lat=-34.9, lon=-56.16, utm_x=580000.0, utm_y=6136000.0, utm_zone="21H")
+
+        service._save_to_cache("18 de Julio 1234, Montevideo", coords)
+
+        assert service._check_cache("18 de Julio 1234, Montevideo") == coords
+        assert service.get_cache_stats()["cache_size"] == 1
+
+    def test_clave_ignora_tildes_y_espacios(self, service):
+        """Test "José  Ellauri" y "jose ellauri" comparten entrada"""
+        assert service._get_cache_key("José  Ellauri 350") == service._get_cache_key("jose ellauri 350")
+        assert service._get_cache_key("José Ellauri 350").startswith("geocoder:v1:")
+
+    def test_memoria_lru_acotada(self):
+        """Test el cache en memoria descarta la entrada menos usada y las vencidas"""
+        cache = MemoryCacheBackend(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "a" pasa a ser la más reciente
+        cache.set("c", 3)
+
+        assert cache.size() == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+
+        cache.set("d", 4, ttl=-1)
+        assert cache.get("d") is None
+
+    def test_nivel_local_delante_del_compartido(self):
+        """Test el nivel en memoria solo consulta al compartido lo que le falta"""
+        shared = MemoryCacheBackend()
+        pedidas = []
+        shared_get_many = shared.get_many
+        shared.get_many = lambda keys: pedidas.append(list(keys)) or shared_get_many(keys)
+        shared.set("a", 1)
+        shared.set("b", 2)
+        cache = TieredCacheBackend(MemoryCacheBackend(ttl=60), shared)
+
+        assert cache.get("a") == 1  # Trae "a" del compartido
+        assert cache.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+        assert pedidas == [["b", "c"]]
+
+        cache.set("d", 4, ttl=3600)
+        assert shared.get("d") == 4 and cache.local.get("d") == 4
+        assert cache.name == "memory+memory"
+        assert cache.size() == 3
+
+    def test_sin_nivel_local_el_cache_en_memoria_sigue_activo(self, monkeypatch):
+        """Test GEOCODING_CACHE_MAXSIZE=0 sin Redis ni disco no desactiva el cache"""
+        monkeypatch.setenv("GEOCODING_CACHE_BACKEND", "memory")
+        monkeypatch.setenv("GEOCODING_CACHE_MAXSIZE", "0")
+        cache = create_cache_backend()
+
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+    def test_direccion_fallida_no_se_reintenta(self, service, monkeypatch):
+        """Test sin resultados no se vuelve a consultar; tras un error del proveedor sí"""
+        consultas = []
+
+        def fake_search(address):
+            consultas.append(address)
+            if "Caida" in address:
+                raise RuntimeError("Nominatim caído")
+            return None
+
+        monkeypatch.setattr(service, "_nominatim_search", fake_search)
+        monkeypatch.setitem(service._rate_limiters, "nominatim", geocoding._invoke)  # Sin esperas
+        inexistente = Address(street="Calle Inexistente", number="99999", city="Montevideo")
+        caida = Address(street="Calle Caida", number="1", city="Montevideo")
+
+        assert service.geocode(inexistente) is None
+        assert service.geocode(inexistente) is None
+        assert service.geocode(Address(street="Calle Inexistente", number="1", city="Montevideo")) is None
+        assert len(consultas) == 2  # Otro número es otra dirección
+
+        assert service.geocode(caida) is None
+        assert service.geocode(caida) is None
+        assert len(consultas) == 4
+        assert service.get_cache_stats()["failed_hits"] == 1
+
+    def test_esquinas_con_overpass_caido_se_reintentan(self, service, monkeypatch):
+        """Test un error de Overpass o del fallback no marca la esquina como fallida"""
+        consultas = []
+
+        def overpass_caido(url, data, timeout, stream=False):
+            consultas.append(data)
+            respuesta = FakeOverpassResponse({})
+            respuesta.status_code = 503
+            return respuesta
+
+        def fallback_caido(*args, **kwargs):
+            raise RuntimeError("Nominatim caído")
+
+        monkeypatch.setattr(service._overpass_session, "post", overpass_caido)
+        monkeypatch.setattr(service, "_call_provider", fallback_caido)
+        esquinas = Address(street="", corner_1="Ejido", corner_2="Colonia", city="Montevideo")
+
+        assert service.geocode(esquinas) is None
+        assert service.geocode(esquinas) is None
+        assert len(consultas) == 2
+        assert service.get_cache_stats()["failed_hits"] == 0
+
+    def test_fallas_recientes_vencen(self, monkeypatch):
+        """Test una falla se recuerda entre ttl y 2*ttl segundos"""
+        ahora = [1000.0]
+        monkeypatch.setattr(geocoding.time, "monotonic", lambda: ahora[0])
+        fallas = geocoding.RecentFailures(ttl=60)
+        digest = fallas.digest(Address(street="Calle Inexistente", city="Montevideo"))
+
+        fallas.add(digest)
+        ahora[0] += 90
+        assert digest in fallas
+        ahora[0] += 60
+        assert digest not in fallas
+
+
+class TestNominatimDirecto:
+    """Tests para /search directo contra el Nominatim propio"""
+
+    def test_geocode_usa_search_directo(self, service, monkeypatch):
+        """Test Nominatim se consulta por la sesión persistente, sin geopy"""
+        pedidos = []
+
+        class FakeResponse:
+            status_code = 200
+            content = b'[{"lat": "-34.9055", "lon": "-56.1851", "display_name": "Ejido 1234"}]'
+
+        def fake_get(url, params, timeout):
+            pedidos.append((url, params))
+            return FakeResponse()
+
+        monkeypatch.setattr(service._nominatim_session, "get", fake_get)
+
+        coords = service._geocode_with_provider("Ejido 1234, Montevideo", "nominatim")
+
+        assert pedidos == [(
+            "http://nominatim.riogas.uy/search",
+            {"q": "Ejido 1234, Montevideo", "format": "json", "limit": 1}
+        )]
+        assert (coords.lat, coords.lon) == (-34.9055, -56.1851)
+        assert coords.utm_zone is not None
+
+
+class TestCoordinateCache:
+    """Tests para el cache por celda de coordenadas"""
+
+    def test_calles_cercanas_por_celda(self, service, monkeypatch):
+        """Test dos puntos de la misma celda de ~100 m consultan Overpass una vez"""
+        llamadas = []
+
+        def fake_fetch(lat, lon, radius, timeout):
+            llamadas.append((lat, lon, radius))
+            return [{"name": "Ejido", "geometry": LineString([(-56.18, -34.90), (-56.18, -34.91)])}]
+
+        monkeypatch.setattr(service, "_fetch_nearby_streets", fake_fetch)
+
+        primero = service._get_nearby_streets_from_overpass(-34.90512, -56.18049, radius=0.001)
+        segundo = service._get_nearby_streets_from_overpass(-34.90489, -56.17962, radius=0.001)
+
+        assert len(llamadas) == 1
+        lat, lon, radius = llamadas[0]
+        assert (lat, lon) == (-34.905, -56.18)
+        assert radius == pytest.approx(0.0015)  # Radio + media celda
+        assert segundo[0]["name"] == "Ejido"
+        assert segundo[0]["geometry"].equals(primero[0]["geometry"])
+
+
+    def test_memo_local_y_fallas(self, service, monkeypatch):
+        """Test la celda repetida no vuelve al cache compartido y una falla no se reintenta enseguida"""
+        llamadas = []
+        respuestas = {(-34.905, -56.18): [{"name": "Ejido", "geometry": LineString([(-56.18, -34.90), (-56.18, -34.91)])}],
+                      (-34.8, -56.1): None}
+
+        def fake_fetch(lat, lon, radius, timeout):
+            llamadas.append((lat, lon))
+            return respuestas[(lat, lon)]
+
+        monkeypatch.setattr(service, "_fetch_nearby_streets", fake_fetch)
+        lecturas = []
+        get = service._cache.get
+        monkeypatch.setattr(service._cache, "get", lambda key: lecturas.append(key) or get(key))
+
+        service._get_nearby_streets_from_overpass(-34.90512, -56.18049)
+        assert service._get_nearby_streets_from_overpass(-34.90489, -56.17962)[0]["name"] == "Ejido"
+        assert service._get_nearby_streets_from_overpass(-34.8001, -56.1001) == []
+        assert service._get_nearby_streets_from_overpass(-34.8002, -56.1002) == []
+
+        assert llamadas == [(-34.905, -56.18), (-34.8, -56.1)]
+        assert len(lecturas) == 2  # Una por celda nueva; las repetidas salen del memo
+
+
+    def test_reverse_geocode_cacheado(self, service, monkeypatch):
+        """Test el mismo punto (a ~1 m) no repite el reverse geocoding y se cuenta el acierto"""
+        calculos = []
+
+        def fake_reverse(coordinates):
+            calculos.append(coordinates)
+            return Address(street="Ejido", number="1234", city="Montevideo", corner_1="Colonia",
+                           coordinates=coordinates)
+
+        monkeypatch.setattr(service, "_compute_reverse_geocode", fake_reverse)
+
+        primero = service.reverse_geocode(Coordinates(lat=-34.9055001, lon=-56.1851002))
+        consulta = Coordinates(lat=-34.9054998, lon=-56.1850998)
+        segundo = service.reverse_geocode(consulta)
+
+        assert len(calculos) == 1
+        assert segundo.model_dump(exclude={"coordinates"}) == primero.model_dump(exclude={"coordinates"})
+        assert segundo.coordinates == consulta
+        stats = service.get_cache_stats()
+        assert (stats["cache_hits"], stats["cache_misses"]) == (1, 1)
+
+    def test_reverse_geocode_memo_antes_que_cache_y_proveedor(self, service, monkeypatch):
+        """Test un acierto en el memo del proceso no consulta el cache compartido ni al proveedor"""
+        monkeypatch.setattr(service, "_compute_reverse_geocode",
+                            lambda coordinates: Address(street="Ejido", city="Montevideo", coordinates=coordinates))
+        punto = Coordinates(lat=-34.9055, lon=-56.1851)
+        primero = service.reverse_geocode(punto)
+
+        lecturas = []
+        monkeypatch.setattr(service._cache, "get_many", lambda keys: lecturas.append(keys) or {})
+        monkeypatch.setattr(service, "_compute_reverse_geocode", lambda coordinates: pytest.fail("llamó al proveedor"))
+
+        segundo = service.reverse_geocode(punto)
+
+        assert lecturas == []
+        assert segundo == primero and segundo is not primero
+
+    def test_reverse_geocode_por_celda_geohash(self, service, monkeypatch):
+        """Test puntos de la misma celda comparten el resultado; la vecina solo con REVERSE_CACHE_NEIGHBORS"""
+        calculos = []
+
+        def fake_reverse(coordinates):
+            calculos.append(coordinates)
+            return Address(street="Ejido", number="1234", city="Montevideo", coordinates=coordinates)
+
+        monkeypatch.setattr(service, "_compute_reverse_geocode", fake_reverse)
+        lat_min, lat_max, lon_min, lon_max = geohash_bounds(geohash_encode(-34.9055, -56.1851))
+
+        service.reverse_geocode(Coordinates(lat=lat_min + 1e-6, lon=lon_min + 1e-6))
+        otra_esquina = Coordinates(lat=lat_max - 1e-6, lon=lon_max - 1e-6)  # ~35 m, misma celda
+        direccion = service.reverse_geocode(otra_esquina)
+        assert len(calculos) == 1
+        assert direccion.street == "Ejido" and direccion.coordinates == otra_esquina  # Las consultadas
+
+        vecina = Coordinates(lat=lat_max + 1e-6, lon=lon_min + 1e-6)  # Celda de al lado
+        monkeypatch.setattr(geocoding, "REVERSE_CACHE_NEIGHBORS", True)
+        assert service.reverse_geocode(vecina).coordinates == vecina
+        assert len(calculos) == 1
+        monkeypatch.setattr(geocoding, "REVERSE_CACHE_NEIGHBORS", False)
+        service.reverse_geocode(vecina)
+        assert calculos[1:] == [vecina]
+
+
+    def test_reverse_geocode_sin_nominatim_si_hay_puerta_osm(self, service, monkeypatch):
+        """Test la puerta OSM más cercana (en metros) resuelve la dirección sin llamar a Nominatim"""
+        puertas = {"elements": [
+            {"type": "node", "lat": -34.9052, "lon": -56.1799,
+             "tags": {"addr:street": "18 de Julio", "addr:housenumber": "1500"}},
+            {"type": "way", "center": {"lat": -34.90505, "lon": -56.17995},
+             "tags": {"addr:street": "18 de Julio", "addr:housenumber": "1502", "addr:city": "Montevideo"}},
+        ]}
+        calles = [
+            {"name": "18 de Julio", "geometry": LineString([(-56.20, -34.905), (-56.16, -34.905)])},
+            {"name": "Ejido", "geometry": LineString([(-56.180, -34.90), (-56.180, -34.91)])},
+            {"name": "Santiago de Chile", "geometry": LineString([(-56.178, -34.90), (-56.178, -34.91)])},
+        ]
+        llamadas = []
+        monkeypatch.setattr(service._overpass_session, "post",
+                            lambda url, data, timeout, stream=False: FakeOverpassResponse(puertas))
+        monkeypatch.setattr(service, "_get_nearby_streets_from_overpass", lambda *args, **kwargs: calles)
+        monkeypatch.setattr(service, "_call_provider", lambda *args, **kwargs: llamadas.append(args))
+
+        address = service._compute_reverse_geocode(Coordinates(lat=-34.905, lon=-56.1799))
+
+        assert llamadas == []
+        assert (address.street, address.number, address.city) == ("18 de Julio", "1502", "Montevideo")
+        assert (address.corner_1, address.corner_2) == ("Ejido", "Santiago de Chile")
+        assert address.full_address == "18 de Julio 1502, Montevideo"
+
+    def test_reverse_geocode_puerta_osm_sin_localidad(self, service, monkeypatch):
+        """Test una puerta con solo calle y número: Nominatim completa ciudad y país, la puerta manda en calle y número"""
+        class Location:
+            address = "1490, Avenida 18 de Julio, Centro, Montevideo, Uruguay"
+            raw = {"address": {"road": "Avenida 18 de Julio", "house_number": "1490",
+                               "city": "Montevideo", "state": "Montevideo", "country": "Uruguay"}}
+
+        puertas = {"elements": [
+            {"type": "node", "lat": -34.9052, "lon": -56.1799,
+             "tags": {"addr:street": "18 de Julio", "addr:housenumber": "1500"}},
+        ]}
+        respuestas = [Location()]
+        monkeypatch.setattr(service._overpass_session, "post",
+                            lambda url, data, timeout, stream=False: FakeOverpassResponse(puertas))
+        monkeypatch.setattr(service, "_get_nearby_streets_from_overpass", lambda *args, **kwargs: [])
+        monkeypatch.setattr(service, "_call_provider", lambda *args, **kwargs: respuestas.pop() if respuestas else None)
+
+        address = service._compute_reverse_geocode(Coordinates(lat=-34.905, lon=-56.1799))
+
+        assert (address.street, address.number) == ("18 de Julio", "1500")
+        assert (address.city, address.state, address.country) == ("Montevideo", "Montevideo", "Uruguay")
+        assert address.full_address == "18 de Julio 1500, Montevideo, Uruguay"
+
+        # Sin respuesta de Nominatim queda la puerta, con el país por defecto (nunca '')
+        address = service._compute_reverse_geocode(Coordinates(lat=-34.905, lon=-56.1799))
+
+        assert (address.street, address.number, address.city) == ("18 de Julio", "1500", "")
+        assert address.country == "Uruguay"
+
+    def test_reverse_geocode_esquinas_de_calles_cercanas(self, service, monkeypatch):
+        """Test sin cruces, las esquinas salen de las calles cercanas ya traídas (Nominatim una sola vez)"""
+        class Location:
+            address = "Rambla 1000, Montevideo"
+            raw = {"address": {"road": "Rambla", "house_number": "1000", "city": "Montevideo"}}
+
+        calles = [
+            {"name": "Rambla", "geometry": LineString([(-56.20, -34.905), (-56.16, -34.905)])},
+            {"name": "Maldonado", "geometry": LineString([(-56.20, -34.9035), (-56.16, -34.9035)])},
+            {"name": "Canelones", "geometry": LineString([(-56.20, -34.9040), (-56.16, -34.9040)])},
+            {"name": "Rambla", "geometry": LineString([(-56.20, -34.9045), (-56.16, -34.9045)])},
+        ]
+        llamadas = []
+
+        def fake_provider(*args, **kwargs):
+            llamadas.append(kwargs)
+            return Location()
+
+        monkeypatch.setattr(service._overpass_session, "post",
+                            lambda url, data, timeout, stream=False: FakeOverpassResponse({"elements": []}))
+        monkeypatch.setattr(service, "_get_nearby_streets_from_overpass", lambda *args, **kwargs: calles)
+        monkeypatch.setattr(service, "_call_provider", fake_provider)
+
+        address = service._compute_reverse_geocode(Coordinates(lat=-34.9049, lon=-56.18))
+
+        assert llamadas == [{"exactly_one": True}]
+        assert (address.corner_1, address.corner_2) == ("Canelones", "Maldonado")
+
+
+class TestIntersection:
+    """Tests para el cálculo de intersecciones con Overpass"""
+
+    def test_geometrias_en_una_consulta(self, service, monkeypatch):
+        """Test las dos calles salen de una sola consulta Overpass y se cruzan"""
+        consultas = []
+
+        def fake_post(url, data, timeout, stream=False):
+            consultas.append(data["data"])
+            return FakeOverpassResponse({"elements": [
+                {"type": "way", "tags": {"name": "Ejido"},
+                 "geometry": [{"lon": -56.18, "lat": -34.90}, {"lon": -56.18, "lat": -34.91}]},
+                {"type": "way", "tags": {"name": "Av. Colonia"},
+                 "geometry": [{"lon": -56.19, "lat": -34.905}, {"lon": -56.17, "lat": -34.905}]},
+            ]})
+
+        monkeypatch.setattr(service._overpass_session, "post", fake_post)
+
+        coords = service._calculate_intersection("Ejido", "Av. Colonia", "Montevideo", "Uruguay")
+
+        assert len(consultas) == 1
+        assert '"name"~"^(Ejido|Av\\\\. Colonia)$"' in consultas[0]
+        assert (coords.lat, coords.lon) == pytest.approx((-34.905, -56.18))
+
+    def test_overpass_remark_de_error(self, service, monkeypatch):
+        """Test un "remark" de error de Overpass descarta los resultados parciales"""
+        monkeypatch.setattr(
+            service._overpass_session, "post",
+            lambda url, data, timeout, stream=False: FakeOverpassResponse({
+                "elements": [{"type": "way", "tags": {"name": "Ejido"},
+                              "geometry": [{"lon": -56.18, "lat": -34.90}, {"lon": -56.18, "lat": -34.91}]}],
+                "remark": "runtime error: Query timed out in \"query\" at line 3"
+            })
+        )
+
+        assert service._get_street_geometries_batch(["Ejido"]) == {}
+
+    def test_fallback_si_una_calle_falla(self, service, monkeypatch):
+        """Test si Overpass no encuentra una calle se usa el fallback"""
+        aproximada = Coordinates(lat=-34.905, lon=-56.18)
+        monkeypatch.setattr(service, "_get_street_geometries_batch", lambda names, timeout: {})
+        monkeypatch.setattr(service, "_calculate_intersection_fallback", lambda *args: aproximada)
+
+        assert service._calculate_intersection("Ejido", "Colonia", "Montevideo", "Uruguay") == aproximada
+
+    def test_cache_por_par_de_calles(self, service, monkeypatch):
+        """Test la misma esquina en otro orden y con otras tildes sale del cache"""
+        calculos = []
+
+        def fake_compute(street1, street2, city, country):
+            calculos.append((street1, street2))
+            return Coordinates(lat=-34.905, lon=-56.18)
+
+        monkeypatch.setattr(service, "_compute_intersection", fake_compute)
+
+        primero = service._calculate_intersection("Ejido", "Av. Colonia", "Montevideo", "Uruguay")
+        segundo = service._calculate_intersection("av. colonia", "EJIDO", "Montevideo", "Uruguay")
+
+        assert len(calculos) == 1
+        assert segundo == primero
+
+    def test_esquinas_transversales_mas_cercanas(self, service):
+        """Test con calle principal retorna las dos transversales más cercanas"""
+        calles = [
+            {"name": "18 de Julio", "geometry": LineString([(-56.20, -34.905), (-56.16, -34.905)])},
+            {"name": "Ejido", "geometry": LineString([(-56.180, -34.90), (-56.180, -34.91)])},
+            {"name": "Yaguarón", "geometry": LineString([(-56.183, -34.90), (-56.183, -34.91)])},
+            {"name": "Santiago de Chile", "geometry": LineString([(-56.178, -34.90), (-56.178, -34.91)])},
+            {"name": "Ejido", "geometry": LineString([(-56.190, -34.90), (-56.190, -34.91)])},
+        ]
+        punto = Coordinates(lat=-34.905, lon=-56.1799)
+
+        esquina_1, esquina_2, _ = service._find_nearest_intersection(punto, calles, prefer_street="18 de Julio")
+
+        assert (esquina_1, esquina_2) == ("Ejido", "Santiago de Chile")
+
+    def test_calle_principal_coincidencia_exacta(self, service):
+        """Test la principal se elige por nombre exacto (sin tildes) antes que por substring"""
+        calles = [
+            {"name": "Avenida Rivera", "geometry": LineString([(-56.20, -34.900), (-56.16, -34.900)])},
+            {"name": "Rivera", "geometry": LineString([(-56.20, -34.905), (-56.16, -34.905)])},
+            {"name": "Ejido", "geometry": LineString([(-56.180, -34.89), (-56.180, -34.91)])},
+            {"name": "Yaguarón", "geometry": LineString([(-56.183, -34.89), (-56.183, -34.91)])},
+        ]
+        punto = Coordinates(lat=-34.905, lon=-56.1805)
+
+        esquina_1, esquina_2, distancia = service._find_nearest_intersection(punto, calles, prefer_street="RIVERA")
+
+        assert (esquina_1, esquina_2) == ("Ejido", "Yaguarón")
+        # Distancias en metros (UTM) a cada esquina: 0.0005° y 0.0025° de longitud
+        esperado = (_metros(punto, -34.905, -56.180) + _metros(punto, -34.905, -56.183)) / 2
+        assert distancia == pytest.approx(esperado, rel=5e-3)  # Factor de escala UTM
+
+    def test_esquina_mas_cercana_con_poda(self, service, monkeypatch):
+        """Test sin calle principal se poda por envolvente y se encuentra la misma esquina"""
+        calles = [
+            {"name": f"V{i}", "geometry": LineString([(-56.20 + i * 0.002, -34.92), (-56.20 + i * 0.002, -34.90)])}
+            for i in range(8)
+        ] + [
+            {"name": f"H{j}", "geometry": LineString([(-56.20, -34.92 + j * 0.002), (-56.18, -34.92 + j * 0.002)])}
+            for j in range(8)
+        ]
+        intersectados = []
+        original = geocoding._pairwise_intersection_points
+
+        def contar(geoms_a, geoms_b):
+            intersectados.append(len(geoms_a))
+            return original(geoms_a, geoms_b)
+
+        monkeypatch.setattr(geocoding, "_pairwise_intersection_points", contar)
+
+        punto = Coordinates(lat=-34.9139, lon=-56.1939)
+
+        esquina_1, esquina_2, distancia = service._find_nearest_intersection(punto, calles)
+
+        assert (esquina_1, esquina_2) == ("V3", "H3")
+        assert distancia == pytest.approx(_metros(punto, -34.914, -56.194), rel=5e-3)
+        assert sum(intersectados) < 64  # 8 x 8 pares que se cruzan
+
+    def test_kernel_argmin_como_numpy(self):
+        """Test argmin_sqdist (compilado y Python puro) coincide con np.argmin, empates incluidos"""
+        rng = np.random.default_rng(3)
+        xs, ys = rng.integers(0, 5, (2, 200)).astype(np.float64)  # Muchos empates
+        d2 = (xs - 2.0) ** 2 + (ys - 1.0) ** 2
+
+        for kernel in (argmin_sqdist, getattr(argmin_sqdist, "py_func", argmin_sqdist)):
+            assert kernel(xs, ys, 2.0, 1.0) == (np.argmin(d2), d2.min())
+            assert kernel(xs[:0], ys[:0], 2.0, 1.0)[0] == -1
+
+    def test_distancia_a_calles_soa_como_shapely(self):
+        """Test la distancia punto-segmento sobre arrays SoA coincide con shapely.distance"""
+        rng = np.random.default_rng(5)
+        geometries = np.array(
+            [LineString(rng.uniform(0, 100, (4, 2))) for _ in range(6)]
+            + [MultiLineString([rng.uniform(0, 100, (3, 2)), rng.uniform(0, 100, (2, 2))])],
+            dtype=object
+        )
+        segments = geocoding._street_segments(geometries, [f"C{i}" for i in range(len(geometries))])
+
+        d2 = street_min_sqdist(40.0, 60.0, segments.coords, segments.offsets, segments.street, len(geometries))
+
+        assert len(segments.offsets) == len(geometries) + 2  # El MultiLineString aporta dos líneas
+        assert np.sqrt(d2) == pytest.approx(shapely.distance(geometries, shapely.points(40.0, 60.0)))
+
+    def test_calles_paralelas_sin_construir_interseccion(self, service, monkeypatch):
+        """Test si las calles no se cruzan se va al fallback sin calcular la intersección"""
+        monkeypatch.setattr(service, "_get_street_geometries_batch", lambda names, timeout: {
+            "Rambla": LineString([(-56.20, -34.905), (-56.16, -34.905)]),
+            "Maldonado": LineString([(-56.20, -34.904), (-56.16, -34.904)]),
+        })
+        monkeypatch.setattr(geocoding.shapely, "intersection", lambda *args: pytest.fail("construyó la intersección"))
+        monkeypatch.setattr(service, "_calculate_intersection_fallback", lambda *args: "fallback")
+
+        assert service._compute_intersection("Rambla", "Maldonado", "Montevideo", "Uruguay") == "fallback"
+
+    def test_fallback_punto_medio_mas_cercano(self, service, monkeypatch):
+        """Test el fallback promedia el par de resultados más cercano entre sí"""
+        class Loc:
+            def __init__(self, lat, lon):
+                self.latitude, self.longitude = lat, lon
+
+        resultados = {
+            "Ejido, Montevideo, Uruguay": [Loc(-34.90, -56.18), Loc(-34.906, -56.181)],
+            "Colonia, Montevideo, Uruguay": [Loc(-34.95, -56.10), Loc(-34.904, -56.179), Loc(-34.905, -56.18)],
+        }
+        monkeypatch.setattr(
+            service, "_call_provider",
+            lambda provider, method, query, **kwargs: resultados[query]
+        )
+
+        coords = service._calculate_intersection_fallback("Ejido", "Colonia", "Montevideo", "Uruguay")
+
+        assert (coords.lat, coords.lon) == pytest.approx((-34.9055, -56.1805))
+
+
+class TestGeocodeMany:
+    """Tests para la geocodificación por lotes"""
+
+    def test_lote_en_paralelo_sin_duplicados(self, service, monkeypatch):
+        """Test direcciones repetidas se geocodifican una vez y el orden se mantiene"""
+        llamadas = []
+
+        def fake_geocode(address):
+            llamadas.append(address.number)
+            time.sleep(0.2)
+            return Coordinates(lat=-34.9, lon=-56.0 - int(address.number) / 1000)
+
+        monkeypatch.setattr(service, "geocode", fake_geocode)
+        direcciones = [
+            Address(street="Ejido", number=str(n), city="Montevideo")
+            for n in (1, 2, 3, 1, 4, 2)
+        ]
+
+        inicio = time.monotonic()
+        resultados = service.geocode_many(direcciones)
+
+        assert time.monotonic() - inicio < 0.6
+        assert sorted(llamadas) == ["1", "2", "3", "4"]
+        assert [c.lon for c in resultados] == [-56.001, -56.002, -56.003, -56.001, -56.004, -56.002]
+
+    def test_aciertos_de_cache_en_una_consulta(self, service, monkeypatch):
+        """Test las direcciones en cache salen de un solo get_many, sin geocode()"""
+        esquina = Coordinates(lat=-34.905, lon=-56.18)
+        puerta = Coordinates(lat=-34.9, lon=-56.17)
+        service._save_to_cache("Ejido 1234, Montevideo, Uruguay", puerta)
+        monkeypatch.setattr(service, "_compute_intersection", lambda *args: esquina)
+        service._calculate_intersection("Colonia", "Ejido", "Montevideo", "Uruguay")
+
+        lotes, llamadas = [], []
+        get_many = service._cache.get_many
+        monkeypatch.setattr(service._cache, "get_many", lambda keys: lotes.append(keys) or get_many(keys))
+        monkeypatch.setattr(service, "geocode", lambda address: llamadas.append(address) or None)
+
+        resultados = service.geocode_many([
+            Address(street="Ejido", number="1234", city="Montevideo", country="Uruguay"),
+            Address(street="Ejido", corner_1="Colonia", city="Montevideo", country="Uruguay"),
+            Address(street="Ejido", number="999", city="Montevideo", country="Uruguay"),
+        ])
+
+        assert len(lotes) == 1
+        assert resultados == [puerta, esquina, None]
+        assert [a.number for a in llamadas] == ["999"]
+
+    def test_version_async(self, service, monkeypatch):
+        """Test las versiones async retornan lo mismo que geocode / geocode_many / reverse_geocode"""
+        monkeypatch.setattr(service, "geocode", lambda address: Coordinates(lat=-34.9, lon=-56.1))
+        monkeypatch.setattr(service, "reverse_geocode",
+                            lambda coordinates: Address(street="Ejido", city="Montevideo"))
+        direcciones = [Address(street="Ejido", number="1", city="Montevideo")]
+
+        resultados = asyncio.run(service.geocode_many_async(direcciones))
+
+        assert resultados == [Coordinates(lat=-34.9, lon=-56.1)]
+        assert asyncio.run(service.geocode_async(direcciones[0])) == Coordinates(lat=-34.9, lon=-56.1)
+        assert asyncio.run(service.reverse_geocode_async(Coordinates(lat=-34.9, lon=-56.1))).street == "Ejido"
+
+
+class TestStreetsByLocation:
+    """Tests para el listado de calles de un departamento"""
+
+    @pytest.mark.parametrize("fila_de_cuenta", [True, False])
+    def test_nombres_unicos_ordenados(self, service, monkeypatch, fila_de_cuenta):
+        """Test los nombres salen del CSV sin duplicados ni vacíos; sin la fila de out count no hay resultado"""
+        class Location:
+            raw = {"boundingbox": ["-34.95", "-34.75", "-56.25", "-56.05"]}
+
+        csv = "Ejido\t\n Colonia \t\nEjido\t\nAv. 18 de Julio\t\n" + ("\t4\n" if fila_de_cuenta else "")
+        consultas = []
+
+        def fake_post(url, data, headers, timeout, stream=False):
+            consultas.append(data)
+            return FakeOverpassResponse(csv)
+
+        monkeypatch.setattr(service, "_call_provider", lambda *args, **kwargs: Location())
+        monkeypatch.setattr(service._overpass_session, "post", fake_post)
+
+        calles = service.get_streets_by_location("Montevideo")
+
+        assert "[out:csv(name, ::count; false)]" in consultas[0]
+        if fila_de_cuenta:
+            assert calles == ["Av. 18 de Julio", "Colonia", "Ejido"]
+        else:
+            assert calles == []  # Respuesta truncada: ni resultado ni cache
+            assert service._cache.size() == 0
+
+    def test_listado_cacheado_e_indice_por_prefijo(self, service, monkeypatch):
+        """Test el listado se consulta una vez y el índice busca por prefijo sin tildes"""
+        consultas = []
+
+        def fake_fetch(departamento, localidad, timeout):
+            consultas.append(departamento)
+            return ["Bulevar Artigas", "Bulevar España", "Bvar. Batlle y Ordóñez", "Ejido", "Éxodo"]
+
+        monkeypatch.setattr(service, "_fetch_streets_by_location", fake_fetch)
+
+        assert len(service.get_streets_by_location("Montevideo")) == 5
+        index = service.get_streets_index("montevideo")
+
+        assert consultas == ["Montevideo"]
+        assert index.search("BULEVAR") == ["Bulevar Artigas", "Bulevar España"]
+        assert index.search("bulevar", limit=1) == ["Bulevar Artigas"]
+        assert index.search("exo") == ["Éxodo"]
+        assert index.search("zzz") == []
+        assert service.get_streets_index("Montevideo") is index
+        assert asyncio.run(service.get_streets_index_async("Montevideo")) is index
+        assert len(asyncio.run(service.get_streets_by_location_async("Montevideo"))) == 5
+        assert consultas == ["Montevideo"]
+
+    def test_listado_prearmado_en_sqlite(self, service, monkeypatch):
+        """Test prefetch_street_list guarda el listado y después se sirve sin Overpass ni cache"""
+        consultas = []
+
+        def fake_fetch(departamento, localidad, timeout):
+            consultas.append((departamento, localidad))
+            return ["Rambla", "Av. Roosevelt", "Rambla"] if localidad else ["Ejido", "Colonia"]
+
+        monkeypatch.setattr(service, "_fetch_streets_by_location", fake_fetch)
+
+        assert service._street_lists.get("Maldonado") is None
+        assert service.prefetch_street_list("Maldonado", "Punta del Este") == 2
+        assert service.prefetch_street_list("Maldonado") == 2
+
+        assert service.get_streets_by_location("MALDONADO", "punta del este") == ["Av. Roosevelt", "Rambla"]
+        assert service.get_streets_by_location("Maldonado") == ["Colonia", "Ejido"]
+        assert service.get_streets_index("Maldonado").search("eji") == ["Ejido"]
+        assert len(consultas) == 2
+        assert service._cache.size() == 0
+
+
+class TestStreetIndex:
+    """Tests para el snapshot local de calles"""
+
+    ELEMENTOS = [
+        {"type": "way", "tags": {"name": "Ejido"},
+         "geometry": [{"lon": -56.18, "lat": -34.90}, {"lon": -56.18, "lat": -34.905}]},
+        {"type": "way", "tags": {"name": "Ejido"},
+         "geometry": [{"lon": -56.18, "lat": -34.905}, {"lon": -56.18, "lat": -34.91}]},
+        {"type": "way", "tags": {"name": "Avenida José Enrique Rodó"},
+         "geometry": [{"lon": -56.19, "lat": -34.905}, {"lon": -56.17, "lat": -34.905}]},
+        {"type": "way", "tags": {"name": "Rambla"},
+         "geometry": [{"lon": -56.10, "lat": -34.93}, {"lon": -56.09, "lat": -34.93}]},
+    ]
+
+    def test_busqueda_por_nombre_y_cercania(self):
+        """Test el índice agrupa ways y busca sin distinguir tildes ni mayúsculas"""
+        index = StreetIndex.from_overpass_elements(self.ELEMENTOS, MONTEVIDEO_BBOX)
+
+        assert len(index) == 3
+        assert index.get("avenida jose enrique rodo") is not None
+        assert index.get("EJIDO").length == pytest.approx(0.01)
+        assert [s["name"] for s in index.nearby(-34.905, -56.18, 0.001)] == ["Ejido", "Avenida José Enrique Rodó"]
+        assert not index.covers(-34.5, -55.0, 0.001)
+
+    def test_guardar_y_cargar(self, tmp_path):
+        """Test el snapshot se guarda y se vuelve a cargar igual"""
+        index = StreetIndex.from_overpass_elements(self.ELEMENTOS, MONTEVIDEO_BBOX)
+
+        cargado = StreetIndex.load(index.save(tmp_path / "calles.pkl"))
+
+        assert cargado.names == index.names
+        assert cargado.get("Rambla").equals(index.get("Rambla"))
+        assert [p.name for p in tmp_path.iterdir()] == ["calles.pkl"]  # Sin temporales
+
+    def test_interseccion_sin_overpass(self, service, monkeypatch):
+        """Test con snapshot cargado la intersección no consulta Overpass"""
+        service._street_index = StreetIndex.from_overpass_elements(self.ELEMENTOS, MONTEVIDEO_BBOX)
+        monkeypatch.setattr(service._overpass_session, "post", None)  # Falla si se usa
+
+        coords = service._calculate_intersection("Ejido", "Avenida José Enrique Rodó", "Montevideo", "Uruguay")
+
+        assert (coords.lat, coords.lon) == pytest.approx((-34.905, -56.18))
+
+
+    def test_snapshot_de_departamento(self, service, monkeypatch, tmp_path):
+        """Test prefetch_department guarda el snapshot y los puntos del departamento no van a Overpass"""
+        class Location:
+            raw = {"boundingbox": ["-34.95", "-34.40", "-56.40", "-55.00"]}  # Canelones aprox.
+
+        monkeypatch.setattr(geocoding, "DEPARTMENT_SNAPSHOT_DIR", tmp_path)
+        monkeypatch.setattr(service, "_call_provider", lambda *args, **kwargs: Location())
+        monkeypatch.setattr(
+            service._overpass_session, "post",
+            lambda url, data, timeout, stream=False: FakeOverpassResponse({"elements": [
+                {"type": "way", "tags": {"name": "Ruta 8"},
+                 "geometry": [{"lon": -55.95, "lat": -34.70}, {"lon": -55.90, "lat": -34.70}]},
+            ]})
+        )
+
+        index = service.prefetch_department("Canelones")
+
+        assert (tmp_path / "canelones.pkl").exists()
+        assert index.bbox == (-34.95, -56.40, -34.40, -55.00)
+
+        # Otro proceso: carga el snapshot del disco la primera vez que lo necesita
+        monkeypatch.setattr(service, "_department_indexes", None)
+        monkeypatch.setattr(service._overpass_session, "post", None)  # Falla si se usa
+        calles = service._get_nearby_streets_from_overpass(-34.7001, -55.93, radius=0.001)
+
+        assert [calle["name"] for calle in calles] == ["Ruta 8"]
+
+
+class TestRateLimit:
+    """Tests para el rate limiting por proveedor"""
+
+    def test_geocode_y_reverse_comparten_limite_entre_hilos(self, monkeypatch):
+        """Test llamadas concurrentes a geocode/reverse respetan el intervalo mínimo"""
+        monkeypatch.setenv("GEOCODING_CACHE_BACKEND", "memory")
+        monkeypatch.setitem(geocoding.PROVIDER_MIN_DELAY_SECONDS, "nominatim", 0.2)
+        service = GeocodingService()
+        instantes = []
+
+        class FakeGeocoder:
+            def geocode(self, *args, **kwargs):
+                instantes.append(time.monotonic())
+
+            reverse = geocode
+
+        service.geocoders["nominatim"] = FakeGeocoder()
+        hilos = [
+            threading.Thread(target=service._call_provider, args=("nominatim", metodo, "x"))
+            for metodo in ("geocode", "reverse", "geocode", "reverse")
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        instantes.sort()
+        assert len(instantes) == 4
+        assert all(b - a >= 0.19 for a, b in zip(instantes, instantes[1:]))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,111 @@
+"""
+Tests para la detección de zonas (point-in-polygon).
+
+Usan los GeoJSON reales de app/data.
+"""
+
+import numpy as np
+import pytest
+
+from app import zones
+
+
+# 21 de setiembre 2570, Montevideo (cae en zona de flete 0)
+PUNTO_ZONA_0 = (-34.9149255, -56.1601851)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def zonas_cargadas():
+    """Carga las zonas una sola vez para todo el módulo"""
+    zones.load_zones()
+
+
+class TestZoneLookup:
+    """Tests para la búsqueda de zonas"""
+
+    def test_find_zona_flete(self):
+        """Test punto conocido dentro de la zona de flete 0"""
+        result = zones.find_zones_by_coordinates(*PUNTO_ZONA_0)
+
+        assert result['flete'] is not None
+        assert result['flete']['codigo'] == 0
+        assert result['global'] is not None
+
+    def test_punto_fuera_de_montevideo(self):
+        """Test punto fuera de todas las zonas"""
+        result = zones.find_zones_by_coordinates(-30.0, -50.0)
+
+        assert result['flete'] is None
+        assert result['global'] is None
+
+    def test_index_coincide_con_busqueda_lineal(self):
+        """Test el índice espacial retorna la misma zona que el recorrido por área"""
+        lat, lon = PUNTO_ZONA_0
+        point = zones.Point(lon, lat)
+
+        esperado = next(
+            zone for zone, prepared in zones._prepared_polygons_global
+            if prepared.contains(point)
+        )
+
+        assert zones.find_zones_by_coordinates(lat, lon)['global'] is esperado
+
+    def test_busqueda_por_lotes(self):
+        """Test find_zone_indices coincide con find_zone punto a punto"""
+        index = zones.get_zone_index('ZONAS_4.geojson')
+        rng = np.random.default_rng(42)
+        points = np.column_stack([
+            rng.uniform(-56.45, -55.95, 300),
+            rng.uniform(-34.95, -34.70, 300)
+        ])
+
+        batch = index.find_zone_indices(points)
+
+        for (lon, lat), idx in zip(points, batch):
+            esperado = index.find_zone(zones.Point(lon, lat))
+            obtenido = index.zones[idx] if idx >= 0 else None
+            assert obtenido is esperado
+
+    def test_memo_por_celda_respeta_bordes(self):
+        """Test find_zone_at coincide con find_zone también junto a los bordes"""
+        index = zones.get_zone_index('ZONAS_F.geojson')
+        rng = np.random.default_rng(7)
+
+        for rings in index.rings[:5]:
+            coords = rings.coords[rng.integers(0, len(rings.coords), 50)]
+            for lon, lat in coords + rng.normal(0, 3e-5, coords.shape):
+                esperado = index.find_zone(zones.Point(lon, lat))
+                assert index.find_zone_at(lat, lon) is esperado
+                assert index.find_zone_at(lat, lon) is esperado  # desde el memo
+
+    def test_reload_zones(self):
+        """Test reload_zones reconstruye los índices desde disco"""
+        anterior = zones.get_zone_index('ZONAS_F.geojson')
+
+        zones.reload_zones()
+
+        assert zones.get_zone_index('ZONAS_F.geojson') is not anterior
+        assert zones.find_zones_by_coordinates(*PUNTO_ZONA_0)['flete']['codigo'] == 0
+
+
+class TestGeoParquet:
+    """Tests para el GeoParquet de zonas en cache/zones"""
+
+    @pytest.mark.skipif(not zones.GEOPANDAS_AVAILABLE, reason="geopandas no instalado")
+    def test_se_genera_al_leer_y_se_reutiliza(self, tmp_path, monkeypatch):
+        """Test el primer arranque lee el GeoJSON y deja el GeoParquet; el siguiente lee ese"""
+        monkeypatch.setattr(zones, "ZONES_CACHE_DIR", tmp_path)
+        zones_file = zones._zones_path('ZONAS_4.geojson')
+
+        origen, features = zones._read_zone_features(zones_file)
+        assert origen == zones_file
+        assert zones.zones_parquet_path(zones_file).parent == tmp_path
+
+        origen, desde_parquet = zones._read_zone_features(zones_file)
+        assert origen == zones.zones_parquet_path(zones_file)
+        assert [p for p, _ in desde_parquet] == [p for p, _ in features]
+        assert all(a.equals(b) for (_, a), (_, b) in zip(desde_parquet, features))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])